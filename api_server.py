@@ -0,0 +1,380 @@
+"""
+Optional local HTTP server exposing the fleet state as JSON for squadron
+tools and dashboards, started with --api.
+
+    GET /fleet                              status and location of the shown carriers
+    GET /carriers/<callsign>                one carrier with finance, services, space usage and orders
+    GET /carriers/<callsign>/itinerary      jumps of one carrier, newest first, ?limit=N
+    GET /trade                              active trade orders of all shown carriers
+    GET /finance                            balances, upkeep and funding of all shown carriers
+    GET /events?since=<seq>&instance=<id>&timeout=<s>
+                                            long-poll for status transitions
+    GET /events/stream                      the same as server-sent events
+    GET /metrics                            timings and counters in Prometheus text format
+
+Resources carry a weak ETag of the model data version, a request with a
+matching If-None-Match gets 304, and with ?wait=<s> is held until the data
+changes instead. Bodies are rendered once per version and shared by all
+clients, gzip is used when accepted. Times are ISO 8601 UTC, countdowns are
+left to the client so resources only change when the data does.
+
+Event seqs restart with every run, so clients send back the instance id of
+the run their seq came from, SSE event ids carry it as <instance>-<seq>. A
+seq of another run gets all buffered events with missed set.
+"""
+import gzip
+import json
+import math
+import re
+import secrets
+import threading
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable
+from urllib.parse import urlsplit, parse_qs, unquote
+import pandas as pd
+from model import CarrierModel
+from metrics import REGISTRY
+from config import CD, CD_cancel, API_HOST, API_PORT, API_LONG_POLL_MAX, API_EVENT_BUFFER, API_SSE_HEARTBEAT, API_GZIP_MIN_SIZE, API_ITINERARY_MAX_LIMIT
+
+_CARRIER_PATTERN = re.compile(r'^/carriers/([^/]+)(/itinerary)?$')
+
+def _json_default(o):
+    if isinstance(o, (datetime, pd.Timestamp)):
+        return o.isoformat()
+    if hasattr(o, 'item'):  # numpy scalars
+        return o.item()
+    return str(o)
+
+def _clean(value):
+    """None for the missing value markers pandas leaves in the carrier data"""
+    if value is None or value is pd.NA or value is pd.NaT or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value
+
+class FleetApi:
+    """
+    Serves a CarrierModel over HTTP from a thread per connection. publish()
+    must be called by the thread owning the model after update_carriers, it
+    bumps the data version and records status transitions for /events.
+    """
+    def __init__(self, model: CarrierModel, host: str = API_HOST, port: int = API_PORT):
+        self.model = model
+        self.version = 0
+        self._fingerprint = None
+        self._statuses: dict[int, str] = {}
+        self._events: deque[dict] = deque(maxlen=API_EVENT_BUFFER)
+        self._event_seq = 0
+        self._condition = threading.Condition()
+        self._render_lock = threading.Lock()
+        self._cache: dict[str, tuple[int, bytes, bytes|None]] = {}
+        self.instance = secrets.token_hex(4)  # ETags and event seqs of an earlier run never match
+        self._stopped = False
+        api = self
+        class Handler(_Handler):
+            fleet_api = api
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FleetApi':
+        self.publish()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='FleetApi', daemon=True)
+        self._thread.start()
+        print(f'Fleet API listening on {self.url}')
+        return self
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def set_model(self, model: CarrierModel):
+        with self._condition:
+            self.model = model
+            self._statuses = {}
+            self._fingerprint = None
+        self.publish()
+
+    def publish(self):
+        carriers = self.model.get_carriers()
+        shown = self.model.sorted_ids_display()
+        statuses = {carrierID: carriers[carrierID]['status'] for carrierID in shown if 'status' in carriers[carrierID]}
+        fingerprint = (self.model.snapshot.version, tuple(statuses.items()), tuple((carrierID, timer['time']) for carrierID, timer in self.model.manual_timers.items()))
+        if fingerprint == self._fingerprint:
+            return
+        now = datetime.now(timezone.utc)
+        with self._condition:
+            self._fingerprint = fingerprint
+            self.version += 1
+            for carrierID in statuses.keys() & self._statuses.keys():
+                if statuses[carrierID] != self._statuses[carrierID]:
+                    self._event_seq += 1
+                    self._events.append({'seq': self._event_seq, 'time': now, 'version': self.version, 'carrier_id': carrierID,
+                                         'callsign': carriers[carrierID]['Callsign'], 'name': carriers[carrierID]['Name'],
+                                         'status_old': self._statuses[carrierID], 'status_new': statuses[carrierID]})
+            self._statuses = statuses
+            self._condition.notify_all()
+
+    def etag(self, version: int) -> str:
+        return f'W/"{self.instance}-{version}"'
+
+    def wait_for_version(self, version: int, timeout: float) -> int:
+        """Blocks until the data version differs from version, at most timeout seconds"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version or self._stopped, timeout)
+            return self.version
+
+    def get_events(self, since: int|None, timeout: float, instance: str|None = None) -> tuple[int, list[dict], bool]:
+        """
+        (last seq, events after since, whether events were dropped) waiting up
+        to timeout seconds for one. since None starts at the latest event. A
+        since from another instance, or beyond the last seq, is from an
+        earlier run and gets every buffered event.
+        """
+        with self._condition:
+            restarted = since is not None and ((instance is not None and instance != self.instance) or since > self._event_seq)
+            if since is None:
+                since = self._event_seq
+            elif restarted:
+                since = 0
+            if not restarted:
+                self._condition.wait_for(lambda: self._event_seq > since or self._stopped, timeout)
+            events = [event for event in self._events if event['seq'] > since]
+            missed = restarted or (since < self._event_seq and (len(self._events) == 0 or self._events[0]['seq'] > since + 1))
+            return self._event_seq, events, missed
+
+    def render(self, key: str, build: Callable[[], object]) -> tuple[int, bytes, bytes|None]:
+        """(version, body, gzipped body or None) of a resource, built once per version"""
+        with self._render_lock:
+            version = self.version
+            if any(cached[0] != version for cached in self._cache.values()):
+                # bodies of older versions are never served again
+                self._cache = {key: cached for key, cached in self._cache.items() if cached[0] == version}
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == version:
+                return cached
+            body = json.dumps(build(), default=_json_default).encode('utf-8')
+            body_gzip = gzip.compress(body, compresslevel=5) if len(body) >= API_GZIP_MIN_SIZE else None
+            self._cache[key] = (version, body, body_gzip)
+            return self._cache[key]
+
+    def get_carrier_id(self, callsign: str) -> int|None:
+        carrierID = self.model.get_id_by_callsign(callsign.upper())
+        return carrierID if carrierID in self.model.sorted_ids_display() else None
+
+    def build_carrier(self, carrierID: int) -> dict:
+        carrier = self.model.get_carriers()[carrierID]
+        status = carrier['status']
+        if status == 'cool_down':
+            cooldown_end = carrier['latest_depart'] + CD
+        elif status == 'cool_down_cancel':
+            cooldown_end = carrier['last_cancel']['timestamp'] + CD_cancel
+        else:
+            cooldown_end = None
+        timer = self.model.manual_timers.get(carrierID)
+        return {
+            'carrier_id': carrierID,
+            'callsign': carrier['Callsign'],
+            'name': carrier['Name'],
+            'squadron_carrier': self.model.is_squadron_carrier(carrierID),
+            'status': status,
+            'fuel': _clean(carrier['Fuel']['FuelLevel']),
+            'current_system': _clean(carrier['current_system']),
+            'current_body': _clean(carrier['current_body']),
+            'destination_system': _clean(carrier['destination_system']),
+            'destination_body': _clean(carrier['destination_body']),
+            'departure': carrier['latest_depart'] if status == 'jumping' else None,
+            'cooldown_end': cooldown_end,
+            'manual_timer': timer['time'] if timer is not None else None,
+            'pending_decommission': self.model.get_pending_decom(carrierID),
+        }
+
+    def build_fleet(self) -> dict:
+        return {'version': self.version, 'carriers': [self.build_carrier(carrierID) for carrierID in self.model.sorted_ids_display()]}
+
+    def build_finance_entry(self, carrierID: int) -> dict:
+        name, squadron, carrier_balance, cmdr_balance, upkeep, jump_cost, _ = self.model.generate_info_finance(carrierID)
+        funded_till = self.model.calculate_funded_till(carrierID, carrier_balance, upkeep, jump_cost).astimezone(timezone.utc)
+        return {'carrier_id': carrierID, 'callsign': self.model.get_callsign(carrierID), 'name': name, 'squadron': squadron,
+                'carrier_balance': _clean(carrier_balance), 'cmdr_balance': None if self.model.is_squadron_carrier(carrierID) else _clean(cmdr_balance),
+                'services_upkeep': upkeep, 'est_jump_cost': jump_cost, 'funded_till': funded_till}
+
+    def build_finance(self) -> dict:
+        entries = [self.build_finance_entry(carrierID) for carrierID in self.model.sorted_ids_display()]
+        totals = {key: sum(entry[key] or 0 for entry in entries) for key in ['carrier_balance', 'cmdr_balance', 'services_upkeep', 'est_jump_cost']}
+        return {'version': self.version, 'carriers': entries, 'totals': totals}
+
+    def build_orders(self, carrierID: int) -> list[dict]:
+        active_trades = self.model.get_active_trades(carrierID)
+        commodities = self.model.df_commodities_all
+        return [{'carrier_id': carrierID, 'callsign': self.model.get_callsign(carrierID), 'name': self.model.get_name(carrierID),
+                 'type': 'loading' if trade['PurchaseOrder'] > 0 else 'unloading',
+                 'commodity': commodities.loc[trade['Commodity']]['name'] if trade['Commodity'] in commodities.index else trade['Commodity'],
+                 'amount': int(trade['PurchaseOrder'] if trade['PurchaseOrder'] > 0 else trade['SaleOrder']), 'price': int(trade['Price']),
+                 'set_at': datetime.strptime(trade['timestamp'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)}
+                for trade in active_trades.sort_values('timestamp', ascending=False).to_dict('records')]
+
+    def build_trade(self) -> dict:
+        return {'version': self.version, 'orders': [order for carrierID in self.model.sorted_ids_display() for order in self.build_orders(carrierID)]}
+
+    def build_carrier_detail(self, carrierID: int) -> dict:
+        docking_perm, allow_notorious = self.model.generate_info_docking_perm(carrierID)
+        services = self.model.generate_info_services(carrierID)
+        detail = self.build_carrier(carrierID)
+        detail.update({
+            'version': self.version,
+            'cmdr_name': self.model.generate_info_cmdr_name(carrierID),
+            'finance': self.build_finance_entry(carrierID),
+            'services': {service: status for service, status in services.items()},
+            'docking_permission': docking_perm,
+            'allow_notorious': allow_notorious,
+            'space_usage': {key: _clean(value) for key, value in self.model.get_space_usage(carrierID).items()},
+            'time_bought': self.model.get_time_bought(carrierID),
+            'stats_updated': self.model.get_stat_time(carrierID),
+            'orders': self.build_orders(carrierID),
+        })
+        return detail
+
+    def build_itinerary(self, carrierID: int, limit: int) -> dict:
+        jumps = self.model.get_carriers()[carrierID]['jumps'].head(limit)
+        return {'version': self.version, 'carrier_id': carrierID, 'callsign': self.model.get_callsign(carrierID),
+                'jumps': [{'plotted_at': jump['timestamp'], 'departure': jump['DepartureTime'], 'system': jump['SystemName'], 'body': _clean(jump['Body'])}
+                          for jump in jumps.to_dict('records')]}
+
+class _Handler(BaseHTTPRequestHandler):
+    fleet_api: FleetApi
+    protocol_version = 'HTTP/1.1'
+    server_version = 'EDCM'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        route = url.path.rstrip('/') or '/'
+        try:
+            if route == '/metrics':
+                self.send_text(200, REGISTRY.render_prometheus(), 'text/plain; version=0.0.4')
+            elif route == '/events':
+                self.send_events(query)
+            elif route == '/events/stream':
+                self.send_event_stream()
+            elif route == '/fleet':
+                self.send_resource(route, query, self.fleet_api.build_fleet)
+            elif route == '/trade':
+                self.send_resource(route, query, self.fleet_api.build_trade)
+            elif route == '/finance':
+                self.send_resource(route, query, self.fleet_api.build_finance)
+            elif (match := _CARRIER_PATTERN.match(route)) is not None:
+                callsign = unquote(match.group(1))
+                carrierID = self.fleet_api.get_carrier_id(callsign)
+                if carrierID is None:
+                    self.send_json(404, {'error': f'Unknown carrier {callsign}'})
+                elif match.group(2):
+                    limit = int(query.get('limit', 50))
+                    if not 1 <= limit <= API_ITINERARY_MAX_LIMIT:
+                        raise ValueError(f'limit must be between 1 and {API_ITINERARY_MAX_LIMIT}')
+                    self.send_resource(f'{route}?limit={limit}', query, lambda: self.fleet_api.build_itinerary(carrierID, limit))
+                else:
+                    self.send_resource(route, query, lambda: self.fleet_api.build_carrier_detail(carrierID))
+            else:
+                self.send_json(404, {'error': f'Unknown endpoint {route}'})
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception:
+            traceback.print_exc()
+            self.send_json(500, {'error': 'Internal error'})
+
+    def accepts_gzip(self) -> bool:
+        return 'gzip' in self.headers.get('Accept-Encoding', '')
+
+    def send_json(self, code: int, payload):
+        body = json.dumps(payload, default=_json_default).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_text(self, code: int, text: str, content_type: str):
+        body = text.encode('utf-8')
+        use_gzip = len(body) >= API_GZIP_MIN_SIZE and self.accepts_gzip()
+        if use_gzip:
+            body = gzip.compress(body, compresslevel=5)
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_resource(self, key: str, query: dict[str, str], build: Callable[[], object]):
+        api = self.fleet_api
+        version = api.version
+        if self.headers.get('If-None-Match') == api.etag(version):
+            wait = min(float(query.get('wait', 0)), API_LONG_POLL_MAX)
+            if wait > 0:
+                version = api.wait_for_version(version, wait)
+            if self.headers.get('If-None-Match') == api.etag(version):
+                self.send_response(304)
+                self.send_header('ETag', api.etag(version))
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        version, body, body_gzip = api.render(key, build)
+        use_gzip = body_gzip is not None and self.accepts_gzip()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', api.etag(version))
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body_gzip if use_gzip else body)))
+        self.end_headers()
+        self.wfile.write(body_gzip if use_gzip else body)
+
+    def send_events(self, query: dict[str, str]):
+        since = int(query['since']) if 'since' in query else None
+        timeout = min(float(query.get('timeout', API_LONG_POLL_MAX)), API_LONG_POLL_MAX)
+        seq, events, missed = self.fleet_api.get_events(since, timeout, query.get('instance'))
+        self.send_json(200, {'instance': self.fleet_api.instance, 'seq': seq, 'events': events, 'missed': missed})
+
+    def send_event_stream(self):
+        # ids are <instance>-<seq>, a bare seq is accepted as well
+        instance, _, seq = (self.headers.get('Last-Event-ID') or '').rpartition('-')
+        since = int(seq) if seq.isdigit() else None
+        instance = instance or None
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        self.wfile.write(f'retry: {API_SSE_HEARTBEAT * 1000}\n\n'.encode('utf-8'))
+        self.wfile.flush()
+        while not self.fleet_api._stopped:
+            since, events, missed = self.fleet_api.get_events(since, API_SSE_HEARTBEAT, instance)
+            instance = self.fleet_api.instance
+            if missed:
+                self.wfile.write(f'event: missed\nid: {instance}-{since}\ndata: {{}}\n\n'.encode('utf-8'))
+            for event in events:
+                self.wfile.write(f'event: status_change\nid: {instance}-{event["seq"]}\ndata: {json.dumps(event, default=_json_default)}\n\n'.encode('utf-8'))
+            if not events and not missed:
+                self.wfile.write(b': heartbeat\n\n')
+            self.wfile.flush()
@@ -18,6 +18,7 @@ import jwt
 from jwt import PyJWKClient, InvalidTokenError
 import keyring
 import requests
+import http_client
 from postgrest import APIResponse
 from supabase import create_client, Client, FunctionsHttpError
 
@@ -80,7 +81,7 @@ class JwtVerifier:
         except Exception as e:
             # Fallback: handle tokens without 'kid' by trying all keys
             try:
-                jwks = requests.get(self.jwks_url, timeout=5).json().get("keys", [])
+                jwks = http_client.get(self.jwks_url, timeout=5).json().get("keys", [])
                 for jwk in jwks:
                     try:
                         key = jwt.PyJWK.from_dict(jwk).key
@@ -108,7 +109,7 @@ def _post_json(url_path: str, payload: dict, timeout: int = 20) -> dict:
     headers = {}
     if VERCEL_BYPASS:
         headers["x-vercel-protection-bypass"] = VERCEL_BYPASS
-    r = requests.post(url, json=payload, headers=headers, timeout=timeout)
+    r = http_client.post(url, json=payload, headers=headers, timeout=timeout)
     if r.status_code >= 400:
         print("POST", url, "->", r.status_code, r.text)
         r.raise_for_status()
@@ -216,6 +217,8 @@ class AuthHandler:
         self._access_exp: float = 0.0
         self._jwt_verifier = JwtVerifier(SUPABASE_URL)
         self._claims: Dict[str, Any] = {}
+        # refresh tokens rotate, so only one refresh may run at a time
+        self._refresh_lock = threading.RLock()
 
         # Simple event bus
         self._auth_event_callbacks: dict[str, list[Callable[[], None]]] = {
@@ -354,22 +357,29 @@ class AuthHandler:
         self._emit("SIGNED_IN")
         return True
 
-    def _refresh_access(self) -> bool:
-        rt = self._load_refresh()
-        if not rt:
-            return False
-        try:
-            data = _post_json(
-                "/api/auth/refresh",
-                {"refresh_token": rt, "user_agent": f"EDCM Desktop {getCurrentVersion()}"},
-                timeout=15,
-            )
-            self._set_access(data["access_jwt"], data.get("refresh_token"))
-            return True
-        except Exception as e:
-            print("Refresh failed:", e)
-            self._clear_refresh()
-            return False
+    def _refresh_access(self, rejected_jwt: Optional[str] = None) -> bool:
+        """
+        Refreshes the access token. With rejected_jwt, the token a request
+        failed with, another thread's refresh since then is used instead.
+        """
+        with self._refresh_lock:
+            if rejected_jwt is not None and self._access_jwt not in (None, rejected_jwt) and not self._need_refresh():
+                return True
+            rt = self._load_refresh()
+            if not rt:
+                return False
+            try:
+                data = _post_json(
+                    "/api/auth/refresh",
+                    {"refresh_token": rt, "user_agent": f"EDCM Desktop {getCurrentVersion()}"},
+                    timeout=15,
+                )
+                self._set_access(data["access_jwt"], data.get("refresh_token"))
+                return True
+            except Exception as e:
+                print("Refresh failed:", e)
+                self._clear_refresh()
+                return False
 
     def _restore_from_refresh(self):
         rt = self._load_refresh()
@@ -387,22 +397,25 @@ class AuthHandler:
 
     # ---- Public helpers ----
     def is_logged_in(self) -> bool:
-        if self._need_refresh():
-            try:
-                self._refresh_access()
-            except Exception:
-                return False
-        return self._access_jwt is not None
+        with self._refresh_lock:
+            if self._need_refresh():
+                try:
+                    self._refresh_access()
+                except Exception:
+                    return False
+            return self._access_jwt is not None
 
     def get_client(self) -> Client:
-        if self._need_refresh():
-            self._refresh_access()
+        with self._refresh_lock:
+            if self._need_refresh():
+                self._refresh_access()
         return self.client
 
     def logout(self):
-        self._access_jwt = None
-        self._access_exp = 0.0
-        self._clear_refresh()
+        with self._refresh_lock:
+            self._access_jwt = None
+            self._access_exp = 0.0
+            self._clear_refresh()
         print("Logged out.")
         self._emit("SIGNED_OUT")
 
@@ -466,28 +479,30 @@ class AuthHandler:
         """
         Call a Supabase Edge Function with the current access token.
         If we get 401/403, try exactly one refresh and retry.
+        Safe to call from several threads, token refreshes are serialized.
         Raises FunctionsHttpError (e.g., 429) or RuntimeError on unexpected conditions.
         """
         if not self.is_logged_in():
             raise FunctionsHttpError("Unauthorized", 401, "No access token")
 
-        def _call():
+        def _call(access_jwt: Optional[str]):
             return self.client.functions.invoke(
                 name,
                 invoke_options={
                     "method": method,
-                    "headers": self._auth_header(),
+                    "headers": {"Authorization": f"Bearer {access_jwt}"} if access_jwt else {},
                     "body": body,
                 },
             )
 
+        access_jwt = self._access_jwt
         try:
-            res = _call()
+            res = _call(access_jwt)
         except FunctionsHttpError as e:
             if e.status in (401, 403):
-                # one refresh attempt
-                if self._refresh_access():
-                    res = _call()
+                # one refresh attempt, unless another thread already replaced the rejected token
+                if self._refresh_access(rejected_jwt=access_jwt):
+                    res = _call(self._access_jwt)
                 else:
                     print("Failed to refresh access token after 401/403")
                     self.logout()
@@ -0,0 +1,228 @@
+"""
+Benchmarks the journal and model hot paths on a synthetic journal set from
+journal_generator.py: cold and warm JournalReader reads, CarrierModel
+startup and incremental reads, update_carriers, every get_data_* table and
+the journal cache save and load. Each case runs --repeat times for its
+timings plus once under tracemalloc for its peak memory. Results are
+written as JSON and compared against a baseline, the exit code is 1 when a
+case got slower or bigger than the tolerance allows.
+
+    python benchmark.py --baseline benchmark_baseline.json --save-baseline
+    python benchmark.py --baseline benchmark_baseline.json --output results.json
+
+A baseline only compares to results from the same data set and machine.
+"""
+import io
+import json
+import pickle
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from os import listdir, makedirs, path
+from typing import Any, Callable, NamedTuple
+from model import CarrierModel, JournalReader, _JOURNAL_FILENAME_PATTERN
+from journal_generator import JournalGenerator
+from config import BENCHMARK_TOLERANCE, BENCHMARK_MEMORY_TOLERANCE, BENCHMARK_MIN_DELTA, BENCHMARK_MIN_MEMORY_DELTA
+
+class Case(NamedTuple):
+    name: str
+    setup: Callable[[], Any]  # untimed, its result is passed to run
+    run: Callable[[Any], Any]
+
+class Fixture:
+    """
+    The journal set plus a live journal in a second directory, which the
+    warm cases reset and append a batch of events to, like the game does
+    while playing.
+    """
+    def __init__(self, data_dir: str, work_dir: str, batch: int):
+        self.data_dir = data_dir
+        self.live_dir = path.join(work_dir, 'live')
+        self.cache_path = path.join(work_dir, 'cache.pkl')
+        makedirs(self.live_dir, exist_ok=True)
+        journals = sorted(name for name in listdir(data_dir) if _JOURNAL_FILENAME_PATTERN.fullmatch(name))
+        assert len(journals) > 0, f'No journal files found in {data_dir}'
+        with open(path.join(data_dir, journals[-1]), encoding='utf-8') as f:
+            lines = [line for line in f if '"event":"Shutdown"' not in line]
+        # a later file for the same commander, without Shutdown so it stays active
+        self.live_path = path.join(self.live_dir, 'Journal.2999-01-01T000000.01.log')
+        self.base = ''.join(lines)
+        body = lines[5:] or lines
+        self.batch = ''.join(body[i % len(body)] for i in range(batch))
+        self.paths = [data_dir, self.live_dir]
+        self.reset_live()
+        with redirect_stdout(io.StringIO()):
+            reader = JournalReader(self.paths)
+            reader.read_journals()
+            self.reader_blob = pickle.dumps(reader)
+            self.model = self.new_model()
+
+    def reset_live(self, append: bool = False):
+        with open(self.live_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(self.base + (self.batch if append else ''))
+
+    def warm_reader(self, append: bool = False) -> JournalReader:
+        self.reset_live(append)
+        return pickle.loads(self.reader_blob)
+
+    def new_model(self, reader: JournalReader|None = None) -> CarrierModel:
+        model = CarrierModel(self.paths, journal_reader=reader)
+        model.register_status_change_callback(lambda carrierID, status_old, status_new: None)
+        return model
+
+    def warm_model(self) -> CarrierModel:
+        model = self.new_model(self.warm_reader())
+        self.reset_live(append=True)
+        return model
+
+    def save_cache(self, reader: JournalReader):
+        with open(self.cache_path, 'wb') as f:
+            f.write(pickle.dumps(reader))
+
+    def load_cache(self) -> JournalReader:
+        # what main.load_journal_reader_from_cache does
+        with open(self.cache_path, 'rb') as f:
+            reader: JournalReader = pickle.load(f)
+        reader.read_journals()
+        return reader
+
+def get_cases(fixture: Fixture) -> list[Case]:
+    model = fixture.model
+    def cold_reader() -> JournalReader:
+        fixture.reset_live()
+        return JournalReader(fixture.paths)
+    def saved_cache():
+        fixture.reset_live()
+        fixture.save_cache(pickle.loads(fixture.reader_blob))
+    cases = [
+        Case('journal_reader_cold', cold_reader, lambda reader: reader.read_journals()),
+        Case('journal_reader_warm', lambda: fixture.warm_reader(append=True), lambda reader: reader.read_journals()),
+        Case('journal_reader_unchanged', fixture.warm_reader, lambda reader: reader.read_journals()),
+        Case('model_start', fixture.reset_live, lambda _: fixture.new_model()),
+        Case('model_start_cached', fixture.warm_reader, fixture.new_model),
+        Case('model_read_journals_warm', fixture.warm_model, lambda model: model.read_journals()),
+        Case('model_update_carriers', lambda: None, lambda _: model.update_carriers(datetime.now(timezone.utc))),
+        Case('get_data', lambda: None, lambda _: model.get_data(datetime.now(timezone.utc))),
+        Case('get_data_finance', lambda: None, lambda _: model.get_data_finance()),
+        Case('get_data_services', lambda: None, lambda _: model.get_data_services()),
+        Case('get_data_cmdr', lambda: None, lambda _: model.get_data_cmdr()),
+        Case('get_data_misc', lambda: None, lambda _: model.get_data_misc()),
+        Case('get_data_trade', lambda: None, lambda _: model.get_data_trade()),
+        Case('get_data_active_journals', lambda: None, lambda _: model.get_data_active_journals()),
+        Case('cache_save', fixture.warm_reader, fixture.save_cache),
+        Case('cache_load', saved_cache, lambda _: fixture.load_cache()),
+    ]
+    return cases
+
+def run_case(case: Case, repeat: int) -> dict:
+    times = []
+    with redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            state = case.setup()
+            start = time.perf_counter()
+            case.run(state)
+            times.append(time.perf_counter() - start)
+            del state
+        # separate run, tracing slows the code down too much for the timings
+        state = case.setup()
+        tracemalloc.start()
+        try:
+            case.run(state)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'max_s': max(times), 'peak_bytes': peak}
+
+def compare(results: dict, baseline: dict, tolerance: float, memory_tolerance: float, min_delta: float, min_memory_delta: int) -> list[str]:
+    """Regressions of the results against the baseline, as messages"""
+    regressions = []
+    for name, result in results['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        if result['median_s'] > base['median_s'] * (1 + tolerance) and result['median_s'] - base['median_s'] > min_delta:
+            regressions.append(f'{name}: median {result["median_s"] * 1000:,.1f} ms, baseline {base["median_s"] * 1000:,.1f} ms (+{result["median_s"] / base["median_s"] - 1:.0%})')
+        if result['peak_bytes'] > base['peak_bytes'] * (1 + memory_tolerance) and result['peak_bytes'] - base['peak_bytes'] > min_memory_delta:
+            regressions.append(f'{name}: peak memory {result["peak_bytes"] / 2 ** 20:,.1f} MiB, baseline {base["peak_bytes"] / 2 ** 20:,.1f} MiB (+{result["peak_bytes"] / base["peak_bytes"] - 1:.0%})')
+    return regressions
+
+def print_table(results: dict, baseline: dict|None):
+    print(f'{"case":<28}{"median ms":>12}{"baseline":>12}{"change":>9}{"peak MiB":>11}{"baseline":>11}')
+    for name, result in results['results'].items():
+        base = baseline['results'].get(name) if baseline is not None else None
+        if base is not None:
+            change = f'{result["median_s"] / base["median_s"] - 1:+.0%}' if base['median_s'] > 0 else ''
+            print(f'{name:<28}{result["median_s"] * 1000:>12,.1f}{base["median_s"] * 1000:>12,.1f}{change:>9}{result["peak_bytes"] / 2 ** 20:>11,.1f}{base["peak_bytes"] / 2 ** 20:>11,.1f}')
+        else:
+            print(f'{name:<28}{result["median_s"] * 1000:>12,.1f}{"":>12}{"":>9}{result["peak_bytes"] / 2 ** 20:>11,.1f}')
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmarks the EDCM journal and model hot paths')
+    parser.add_argument('--data', default=None, help='existing journal directory, otherwise one is generated')
+    parser.add_argument('--commanders', type=int, default=10)
+    parser.add_argument('--carriers', type=int, default=12)
+    parser.add_argument('--years', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch', type=int, default=500, help='events appended to the live journal for the warm cases')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--case', action='append', default=None, help='only run cases matching this pattern, can be repeated')
+    parser.add_argument('--output', default=None, help='JSON file for the results')
+    parser.add_argument('--baseline', default=None, help='JSON results to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results to --baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=BENCHMARK_TOLERANCE, help='allowed slowdown of the median as a fraction')
+    parser.add_argument('--memory-tolerance', type=float, default=BENCHMARK_MEMORY_TOLERANCE, help='allowed growth of peak memory as a fraction')
+    parser.add_argument('--min-delta', type=float, default=BENCHMARK_MIN_DELTA, help='seconds, smaller slowdowns never count')
+    parser.add_argument('--min-memory-delta', type=int, default=BENCHMARK_MIN_MEMORY_DELTA, help='bytes, smaller growth of peak memory never counts')
+    args = parser.parse_args()
+    if args.save_baseline and args.baseline is None:
+        parser.error('--save-baseline needs --baseline')
+    baseline = None
+    if args.baseline is not None and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix='edcm-benchmark-') as work_dir:
+        if args.data is None:
+            data_dir = path.join(work_dir, 'journals')
+            print(f'Generating journals for {args.commanders} commanders and {args.carriers} carriers over {args.years} years')
+            summary = JournalGenerator(args.commanders, args.carriers, args.years, seed=args.seed).generate(data_dir)
+            dataset = {'commanders': args.commanders, 'carriers': args.carriers, 'years': args.years, 'seed': args.seed, 'files': summary['files'], 'events': summary['events'], 'bytes': summary['bytes']}
+        else:
+            data_dir = args.data
+            journals = [name for name in listdir(data_dir) if _JOURNAL_FILENAME_PATTERN.fullmatch(name)]
+            dataset = {'path': path.abspath(data_dir), 'files': len(journals), 'bytes': sum(path.getsize(path.join(data_dir, name)) for name in journals)}
+        dataset['batch'] = args.batch
+        if baseline is not None and baseline['dataset'] != dataset:
+            print(f'The baseline was recorded on a different data set\nbaseline: {baseline["dataset"]}\ncurrent:  {dataset}')
+            sys.exit(2)
+        print(f'{dataset["files"]:,} journals, {dataset["bytes"] / 2 ** 20:,.1f} MiB, preparing')
+        fixture = Fixture(data_dir, work_dir, args.batch)
+        results = {'created': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'python': platform.python_version(), 'platform': platform.platform(),
+                   'repeat': args.repeat, 'dataset': dataset, 'results': {}}
+        for case in get_cases(fixture):
+            if args.case is not None and not any(fnmatch(case.name, pattern) for pattern in args.case):
+                continue
+            print(f'Running {case.name}')
+            results['results'][case.name] = run_case(case, args.repeat)
+
+    print_table(results, baseline)
+    for file_path in [args.output, args.baseline if args.save_baseline else None]:
+        if file_path is not None:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            print(f'Results written to {file_path}')
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance, args.memory_tolerance, args.min_delta, args.min_memory_delta)
+        if regressions:
+            print(f'{len(regressions)} regressions against {args.baseline}:')
+            for regression in regressions:
+                print(f'  {regression}')
+            sys.exit(1)
+        print(f'No regressions against {args.baseline}')
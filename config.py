@@ -1,5 +1,9 @@
 from datetime import timedelta
 from sys import platform
+from os import getenv
+from dotenv import load_dotenv
+
+load_dotenv()  # load .env file if present
 
 WINDOW_SIZE = "1080x420"
 WINDOW_SIZE_TIMER = "300x120"
@@ -13,13 +17,71 @@ PLOT_WARN = timedelta(seconds=10)
 
 TIME_SKEW_WARN_CD = timedelta(hours=1)
 TIME_SKEW_CHECK_CD = timedelta(minutes=15)
+TIME_SKEW_SAMPLE_INTERVAL = timedelta(minutes=5)
+TIME_SKEW_WINDOW = 12  # samples the skew estimate is based on
 
 UPDATE_INTERVAL = 500
-UPDATE_INTERVAL_TIMER_STATS = 1000 * 30  # 30 seconds
-REDRAW_INTERVAL_FAST = 250
+UPDATE_INTERVAL_TIMER_STATS = 1000 * 30  # 30 seconds, polling while the realtime subscription is down
+UPDATE_INTERVAL_TIMER_STATS_SUBSCRIBED = 1000 * 60 * 10  # 10 minutes, safety poll while subscribed
+TIMER_STATS_PUSH_DELAY = 200  # ms to gather a burst of new reports into one refresh
+TIMER_STATS_BACKOFF_MAX = 1000 * 60  # 1 minute, longest wait between reconnection attempts
+TIMER_HISTORY_CHUNK_SIZE = 500  # jump timers per bulk report request
+TIMER_HISTORY_UPLOAD_WORKERS = 4
+TIMER_HISTORY_UPLOAD_RETRIES = 3
+REDRAW_INTERVAL_IDLE = 1000 * 30  # 30 seconds, used when no countdown is running
+HEADLESS_UPDATE_INTERVAL = 1000 * 30  # 30 seconds, longest sleep between carrier updates in headless mode
 REDRAW_INTERVAL_SLOW = 1000
-REMIND_INTERVAL = 500
+DEADLINE_MAX_SLEEP = 1000 * 60  # 1 minute, longest wait before deadlines are re-checked against the clock
 SAVE_CACHE_INTERVAL = 1000 * 60 * 5  # 5 minutes
+HTTP_CONNECT_TIMEOUT = 5  # seconds
+HTTP_READ_TIMEOUT = 20  # seconds
+HTTP_RETRIES = 2
+HTTP_RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+HTTP_MAX_PER_HOST = 4  # concurrent requests and pooled connections per host
+
+API_HOST = '127.0.0.1'  # the fleet API is local only unless bound elsewhere with --api-host
+API_PORT = 8766
+API_LONG_POLL_MAX = 60  # seconds a long-poll request is held at most
+API_EVENT_BUFFER = 1000  # status transitions kept for /events
+API_SSE_HEARTBEAT = 15  # seconds between keep-alive comments on event streams
+API_GZIP_MIN_SIZE = 1024  # bytes, smaller responses are sent uncompressed
+API_ITINERARY_MAX_LIMIT = 1000  # jumps per itinerary request
+
+METRICS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # seconds, histogram bucket bounds
+BENCHMARK_TOLERANCE = 0.25  # a benchmark regressed when its median is this fraction slower than the baseline
+BENCHMARK_MEMORY_TOLERANCE = 0.10  # same for peak memory
+BENCHMARK_MIN_DELTA = 0.005  # seconds, smaller slowdowns are noise whatever the fraction
+BENCHMARK_MIN_MEMORY_DELTA = 2 ** 20  # bytes, same for peak memory
+
+STATUS_CHANGE_WORKERS = 4  # threads handling carrier status change notifications
+JOURNAL_COALESCE_QUIET = 100  # read once journals were quiet this long
+JOURNAL_COALESCE_MAX = 500  # but never later than this after the first event
+
+DISCORD_REQUEST_TIMEOUT = 10  # seconds
+DISCORD_MAX_ATTEMPTS = 5
+DISCORD_DISPATCHER_IDLE = 60  # seconds before an idle webhook dispatcher thread exits
+DISCORD_BATCH_WINDOW = 0.5  # seconds to wait for more embeds to pack into one message
+DISCORD_OUTBOX_MAX_AGE = timedelta(hours=1)  # undelivered payloads older than this are dropped instead of replayed on start
+
+# how long station cache entries are served without refetching, stale entries are served while being refreshed
+STATION_CACHE_TTL = {
+    'edsm_stations': timedelta(days=1),
+    'spansh_stations': timedelta(days=7),
+    'edsm_market': timedelta(minutes=5),
+}
+# expired entries older than this wait for a fetch instead of being served while refreshing, and are only served when it fails
+STATION_CACHE_MAX_STALE = {
+    'edsm_stations': timedelta(days=30),
+    'spansh_stations': timedelta(days=30),
+    'edsm_market': timedelta(minutes=30),
+}
+STATION_CACHE_MAX_ENTRIES = 5000
+STATION_CACHE_MAX_AGE = timedelta(days=90)  # entries not used for this long are evicted
+STATION_CACHE_EVICT_EVERY = 100  # writes between evictions
+STATION_PREFETCH_WORKERS = 2
+MARKET_FETCH_WORKERS = 4
+
+URGENT_JOURNAL_EVENTS = ['CarrierJumpRequest', 'CarrierJumpCancelled', 'CarrierJump', 'CarrierDecommission', 'CarrierCancelDecommission', 'CarrierStats']
 
 AVG_JUMP_CAL_WINDOW = 8
 
@@ -92,8 +154,16 @@ TOOLTIP_HOVER_DELAY = 500
 TOOLTIP_BACKGROUND = "#1c1c1c"
 TOOLTIP_FOREGROUND = '#ffffff'
 
+# --- External services, the EDCM_*_URL variables point them elsewhere, e.g. at standin_server.py ---
+EDSM_URL = getenv('EDCM_EDSM_URL', 'https://www.edsm.net')
+SPANSH_URL = getenv('EDCM_SPANSH_URL', 'https://spansh.co.uk')
+GITHUB_API_URL = getenv('EDCM_GITHUB_API_URL', 'https://api.github.com')
+PTN_API_URL = getenv('EDCM_PTN_API_URL', 'https://bc.pilotstradenetwork.org')
+TIME_SERVER_URL = getenv('EDCM_TIME_SERVER_URL', 'https://api.orerve.net')
+DISCORD_URL = getenv('EDCM_DISCORD_URL', 'https://discord.com')
+
 # --- Supabase Configuration ---
-SUPABASE_URL = "https://ujpdxqvevfxjivvnlzds.supabase.co"
+SUPABASE_URL = getenv('EDCM_SUPABASE_URL', "https://ujpdxqvevfxjivvnlzds.supabase.co")
 SUPABASE_KEY = "sb_publishable_W7XhQ246tT6rJipPKDMekQ_fOmMoIi2"
 LOCAL_PORT = 58832
 REDIRECT_URL = f"http://127.0.0.1:{LOCAL_PORT}/callback"
\ No newline at end of file
@@ -3,12 +3,11 @@ import os
 import sys
 import threading
 import time
+import random
 from typing import Callable, TYPE_CHECKING
-from realtime import PostgresChangesPayload, AsyncRealtimeClient, RealtimeSubscribeStates
 import pyperclip
 import re
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 from webbrowser import open_new_tab
 # from winotify import Notification TODO: for notification without popup
 from datetime import datetime, timezone, timedelta, date
@@ -18,7 +17,6 @@ from tkinter import Tk, filedialog
 import traceback
 import tomllib
 import pickle
-import asyncio
 import pandas as pd
 from string import Template
 from playsound3 import playsound
@@ -27,41 +25,41 @@ from pystray import Icon, Menu, MenuItem
 from PIL import Image
 from supabase import FunctionsHttpError
 from humanize import naturaltime, ordinal
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from numpy import datetime64
 from auth import AuthHandler
 from settings import Settings, SettingsValidationError
 from model import CarrierModel
-from view import CarrierView, TradePostView, ManualTimerView, MenuOption, TradeHistoryView
-from station_parser import EDSMError, getStations
-from utility import getHammerCountdown, checkTimerFormat, getTimerStatDescription, getCurrentVersion, getLatestVersion, getPrereleaseUpdateVersion, getResourcePath, isOnPrerelease, isUpdateAvailable, getSettingsPath, getSettingsDefaultPath, getSettingsDir, getAppDir, getCachePath, open_file, getInfoHash, getExpectedJumpTimer, getCruiseStatus, getNotesPath
+from journal_worker import JournalWorker, JournalEventHandler
+from status_notifier import StatusNotifier
+from discord_handler import prune_webhook_handlers
+from discord_delivery import replay_pending
+from timer_stats import TimerStatsSubscriber
+from timer_ledger import getTimerLedger
+from deadline_scheduler import DeadlineScheduler
+from api_server import FleetApi
+from metrics import REGISTRY, timed, registerModelMetrics
+from view import CarrierView, TradePostView, ManualTimerView, MenuOption, TradeHistoryView, DiagnosticsView
+from station_parser import EDSMError, getStations, prefetchStations
+from utility import getHammerCountdown, checkTimerFormat, getTimerStatDescription, getCurrentVersion, getLatestVersion, getPrereleaseUpdateVersion, getResourcePath, isOnPrerelease, isUpdateAvailable, getSettingsPath, getSettingsDefaultPath, getSettingsDir, getAppDir, getCachePath, open_file, getInfoHash, getInfoHashes, getCruiseStatus, getNotesPath
 from decos import debounce
-from discord_handler import DiscordWebhookHandler
-from time_checker import TimeChecker
-from config import PLOT_WARN, UPDATE_INTERVAL, UPDATE_INTERVAL_TIMER_STATS, REDRAW_INTERVAL_FAST, REDRAW_INTERVAL_SLOW, REMIND_INTERVAL, PLOT_REMIND, SAVE_CACHE_INTERVAL, ladder_systems, SUPABASE_URL, SUPABASE_KEY, TIME_SKEW_WARN_CD, TIME_SKEW_CHECK_CD
+from time_checker import TimeChecker, SkewEstimator
+from config import PLOT_WARN, UPDATE_INTERVAL, REDRAW_INTERVAL_IDLE, REDRAW_INTERVAL_SLOW, PLOT_REMIND, SAVE_CACHE_INTERVAL, ladder_systems, TIME_SKEW_WARN_CD, TIME_SKEW_CHECK_CD, HTTP_RETRY_BACKOFF, TIMER_HISTORY_CHUNK_SIZE, TIMER_HISTORY_UPLOAD_WORKERS, TIMER_HISTORY_UPLOAD_RETRIES
 
 if TYPE_CHECKING: 
     import tksheet
 
-class JournalEventHandler(FileSystemEventHandler):
-    def __init__(self, controller: 'CarrierController'):
-        self.controller = controller
-    def on_modified(self, event):
-        if not event.is_directory and event.src_path.endswith('.log'):
-            self.controller._schedule_journal_update()
-    on_created = on_modified
-
 class CarrierController:
-    def __init__(self, root:Tk, model:CarrierModel, no_cache:bool=False):
+    def __init__(self, root:Tk, model:CarrierModel, no_cache:bool=False, api:FleetApi|None=None):
         self.root = root
         self.model = model
         self.no_cache = no_cache
+        self.api = api
         self.tray_icon = None
         self.notification_settings = {}
-        self.notification_settings_carrier = {}
         self.webhook_handler = None
-        self.webhook_handler_carrier = {}
         self.auth_handler = AuthHandler()
+        self.timer_ledger = getTimerLedger()
         menu_options: dict[str, list[MenuOption]] = {
             'jumps': [
                 MenuOption('Copy name (ID)', self.menu_click_copy_name_callsign),
@@ -77,8 +75,32 @@ class CarrierController:
             ],
         }
         self.view = CarrierView(root, menu_options=menu_options)
+        self.deadline_scheduler = DeadlineScheduler(root, self.now)
+        registerModelMetrics(lambda: self.model)
+        self.table_refreshers: dict[str, Callable[[datetime], None]] = {
+            'jumps': self.refresh_table_jumps,
+            'trade': self.refresh_table_trade,
+            'finance': self.refresh_table_finance,
+            'services': self.refresh_table_services,
+            'cmdr': self.refresh_table_cmdr,
+            'misc': self.refresh_table_misc,
+            'active_journals': self.refresh_table_active_journals,
+        }
+        self.tables_dirty = set(self.table_refreshers.keys())
+        self._redraw_fast_after_id = None
+        self._redraw_fast_wake = True
+        self._last_redraw_fast = datetime.min.replace(tzinfo=timezone.utc)
+        self.view.tab_controller.bind('<<NotebookTabChanged>>', lambda e: self.refresh_dirty_tables())
+        self.root.bind('<Map>', lambda e: self._on_map() if e.widget is self.root else None, add='+')
         self.model.register_status_change_callback(self.status_change)
+        self.journal_worker = JournalWorker(
+            self.model,
+            on_snapshot=lambda: self.root.after(0, self._apply_journal_snapshot),
+            on_error=lambda tb: self.root.after(0, self._on_journal_update_error, tb),
+        )
+        self.journal_worker.start()
         self.load_settings(getSettingsPath())
+        replay_pending()
         self.timer_stats = {"avg_timer": None, "count": 0, "earliest": None, "latest": None, 'slope': None}
 
         self.view.button_get_hammer.configure(command=self.button_click_hammer)
@@ -111,6 +133,8 @@ class CarrierController:
         self.view.button_clear_cache.configure(command=self.button_click_clear_cache)
         self.view.button_go_to_github.configure(command=lambda: open_new_tab(url='https://github.com/skywalker-elite/Elite-Dangerous-Carrier-Manager'))
         self.view.button_check_time_skew.configure(command=lambda: self.check_time_skew(silent=False))
+        self.view.button_show_diagnostics.configure(command=self.button_click_show_diagnostics)
+        self.view.checkbox_correct_time_skew_var.trace_add('write', lambda *args: self.settings.set_config('time', 'correct_skew', value=self.view.checkbox_correct_time_skew_var.get()))
         self.view.checkbox_show_active_journals_var.trace_add('write', lambda *args: self.settings.set_config('UI', 'show_active_journals_tab', value=self.view.checkbox_show_active_journals_var.get()))
         self.view.checkbox_minimize_to_tray_var.trace_add('write', lambda *args: self.settings.set_config('UI', 'minimize_to_tray', value=self.view.checkbox_minimize_to_tray_var.get()))
         self.view.checkbox_minimize_to_tray.configure(command=lambda: self.setup_tray_icon())
@@ -125,7 +149,7 @@ class CarrierController:
         self.update_journals()
 
         self._observer = Observer()
-        handler = JournalEventHandler(self)
+        handler = JournalEventHandler(self._schedule_journal_update)
         for jp in self.model.journal_paths:
             watch_dir = jp if os.path.isdir(jp) else os.path.dirname(jp)
             self._observer.schedule(handler, watch_dir, recursive=False)
@@ -136,15 +160,16 @@ class CarrierController:
         self.last_time_skew_check = datetime.min
         self.last_time_skew_warned = datetime.min
         self.time_skew_warning_suppressed = False
-        self.time_checker = TimeChecker()
-        self.check_time_skew()
+        self._executioner = ThreadPoolExecutor(max_workers=1)
+        self.skew_estimator = SkewEstimator(TimeChecker(), on_estimate=lambda: self.view.root.after(0, self.check_time_skew))
+        self.skew_estimator.start()
 
         self.set_current_version()
         self.redraw_fast()
         self.redraw_slow()
-        threading.Thread(target=self.update_timer_stat_loop, daemon=True).start()
-        self.view.update_table_active_journals(self.model.get_data_active_journals())
-        # self._start_realtime_listener()
+        self.timer_stats_subscriber = TimerStatsSubscriber(on_stats=self.update_timer_stat)
+        self.timer_stats_subscriber.start()
+        self.refresh_tables(['active_journals'], self.now())
         self.check_app_update()
         self.minimize_hint_sent = False
 
@@ -163,17 +188,23 @@ class CarrierController:
 
         self.save_window_size_on_resize()
 
-    def _schedule_journal_update(self):
-        # coalesce rapid events
-        if getattr(self, '_journal_update_pending', False):
+    def _schedule_journal_update(self, journal:str|None=None):
+        # the worker coalesces rapid events into a single read
+        self.journal_worker.request_update(journal)
+
+    def _apply_journal_snapshot(self):
+        snapshot = self.journal_worker.get_latest_snapshot(self.model)
+        if snapshot is None:
             return
-        self._journal_update_pending = True
-        self.view.root.after(0, self._perform_journal_update)
+        self.model.apply_snapshot(snapshot)
+        self.refresh_tables(['active_journals'], self.now())
+        self.wake_redraw()
 
-    def _perform_journal_update(self):
-        self._journal_update_pending = False
-        self.update_journals()
-        self.view.update_table_active_journals(self.model.get_data_active_journals())
+    def _on_journal_update_error(self, tb:str):
+        if self.view.show_message_box_askretrycancel('Error', f'An error occurred during journal update\n{tb}'):
+            self.view.root.after(UPDATE_INTERVAL, self.journal_worker.request_update)
+        else:
+            self.view.root.destroy()
 
     def set_current_version(self):
         self.view.label_version.configure(text=getCurrentVersion())
@@ -245,144 +276,60 @@ class CarrierController:
         finally:
             if self.settings.validation_warnings:
                 self.view.show_message_box_warning('Settings file warnings', f'{"\n".join(self.settings.validation_warnings)}')
-            self.notification_settings = dict(self.settings.get('notifications'))
-            self.notification_settings.update(dict(self.settings.get('discord')))
-            self.webhook_handler = DiscordWebhookHandler(self.notification_settings.get('webhook'), self.notification_settings.get('userID'))
-            self.webhook_handler_public = DiscordWebhookHandler(self.notification_settings.get('webhook_public'), self.notification_settings.get('userID'))
-            for override in self.settings.get('advanced', 'carrier_notification_overrides'):
-                for callsign in override:
-                    print(f'Applying notification overrides for carrier {callsign}')
-                    print(override[callsign])
-                    carrier_notification_settings = self.notification_settings.copy()
-                    for key, value in override[callsign].items():
-                        if key in carrier_notification_settings:
-                            carrier_notification_settings[key] = value
-                        elif key == 'notify_while_ignored':
-                            # special case, not part of notification settings
-                            pass
-                        else:
-                            print(f'Warning: unknown setting {key} in override for carrier {callsign}')
-                            self.view.show_message_box_warning('Warning', f'Unknown setting {key} in override for carrier {callsign}')
-                    self.notification_settings_carrier[callsign] = carrier_notification_settings
-                    if carrier_notification_settings.get('webhook') != self.notification_settings.get('webhook') or carrier_notification_settings.get('userID') != self.notification_settings.get('userID'):
-                        self.webhook_handler_carrier[callsign] = DiscordWebhookHandler(carrier_notification_settings.get('webhook'), carrier_notification_settings.get('userID'))
-                        self.webhook_handler_carrier[callsign + '_public'] = DiscordWebhookHandler(carrier_notification_settings.get('webhook_public'), carrier_notification_settings.get('userID'))
+            self.status_notifier = StatusNotifier(self.settings, on_warning=lambda message: self.view.show_message_box_warning('Warning', message))
+            prune_webhook_handlers(self.status_notifier.get_all_webhook_handlers())
+            self.notification_settings = self.status_notifier.notification_settings
+            self.webhook_handler = self.status_notifier.webhook_handler
             self.apply_settings_to_model()
+            self.schedule_manual_timer_deadlines()
             self.view.set_font_size(self.settings.get('font_size', 'UI'), self.settings.get('font_size', 'table'))
             self.root.geometry(self.settings.get('UI', 'window_size'))
             self.view.checkbox_filter_ghost_buys_var.set(self.settings.get('Trade', 'filter_ghost_buys'))
             self.view.checkbox_show_active_journals_var.set(self.settings.get('UI', 'show_active_journals_tab'))
             self.view.checkbox_minimize_to_tray_var.set(self.settings.get('UI', 'minimize_to_tray'))
+            self.view.checkbox_correct_time_skew_var.set(self.settings.get('time', 'correct_skew'))
             self.setup_tray_icon()
 
     def apply_settings_to_model(self):
-        self.model.reset_ignore_list()
-        self.model.reset_sfc_whitelist()
-        self.model.add_sfc_whitelist(self.settings.get('squadron_carriers', 'whitelist'))
-        self.model.add_ignore_list(self.settings.get('advanced', 'ignore_list'))
-        self.model.reset_notify_while_ignored_list()
-        for override in self.settings.get('advanced', 'carrier_notification_overrides'):
-            for callsign in override:
-                if override[callsign].get('notify_while_ignored', False):
-                    self.model.add_notify_while_ignored_list(callsign)
-        self.model.set_custom_order(self.settings.get('advanced', 'custom_order'))
-        self.model.set_squadron_abbv_mapping(self.settings.get('name_customization', 'squadron_abbv'))
-        self.model.read_journals() # re-read journals to apply ignore list and custom order
+        self.model.apply_settings(self.settings)
+        # the worker publishes a snapshot with the settings applied
+        self.journal_worker.request_update(urgent=True)
     
     def status_change(self, carrierID:int, status_old:str, status_new:str):
         # print(f'{self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) status changed from {status_old} to {status_new}')
-        callsign = self.model.get_callsign(carrierID)
-        notification_settings = self.notification_settings_carrier.get(callsign, self.notification_settings)
-        carrier_webhook_handler: DiscordWebhookHandler = self.webhook_handler_carrier.get(callsign, self.webhook_handler)
-        carrier_webhook_handler_public: DiscordWebhookHandler = self.webhook_handler_carrier.get(callsign + '_public', self.webhook_handler_public)
+        notification_settings = self.status_notifier.get_notification_settings(self.model.get_callsign(carrierID))
         if status_new == 'jumping':
             # jump plotted
-            # print(f'{self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) plotted jump to {self.model.get_destination_system(carrierID)} body {self.model.get_destination_body(carrierID)}')
             if notification_settings.get('jump_plotted'):
                 self.view.show_non_blocking_info('Jump plotted', f'{self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) plotted jump to {self.model.get_destination_system(carrierID, use_custom_name=True)} body {self.model.get_destination_body(carrierID)}')
             if notification_settings.get('jump_plotted_sound'):
                 self.play_sound(notification_settings.get('jump_plotted_sound_file'))
-            censor_mode = self.model.get_current_system(carrierID) in ['HD 105341','HIP 58832'] or self.model.get_destination_system(carrierID) in ['HD 105341','HIP 58832']
-            if notification_settings.get('jump_plotted_discord'):
-                carrier_webhook_handler.send_jump_status_embed(
-                    status='jump_plotted', name=self.model.get_name(carrierID), callsign=self.model.get_callsign(carrierID), 
-                    current_system=self.model.get_current_system(carrierID, use_custom_name=True), current_body=self.model.get_current_body(carrierID),
-                    other_system=self.model.get_destination_system(carrierID, use_custom_name=True), other_body=self.model.get_destination_body(carrierID),
-                    timestamp=None if censor_mode else self.model.get_departure_hammer_countdown(carrierID), ping=notification_settings.get('jump_plotted_discord_ping'))
-            if notification_settings.get('jump_plotted_discord_public'):
-                if not censor_mode:
-                    carrier_webhook_handler_public.send_jump_status_embed(
-                        status='jump_plotted', name=self.model.get_name(carrierID), callsign=self.model.get_callsign(carrierID), 
-                        current_system=self.model.get_current_system(carrierID, use_custom_name=True), current_body=self.model.get_current_body(carrierID),
-                        other_system=self.model.get_destination_system(carrierID, use_custom_name=True), other_body=self.model.get_destination_body(carrierID),
-                        timestamp=self.model.get_departure_hammer_countdown(carrierID), ping=notification_settings.get('jump_plotted_discord_public_ping'))
-            if self.settings.get('timer_reporting', 'enabled'):
-                self.report_jump_timer(carrierID)
         elif status_new == 'cool_down':
             # jump completed
-            # print(f'{self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) has arrived at {self.model.get_current_system(carrierID)} body {self.model.get_current_body(carrierID)}')
             if notification_settings.get('jump_completed'):
                 self.view.show_non_blocking_info('Jump completed', f'{self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) has arrived at {self.model.get_current_system(carrierID, use_custom_name=True)} body {self.model.get_current_body(carrierID)}')
             if notification_settings.get('jump_completed_sound'):
                 self.play_sound(notification_settings.get('jump_completed_sound_file'))
-            censor_mode = self.model.get_current_system(carrierID) in ['HD 105341','HIP 58832'] or self.model.get_previous_system(carrierID) in ['HD 105341','HIP 58832']
-            if notification_settings.get('jump_completed_discord'):
-                carrier_webhook_handler.send_jump_status_embed(
-                    status='jump_completed', name=self.model.get_name(carrierID), callsign=self.model.get_callsign(carrierID), 
-                    current_system=self.model.get_current_system(carrierID, use_custom_name=True), current_body=self.model.get_current_body(carrierID),
-                    other_system=self.model.get_previous_system(carrierID, use_custom_name=True), other_body=self.model.get_previous_body(carrierID),
-                    timestamp=self.model.get_cooldown_hammer_countdown(carrierID), ping=notification_settings.get('jump_completed_discord_ping'))
-            if notification_settings.get('jump_completed_discord_public'):
-                if not censor_mode:
-                    carrier_webhook_handler_public.send_jump_status_embed(
-                        status='jump_completed', name=self.model.get_name(carrierID), callsign=self.model.get_callsign(carrierID), 
-                        current_system=self.model.get_current_system(carrierID, use_custom_name=True), current_body=self.model.get_current_body(carrierID),
-                        other_system=self.model.get_previous_system(carrierID, use_custom_name=True), other_body=self.model.get_previous_body(carrierID),
-                        timestamp=self.model.get_cooldown_hammer_countdown(carrierID), ping=notification_settings.get('jump_completed_discord_public_ping'))
         elif status_new == 'cool_down_cancel':
             # jump cancelled
-            # print(f'{self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) cancelled a jump')
             if notification_settings.get('jump_cancelled'):
                 self.view.show_non_blocking_info('Jump cancelled', f'{self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) cancelled a jump')
             if notification_settings.get('jump_cancelled_sound'):
                 self.play_sound(notification_settings.get('jump_cancelled_sound_file'))
-            censor_mode = self.model.get_current_system(carrierID) in ['HD 105341','HIP 58832'] or self.model.get_previous_system(carrierID) in ['HD 105341','HIP 58832']
-            if notification_settings.get('jump_cancelled_discord'):
-                carrier_webhook_handler.send_jump_status_embed(
-                    status='jump_cancelled', name=self.model.get_name(carrierID), callsign=self.model.get_callsign(carrierID), 
-                    current_system=self.model.get_current_system(carrierID, use_custom_name=True), current_body=self.model.get_current_body(carrierID),
-                    other_system=None, other_body=None,
-                    timestamp=self.model.get_cooldown_cancel_hammer_countdown(carrierID), ping=notification_settings.get('jump_cancelled_discord_ping'))
-            if notification_settings.get('jump_cancelled_discord_public'):
-                if not censor_mode:
-                    carrier_webhook_handler_public.send_jump_status_embed(
-                        status='jump_cancelled', name=self.model.get_name(carrierID), callsign=self.model.get_callsign(carrierID), 
-                        current_system=self.model.get_current_system(carrierID, use_custom_name=True), current_body=self.model.get_current_body(carrierID),
-                        other_system=None, other_body=None,
-                        timestamp=self.model.get_cooldown_cancel_hammer_countdown(carrierID), ping=notification_settings.get('jump_cancelled_discord_public_ping'))
         elif status_new == 'idle' and status_old in ['cool_down', 'cool_down_cancel']:
             # cool down complete
-            # print(f'{self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) has finished cool down and is ready to jump')
             if notification_settings.get('cooldown_finished'):
                 self.view.show_non_blocking_info('Cool down complete', f'{self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) has finished cool down and is ready to jump')
             if notification_settings.get('cooldown_finished_sound'):
                 self.play_sound(notification_settings.get('cooldown_finished_sound_file'))
-            censor_mode = self.model.get_current_system(carrierID) in ['HD 105341','HIP 58832']
-            if notification_settings.get('cooldown_finished_discord'):
-                carrier_webhook_handler.send_jump_status_embed(
-                    status='cooldown_finished', name=self.model.get_name(carrierID), callsign=self.model.get_callsign(carrierID), 
-                    current_system=self.model.get_current_system(carrierID, use_custom_name=True), current_body=self.model.get_current_body(carrierID),
-                    other_system=None, other_body=None,
-                    timestamp=self.model.get_cooldown_hammer_countdown(carrierID) if status_old == 'cool_down' else self.model.get_cooldown_cancel_hammer_countdown(carrierID) if status_old == 'cool_down_cancel' else None, 
-                    ping=notification_settings.get('cooldown_finished_discord_ping'))
-            if notification_settings.get('cooldown_finished_discord_public'):
-                if not censor_mode:
-                    carrier_webhook_handler_public.send_jump_status_embed(
-                        status='cooldown_finished', name=self.model.get_name(carrierID), callsign=self.model.get_callsign(carrierID), 
-                        current_system=self.model.get_current_system(carrierID, use_custom_name=True), current_body=self.model.get_current_body(carrierID),
-                        other_system=None, other_body=None,
-                        timestamp=self.model.get_cooldown_hammer_countdown(carrierID) if status_old == 'cool_down' else self.model.get_cooldown_cancel_hammer_countdown(carrierID) if status_old == 'cool_down_cancel' else None, 
-                        ping=notification_settings.get('cooldown_finished_discord_public_ping'))
+        self.status_notifier.send_discord(self.model, carrierID, status_old, status_new)
+        if status_new == 'jumping':
+            if self.settings.get('timer_reporting', 'enabled'):
+                self.report_jump_timer(carrierID)
+            destination_system = self.model.get_destination_system(carrierID)
+            if destination_system is not None:
+                # warm the station lists so a trade post on arrival only needs to fetch the market
+                prefetchStations(destination_system)
 
     def play_sound(self, sound_file:str, block:bool=False):
         if path.exists(sound_file):
@@ -407,27 +354,66 @@ class CarrierController:
                 self.view.show_message_box_warning('Error', f'Error while resetting settings\n{traceback.format_exc()}')
     
     def update_tables_fast(self, now):
+        # status change detection keeps running even when nothing is visible
         self.model.update_carriers(now)
-        self.view.update_table_jumps(self.model.get_data(now), self.model.get_rows_pending_decom())
+        self.schedule_carrier_deadlines(now)
+        if self.api is not None:
+            self.api.publish()
+        self.refresh_tables(['jumps'], now)
     
     def update_tables_slow(self, now):
-        pending_decom = self.model.get_rows_pending_decom()
-        self.view.update_table_finance(self.model.get_data_finance(), pending_decom)
-        self.view.update_table_trade(*self.model.get_data_trade(filter_ghost_buys=self.view.checkbox_filter_ghost_buys_var.get())) #TODO: reduce update rate for performance
-        self.view.update_table_services(self.model.get_data_services(), pending_decom) #TODO: reduce update rate for performance
-        self.view.update_table_cmdr(self.model.get_data_cmdr()) #TODO: reduce update rate for performance
-        self.view.update_table_misc(self.model.get_data_misc(), pending_decom) #TODO: reduce update rate for performance
+        self.refresh_tables(['finance', 'trade', 'services', 'cmdr', 'misc'], now)
+
+    def is_table_visible(self, name:str) -> bool:
+        return self.view.is_window_visible() and self.view.get_selected_tab() == name
+
+    def refresh_tables(self, names:list[str], now:datetime):
+        """
+        Rebuild the tables that are currently on screen, the rest are marked
+        dirty and rebuilt once their tab is selected or the window is restored.
+        """
+        for name in names:
+            if self.is_table_visible(name):
+                self.table_refreshers[name](now)
+                self.tables_dirty.discard(name)
+            else:
+                self.tables_dirty.add(name)
+
+    def _on_map(self):
+        self.refresh_dirty_tables()
+        self.wake_redraw()
+
+    def refresh_dirty_tables(self):
+        name = self.view.get_selected_tab()
+        if name in self.tables_dirty and self.view.is_window_visible():
+            self.refresh_tables([name], self.now())
+
+    def refresh_table_jumps(self, now):
+        self.view.update_table_jumps(self.model.get_data(now), self.model.get_rows_pending_decom())
+
+    def refresh_table_trade(self, now):
+        self.view.update_table_trade(*self.model.get_data_trade(filter_ghost_buys=self.view.checkbox_filter_ghost_buys_var.get()))
+
+    def refresh_table_finance(self, now):
+        self.view.update_table_finance(self.model.get_data_finance(), self.model.get_rows_pending_decom())
+
+    def refresh_table_services(self, now):
+        self.view.update_table_services(self.model.get_data_services(), self.model.get_rows_pending_decom())
+
+    def refresh_table_cmdr(self, now):
+        self.view.update_table_cmdr(self.model.get_data_cmdr())
+
+    def refresh_table_misc(self, now):
+        self.view.update_table_misc(self.model.get_data_misc(), self.model.get_rows_pending_decom())
+
+    def refresh_table_active_journals(self, now):
+        self.view.update_table_active_journals(self.model.get_data_active_journals())
 
     def update_time(self, now):
         self.view.update_time(now.strftime('%H:%M:%S'))
 
-    def update_timer_stat_loop(self):
-        while True:
-            self.update_timer_stat()
-            time.sleep(UPDATE_INTERVAL_TIMER_STATS / 1000)
-
-    def update_timer_stat(self, payload:PostgresChangesPayload|None=None):
-        self.timer_stats["avg_timer"], self.timer_stats["count"], self.timer_stats["earliest"], self.timer_stats["latest"], self.timer_stats["slope"] = getExpectedJumpTimer()
+    def update_timer_stat(self, stats:tuple):
+        self.timer_stats["avg_timer"], self.timer_stats["count"], self.timer_stats["earliest"], self.timer_stats["latest"], self.timer_stats["slope"] = stats
     
     def update_journals(self):
         try:
@@ -445,30 +431,41 @@ class CarrierController:
             return
         if self.time_skew_warning_suppressed and silent:
             return
-        if not silent:
-            progress_win, progress_bar = self.view.show_indeterminate_progress_bar('Checking time skew', 'Checking system time against game server...')
-        self._executioner = ThreadPoolExecutor(max_workers=1)
-        future_skew = self._executioner.submit(self.time_checker.check_and_warn)
+        if silent:
+            # the estimator keeps sampling in the background, no need to wait for the network
+            try:
+                warn, message = self.skew_estimator.check_and_warn()
+            except RuntimeError:
+                return
+            self.last_time_skew_check = datetime.now()
+            if warn:
+                self.time_skew_warning_suppressed = self.view.show_message_box_warning_checkbox('Time Skew Warning', message, 'Don\'t show this warning again for the rest of this session', checkbox_value=self.time_skew_warning_suppressed)
+                self.last_time_skew_warned = datetime.now()
+            return
+        progress_win, progress_bar = self.view.show_indeterminate_progress_bar('Checking time skew', 'Checking system time against game server...')
+        future_skew = self._executioner.submit(self.skew_estimator.check_and_warn, refresh=True)
         def handle_skew_result(future):
-            if not silent:
-                    progress_win.destroy()
+            progress_win.destroy()
             try:
                 warn, message = future.result()
                 if warn:
-                    if silent:
-                        self.time_skew_warning_suppressed = self.view.show_message_box_warning_checkbox('Time Skew Warning', message, 'Don\'t show this warning again for the rest of this session', checkbox_value=self.time_skew_warning_suppressed)
-                    else:
-                        self.view.show_message_box_warning('Time Skew Warning', message)
+                    self.view.show_message_box_warning('Time Skew Warning', message)
                     self.last_time_skew_warned = datetime.now()
-                elif not silent:
+                else:
                     self.view.show_message_box_info('Time Skew Check', message)
                 self.last_time_skew_check = datetime.now()
             except Exception as e:
                 print(f'Error checking time skew: {e}')
-                if not silent:
-                    self.view.show_message_box_warning('Time Skew Check Error', f'Error checking time skew:\n{e}')
+                self.view.show_message_box_warning('Time Skew Check Error', f'Error checking time skew:\n{e}')
+
+        future_skew.add_done_callback(lambda future: self.view.root.after(0, handle_skew_result, future))
 
-        future_skew.add_done_callback(handle_skew_result)
+    def now(self) -> datetime:
+        """Current UTC time, on the game server's clock if time skew correction is enabled"""
+        now = datetime.now(timezone.utc)
+        if self.settings.get('time', 'correct_skew'):
+            now -= self.skew_estimator.get_correction()
+        return now
     
     def button_click_hammer(self):
         selected_row = self.get_selected_row()
@@ -483,7 +480,7 @@ class CarrierController:
             else:
                 self.view.show_message_box_warning('Error', f'No jump data found for {carrier_name} ({carrier_callsign})')
         else:
-            hammer_countdown = getHammerCountdown(datetime64(datetime.now(timezone.utc).replace(tzinfo=None)))
+            hammer_countdown = getHammerCountdown(datetime64(self.now().replace(tzinfo=None)))
             self.copy_to_clipboard(hammer_countdown, 'Success!', f'No carrier selected, hammertime countdown for current time copied!')
 
     def button_click_post_trade(self):
@@ -654,6 +651,11 @@ class CarrierController:
             trade_history_view = TradeHistoryView(self.view.root, data=data.values.tolist(), total=total, loads=loads, unloads=unloads, carrier_name=carrier_name, window_size=self.settings.get('UI', 'window_size'))
             trade_history_view.button_export_csv.configure(command=lambda: self.save_df_as_csv(data, file_name=f'trade_history_{carrier_name}.csv'))
 
+    def button_click_show_diagnostics(self):
+        diagnostics_view = DiagnosticsView(self.view.root, data=REGISTRY.get_rows(), window_size=self.settings.get('UI', 'window_size'))
+        diagnostics_view.button_refresh.configure(command=lambda: diagnostics_view.update_data(REGISTRY.get_rows()))
+        diagnostics_view.button_copy_metrics.configure(command=lambda: self.copy_to_clipboard(REGISTRY.render_prometheus(), None, None))
+
     def save_df_as_csv(self, data: pd.DataFrame, file_name: str=None):
         file_path = filedialog.asksaveasfilename(defaultextension='.csv', filetypes=[('CSV files', '*.csv')], initialfile=file_name, title='Save trade history as CSV', parent=self.view.root)
         if file_path:
@@ -759,7 +761,8 @@ class CarrierController:
 
     def button_click_test_discord_webhook(self):
         try:
-            self.webhook_handler.send_message_with_embed('Test', 'If you see this, the webhook is working')
+            for future in self.webhook_handler.send_message_with_embed('Test', 'If you see this, the webhook is working'):
+                future.result()
         except Exception as e:
             self.view.show_message_box_warning('Error', f'Error while sending discord webhook\n{e}')
         else:
@@ -767,7 +770,8 @@ class CarrierController:
 
     def button_click_test_discord_webhook_ping(self):
         try:
-            self.webhook_handler.send_message_with_embed('', '', image_url='https://c.tenor.com/HwA2vshx6AgAAAAd/tenor.gif', ping=True)
+            for future in self.webhook_handler.send_message_with_embed('', '', image_url='https://c.tenor.com/HwA2vshx6AgAAAAd/tenor.gif', ping=True):
+                future.result()
         except Exception as e:
             self.view.show_message_box_warning('Error', f'Error while sending discord ping\n{e}')
         else:
@@ -812,6 +816,8 @@ class CarrierController:
                 carrierID = self.model.sorted_ids_display()[row]
                 if carrierID in self.model.manual_timers:
                     self.model.manual_timers.pop(carrierID)
+            self.schedule_manual_timer_deadlines()
+            self.wake_redraw()
         else:
             self.view.show_message_box_warning('Warning', 'Please select at least one carrier!')
 
@@ -820,8 +826,8 @@ class CarrierController:
             carrierID = self.manual_timer_view.carrierID
             timer = self.manual_timer_view.entry_timer.get()
             timer = datetime.strptime(timer, '%H:%M:%S').replace(tzinfo=timezone.utc).time()
-            timer = datetime.combine(datetime.now(timezone.utc).date(), timer, tzinfo=timezone.utc)
-            now_utc = datetime.now(timezone.utc)
+            now_utc = self.now()
+            timer = datetime.combine(now_utc.date(), timer, tzinfo=timezone.utc)
             if timer < now_utc:
                 timer += timedelta(days=1)
             if timer - now_utc > timedelta(days=1):
@@ -833,10 +839,10 @@ class CarrierController:
                     self.manual_timer_view.popup.focus_force()
                     self.manual_timer_view.entry_timer.focus()
                     return
-            if len(self.model.manual_timers) == 0:
-                self.view.root.after(REMIND_INTERVAL, self.check_manual_timer)
             self.model.manual_timers[carrierID] = {'time': timer, 'reminded': False, 'plot_warned': False}
+            self.schedule_manual_timer_deadlines()
             self.manual_timer_view.popup.destroy()
+            self.wake_redraw()
             self.check_time_skew(silent=True)
     
     def button_click_post_departure(self):
@@ -889,7 +895,7 @@ class CarrierController:
         selected_row = self.get_selected_row(self.view.sheet_cmdr)
         if selected_row is not None:
             carrierID = self.model.sorted_ids_display()[selected_row]
-            fid = self.model.carrier_owners.get(carrierID, None)
+            fid = self.model.snapshot.carrier_owners.get(carrierID, None)
             if fid is not None:
                 system, _ = self.model.get_cmdr_current_location(fid)
                 if system is not None:
@@ -906,7 +912,7 @@ class CarrierController:
         selected_row = self.get_selected_row(self.view.sheet_cmdr)
         if selected_row is not None:
             carrierID = self.model.sorted_ids_display()[selected_row]
-            fid = self.model.carrier_owners.get(carrierID, None)
+            fid = self.model.snapshot.carrier_owners.get(carrierID, None)
             if fid is not None:
                 system, station = self.model.get_cmdr_current_location(fid)
                 if station is not None:
@@ -943,46 +949,86 @@ class CarrierController:
         else:
             self.view.show_message_box_warning('Warning', 'Please select one row.')
 
-    def check_manual_timer(self):
-        now = datetime.now(timezone.utc)
+    def schedule_manual_timer_deadlines(self):
         remind = timedelta(seconds=self.settings.get('plot_reminders', 'remind_seconds'))
         warn = timedelta(seconds=self.settings.get('plot_reminders', 'warn_seconds'))
         clear = timedelta(seconds=self.settings.get('plot_reminders', 'clear_seconds'))
-        for carrierID in self.model.sorted_ids():
-            timer = self.model.manual_timers.get(carrierID, None)
-            if timer is None:
-                continue
-            if timer['time'] + clear <= now:
-                self.model.manual_timers.pop(carrierID)
-                continue
-            elif timer['time'] - warn <= now and not timer['plot_warned']:
-                timer['plot_warned'] = True
-                m, s = divmod(warn.total_seconds(), 60)
-                self.view.show_message_box_info('Plot imminent!', f'Plot {self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) in {m:02.0f} m {s:02.0f} s', grab_focus=False, topmost=True)
-            elif timer['time'] - remind <= now and not timer['reminded']:
-                timer['reminded'] = True
-                m, s = divmod(remind.total_seconds(), 60)
-                self.view.show_message_box_info('Get ready!', f'Be ready to plot {self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) in {m:02.0f} m {s:02.0f} s', grab_focus=False, topmost=True)
-        if len(self.model.manual_timers) > 0:
-            self.view.root.after(REMIND_INTERVAL, self.check_manual_timer)
+        deadlines = {}
+        for carrierID, timer in self.model.manual_timers.items():
+            if not timer['reminded']:
+                deadlines[(carrierID, 'remind')] = (timer['time'] - remind, lambda carrierID=carrierID: self.remind_manual_timer(carrierID, remind, warn))
+            if not timer['plot_warned']:
+                deadlines[(carrierID, 'warn')] = (timer['time'] - warn, lambda carrierID=carrierID: self.warn_manual_timer(carrierID, warn))
+            deadlines[(carrierID, 'clear')] = (timer['time'] + clear, lambda carrierID=carrierID: self.clear_manual_timer(carrierID))
+        self.deadline_scheduler.sync('manual_timer', deadlines)
+
+    def remind_manual_timer(self, carrierID: int, remind: timedelta, warn: timedelta):
+        timer = self.model.manual_timers.get(carrierID, None)
+        if timer is None or timer['reminded']:
+            return
+        timer['reminded'] = True
+        if timer['plot_warned'] or timer['time'] - warn <= self.now():
+            return  # set too late to remind, the plot warning covers it
+        m, s = divmod(remind.total_seconds(), 60)
+        self.view.show_message_box_info('Get ready!', f'Be ready to plot {self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) in {m:02.0f} m {s:02.0f} s', grab_focus=False, topmost=True)
+
+    def warn_manual_timer(self, carrierID: int, warn: timedelta):
+        timer = self.model.manual_timers.get(carrierID, None)
+        if timer is None or timer['plot_warned']:
+            return
+        timer['plot_warned'] = True
+        m, s = divmod(warn.total_seconds(), 60)
+        self.view.show_message_box_info('Plot imminent!', f'Plot {self.model.get_name(carrierID)} ({self.model.get_callsign(carrierID)}) in {m:02.0f} m {s:02.0f} s', grab_focus=False, topmost=True)
+
+    def clear_manual_timer(self, carrierID: int):
+        self.model.manual_timers.pop(carrierID, None)
+        self.wake_redraw()
+
+    def schedule_carrier_deadlines(self, now: datetime):
+        # status changes are detected by update_carriers, run it right when the next one is due
+        deadlines = {(carrierID, kind): (when, self.wake_redraw) for when, carrierID, kind in self.model.get_upcoming_deadlines(now)}
+        self.deadline_scheduler.sync('carrier', deadlines)
     
     def redraw_fast(self):
+        self._redraw_fast_after_id = None
         try:
-            now = datetime.now(timezone.utc)
-            self.update_tables_fast(now)
-            self.update_time(now)
-            self.redraw_timer_stat()
+            now = self.now()
+            # countdowns need a rebuild every second, an idle fleet only changes on journal events
+            if self._redraw_fast_wake or self.model.has_active_timer() or now - self._last_redraw_fast >= timedelta(milliseconds=REDRAW_INTERVAL_IDLE):
+                self._redraw_fast_wake = False
+                self._last_redraw_fast = now
+                self.update_tables_fast(now)
+            if self.view.is_window_visible():
+                self.update_time(now)
+                self.redraw_timer_stat()
         except Exception as e:
             if self.view.show_message_box_askretrycancel('Error', f'An error occurred\n{traceback.format_exc()}'):
-                self.view.root.after(REDRAW_INTERVAL_FAST, self.redraw_fast)
+                self.schedule_redraw_fast()
             else:
                 self.view.root.destroy()
         else:
-            self.view.root.after(REDRAW_INTERVAL_FAST, self.redraw_fast)
+            self.schedule_redraw_fast()
+
+    def schedule_redraw_fast(self):
+        if self._redraw_fast_after_id is not None:
+            self.view.root.after_cancel(self._redraw_fast_after_id)
+        if self.view.is_window_visible():
+            # land just after the next whole second so countdowns and the clock tick together
+            delay = 1000 - self.now().microsecond // 1000 + 5
+        else:
+            delay = REDRAW_INTERVAL_IDLE
+        self._redraw_fast_after_id = self.view.root.after(delay, self.redraw_fast)
+
+    def wake_redraw(self):
+        """Redraw as soon as the Tk loop is idle, e.g. after a journal event"""
+        self._redraw_fast_wake = True
+        if self._redraw_fast_after_id is not None:
+            self.view.root.after_cancel(self._redraw_fast_after_id)
+        self._redraw_fast_after_id = self.view.root.after(0, self.redraw_fast)
     
     def redraw_slow(self):
         try:
-            now = datetime.now(timezone.utc)
+            now = self.now()
             self.update_tables_slow(now)
         except Exception as e:
             if self.view.show_message_box_askretrycancel('Error', f'An error occurred\n{traceback.format_exc()}'):
@@ -990,50 +1036,11 @@ class CarrierController:
             else:
                 self.view.root.destroy()
         else:
-            self.view.root.after(REDRAW_INTERVAL_SLOW, self.redraw_slow)
+            self.view.root.after(REDRAW_INTERVAL_SLOW if self.view.is_window_visible() else REDRAW_INTERVAL_IDLE, self.redraw_slow)
 
     def redraw_timer_stat(self):
         self.view.update_timer_stat(getTimerStatDescription(self.timer_stats["avg_timer"], self.timer_stats["count"], self.timer_stats["earliest"], self.timer_stats["latest"], self.timer_stats["slope"]))
 
-    # def _start_realtime_listener(self):
-    #     self._realtime_loop = asyncio.new_event_loop()
-    #     t = threading.Thread(target=self._realtime_loop.run_forever, daemon=True)
-    #     t.start()
-    #     asyncio.run_coroutine_threadsafe(self._realtime_handler(), self._realtime_loop)
-
-    # async def _realtime_handler(self):
-    #     url = f"{SUPABASE_URL}/realtime/v1"
-    #     token = SUPABASE_KEY
-    #     backoff = 1
-    #     while True:
-    #         try:
-    #             client = AsyncRealtimeClient(url=url, token=token)
-    #             ch = client.channel("public:jump_timers_public")
-    #             ch.on_postgres_changes(
-    #                 event="*", schema="public", table="jump_timers_public",
-    #                 callback=self.update_timer_stat
-    #             )
-    #             await ch.subscribe(callback=self._subscription_state_change)
-    #             print("Realtime subscription established")
-    #             while client.is_connected:
-    #                 await asyncio.sleep(1)
-    #             raise RuntimeError("Realtime client disconnected")
-    #         except Exception as e:
-    #             print(f"[realtime] subscription error: {e}, reconnecting in {backoff}s…")
-    #             await asyncio.sleep(backoff)
-    #             backoff = min(backoff * 2, 30)
-
-    # def _subscription_state_change(self, state: RealtimeSubscribeStates, exception: Exception | None):
-    #     # just logging
-    #     if state is RealtimeSubscribeStates.TIMED_OUT:
-    #         print(f"Subscription timed out{f', exception={exception!r}' if exception else ''}")
-    #     elif state in (RealtimeSubscribeStates.CLOSED, RealtimeSubscribeStates.CHANNEL_ERROR):
-    #         print(f"Subscription closed{f', exception={exception!r}' if exception else ''}")
-    #     elif state is RealtimeSubscribeStates.SUBSCRIBED:
-    #         print("Subscription successful")
-    #     else:
-    #         print(f"Subscription state={state}, exception={exception!r}")
-
     def get_selected_row(self, sheet=None, allow_multiple:bool=False) -> int|tuple[int]|None:
         if sheet is None:
             sheet = self.view.sheet_jumps
@@ -1061,11 +1068,15 @@ class CarrierController:
         else:
             self.view.root.after(0, self.view.show_message_box_warning, 'Warning', 'Cache path is not set, cannot save cache')
 
+    @timed('edcm_cache_save_seconds', 'Pickling and writing the journal cache')
     def _save_cache(self, cache_path:str):
         if cache_path is not None:
             makedirs(path.dirname(cache_path), exist_ok=True)
+            # the journal worker mutates the reader, pickle a consistent state
+            with self.model.read_lock:
+                data = pickle.dumps(self.model.journal_reader)
             with open(cache_path, 'wb') as f:
-                pickle.dump(self.model.journal_reader, f)
+                f.write(data)
 
     def button_click_clear_cache(self):
         cache_path = getCachePath(self.model.journal_reader.version, self.model.journal_reader.journal_paths)
@@ -1088,6 +1099,11 @@ class CarrierController:
             progress_win.update()
             time.sleep(0.0001)
         progress_win.destroy()
+        self.journal_worker.set_model(self.model)
+        if self.api is not None:
+            self.api.set_model(self.model)
+        self.schedule_manual_timer_deadlines()
+        self.wake_redraw()
         if not self.no_cache:
             self.save_cache()
 
@@ -1128,6 +1144,7 @@ class CarrierController:
                                                     'This action cannot be undone.'):
                 if self.view.show_message_box_askyesno('Delete Account', 'This will also delete all your data, including all the jump timers you\'ve ever reported.\n'
                                                          'Are you really sure you want to delete your account?'):
+                    user_id = self._get_ledger_user_id()
                     try:
                         response = self.auth_handler.invoke_edge("delete-account")
                         if 'error' in response:
@@ -1135,6 +1152,9 @@ class CarrierController:
                     except Exception as e:
                         self.view.show_message_box_warning('Error', f"Error deleting account: {e}")
                     else:
+                        if user_id is not None:
+                            # the reported timers are gone from the server too
+                            self.timer_ledger.clear(user_id)
                         self.view.show_message_box_info('Success!', 'Your account and data has been deleted successfully')
                         self.auth_handler.logout()
 
@@ -1171,12 +1191,23 @@ class CarrierController:
             jump_plot_timestamp = self.model.get_latest_jump_plot(carrierID)
             latest_departure_time = self.model.get_latest_departure(carrierID)
             payload = self.generate_timer_payload(carrierID, jump_plot_timestamp, latest_departure_time)
+            user_id = self._get_ledger_user_id()
+            if user_id is not None and self.timer_ledger.contains(user_id, payload['info_hash']):
+                print(f'Skipping jump timer report, already reported {payload["info_hash"]}')
+                return
             # Report the jump timer to the server
             try:
                 response = self.auth_handler.invoke_edge("submit-report", body=payload)
                 print('Report submitted successfully:', response)
             except Exception as e:
                 print(f"Error reporting jump timer: {e}")
+            else:
+                if user_id is not None and 'error' not in response:
+                    self.timer_ledger.add(user_id, [payload['info_hash']])
+
+    def _get_ledger_user_id(self) -> str|None:
+        user = self.auth_handler.get_user()
+        return user.get('id') if user else None
 
     def generate_timer_payload(self, carrierID:int, jump_plot_timestamp:datetime|None, latest_departure_time:datetime|None) -> dict:
         timer = self.model.get_jump_timer_in_seconds(jump_plot_timestamp, latest_departure_time)
@@ -1190,39 +1221,71 @@ class CarrierController:
         return payload
 
     def generate_timer_history(self) -> pd.DataFrame:
-        payloads = []
-        for carrierID in self.model.sorted_ids_display():
-            jumps: pd.DataFrame = self.model.get_carriers()[carrierID]['jumps']
-            for _, jump in jumps.iterrows():
-                jump_plot_timestamp = jump['timestamp']
-                departure_time = jump.get('DepartureTime', None)
-                if departure_time is None:
-                    continue
-                payload = self.generate_timer_payload(carrierID, jump_plot_timestamp, departure_time)
-                payloads.append(payload)
-        df = pd.DataFrame(payloads, columns=['journal_timestamp', 'timer', 'info_hash'])
-        return df
-
-    def report_timer_history(self) -> tuple[int|None, int|None, int|None]:
+        carriers = self.model.get_carriers()
+        frames = [carriers[carrierID]['jumps'][['timestamp', 'DepartureTime']].assign(carrierID=carrierID) for carrierID in self.model.sorted_ids_display()]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=['journal_timestamp', 'timer', 'info_hash'])
+        jumps = pd.concat(frames, ignore_index=True).dropna(subset=['timestamp', 'DepartureTime'])
+        timestamps = pd.to_datetime(jumps['timestamp'], utc=True)
+        journal_timestamps = [timestamp.isoformat() for timestamp in timestamps]
+        timers = (pd.to_datetime(jumps['DepartureTime'], utc=True) - timestamps).dt.total_seconds().astype(int).tolist()
+        info_hashes = getInfoHashes(journal_timestamps, timers, jumps['carrierID'].tolist())
+        return pd.DataFrame({'journal_timestamp': journal_timestamps, 'timer': timers, 'info_hash': info_hashes})
+
+    def _submit_timer_chunk(self, chunk: list[dict]) -> dict:
+        for attempt in range(TIMER_HISTORY_UPLOAD_RETRIES + 1):
+            try:
+                response = self.auth_handler.invoke_edge("submit-bulk-report", body=chunk)
+            except FunctionsHttpError as e:
+                # client errors other than rate limiting won't go away by retrying
+                if (e.status != 429 and e.status < 500) or attempt == TIMER_HISTORY_UPLOAD_RETRIES:
+                    raise
+            except Exception:
+                if attempt == TIMER_HISTORY_UPLOAD_RETRIES:
+                    raise
+            else:
+                if 'error' in response:
+                    raise RuntimeError(f"Error reporting jump timer: {response['error']}")
+                if response.get('ok', None) is not True:
+                    print(f"Error reporting jump timer: {response}")
+                    raise RuntimeError(f"Error reporting jump timer: {response}")
+                return response
+            time.sleep(HTTP_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def report_timer_history(self, on_progress: Callable[[int, int], None]|None=None) -> tuple[int|None, int|None, int|None]:
+        """
+        Submits the whole jump timer history in chunks, TIMER_HISTORY_UPLOAD_WORKERS
+        at a time. Chunks are retried on their own, the server skips timers it
+        already has by info_hash. on_progress gets (submitted, total) after
+        every chunk.
+        """
         if self.auth_handler.is_logged_in():
             df = self.generate_timer_history()
+            user_id = self._get_ledger_user_id()
+            if user_id is not None:
+                df = df[self.timer_ledger.filter_new(user_id, df['info_hash'])]
             if df.empty:
                 return 0, None, None
-            def _chunks(seq: list[dict[str, any]], size: int):
-                for i in range(0, len(seq), size):
-                    yield seq[i:i+size]
+            records = df.to_dict(orient='records')
+            chunks = [records[i:i+TIMER_HISTORY_CHUNK_SIZE] for i in range(0, len(records), TIMER_HISTORY_CHUNK_SIZE)]
             totals = {"submitted": 0, "inserted": 0, "skipped": 0}
-            for chunk in _chunks(df.to_dict(orient='records'), 500):
-                response = self.auth_handler.invoke_edge("submit-bulk-report", body=chunk)
-                if 'error' in response:
-                    raise RuntimeError(f"Error reporting jump timer: {response.error}")
-                if response.get('ok', None) is True:
-                    totals['submitted'] += len(chunk)
-                    totals['inserted'] += response.get('inserted', None)
-                    totals['skipped'] += response.get('skipped', None)
-                else:
-                    print(f"Error reporting jump timer: {response}")
-                    raise RuntimeError(f"Error reporting jump timer: {response}")
+            with ThreadPoolExecutor(max_workers=TIMER_HISTORY_UPLOAD_WORKERS, thread_name_prefix='TimerHistoryUpload') as executor:
+                futures = {executor.submit(self._submit_timer_chunk, chunk): chunk for chunk in chunks}
+                try:
+                    for future in as_completed(futures):
+                        response = future.result()
+                        if user_id is not None:
+                            self.timer_ledger.add(user_id, [record['info_hash'] for record in futures[future]])
+                        totals['submitted'] += len(futures[future])
+                        totals['inserted'] += response.get('inserted', 0)
+                        totals['skipped'] += response.get('skipped', 0)
+                        if on_progress is not None:
+                            on_progress(totals['submitted'], len(records))
+                except Exception:
+                    for future in futures:
+                        future.cancel()
+                    raise
             return totals['submitted'], totals['inserted'], totals['skipped']
         return None, None, None
 
@@ -1247,14 +1310,17 @@ class CarrierController:
         thread_report_history.start()
 
     def _run_report_timer_history(self):
+        def on_progress(submitted: int, total: int):
+            self.view.root.after(0, lambda: self.view.button_report_timer_history.configure(text=f'Reporting... {submitted}/{total}'))
+        self.view.root.after(0, lambda: self.view.button_report_timer_history.configure(state='disabled'))
         try:
-            submitted, inserted, skipped = self.report_timer_history()
+            submitted, inserted, skipped = self.report_timer_history(on_progress=on_progress)
             if submitted is None:
                 box = 'warning'; title = 'Error'; msg = 'Error reporting jump timer history, please try again later'
             elif submitted > 0:
                 box = 'info'; title = 'Success'; msg = f'Submitted {submitted} jump timers, {inserted} accepted, {skipped} skipped.'
             else:
-                box = 'info'; title = 'No Data'; msg = 'No jump timers to report.'
+                box = 'info'; title = 'No Data'; msg = 'No new jump timers to report.'
         except FunctionsHttpError as e:
             if e.status == 429:
                 box = 'warning'; title = 'Rate limited'; msg = 'You are being rate limited, please try again later'
@@ -1264,6 +1330,7 @@ class CarrierController:
             box = 'warning'; title = 'Error'; msg = f'Error reporting jump timer history\n{traceback.format_exc()}'
 
         # back onto the Tk event loop to show the dialog
+        self.view.root.after(0, lambda: self.view.button_report_timer_history.configure(text='Report Timer History', state='normal' if self.auth_handler.is_logged_in() else 'disabled'))
         self.view.root.after(0, lambda:
             getattr(self.view, f'show_message_box_{box}')(title, msg)
         )
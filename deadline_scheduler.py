@@ -0,0 +1,86 @@
+import heapq
+import itertools
+import traceback
+from datetime import datetime
+from typing import Callable, Hashable
+from tkinter import Misc
+from config import DEADLINE_MAX_SLEEP
+
+class DeadlineScheduler:
+    """
+    Runs callbacks at given datetimes on the Tk loop. Deadlines live in a
+    heap and a single after() call is aimed at the earliest one, so nothing
+    is polled. Sleeps are capped at DEADLINE_MAX_SLEEP ms and due deadlines
+    are re-checked against now() when waking, so a clock step or a changed
+    time skew correction only delays a deadline by that much at most.
+
+    Deadlines are identified by (group, name) keys, scheduling a key again
+    replaces its deadline. Must be used from the Tk thread.
+    """
+    def __init__(self, root: Misc, now: Callable[[], datetime], max_sleep_ms: int = DEADLINE_MAX_SLEEP):
+        self.root = root
+        self.now = now
+        self.max_sleep_ms = max_sleep_ms
+        self._heap: list[tuple[datetime, int, tuple[Hashable, Hashable]]] = []
+        self._entries: dict[tuple[Hashable, Hashable], tuple[datetime, int, Callable[[], None]]] = {}
+        self._counter = itertools.count()
+        self._after_id = None
+        self._armed_for: datetime|None = None
+
+    def schedule(self, group: Hashable, name: Hashable, when: datetime, callback: Callable[[], None]):
+        key = (group, name)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == when:
+            # same deadline, only the callback may have changed
+            self._entries[key] = (when, entry[1], callback)
+            return
+        seq = next(self._counter)
+        self._entries[key] = (when, seq, callback)
+        heapq.heappush(self._heap, (when, seq, key))
+        if self._armed_for is None or when < self._armed_for:
+            self._arm()
+
+    def cancel(self, group: Hashable, name: Hashable):
+        # the heap item stays and is skipped when popped
+        self._entries.pop((group, name), None)
+
+    def sync(self, group: Hashable, deadlines: dict[Hashable, tuple[datetime, Callable[[], None]]]):
+        """Replaces all deadlines of group with deadlines, a {name: (when, callback)} dict"""
+        for key in [key for key in self._entries if key[0] == group and key[1] not in deadlines]:
+            del self._entries[key]
+        for name, (when, callback) in deadlines.items():
+            self.schedule(group, name, when, callback)
+
+    def get_upcoming(self, group: Hashable|None = None) -> list[tuple[datetime, Hashable, Hashable]]:
+        """(when, group, name) of the pending deadlines, earliest first"""
+        return sorted((when, key[0], key[1]) for key, (when, _, _) in self._entries.items() if group is None or key[0] == group)
+
+    def _arm(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._armed_for = None
+        while self._heap and self._entries.get(self._heap[0][2], (None, None))[1] != self._heap[0][1]:
+            heapq.heappop(self._heap)  # cancelled or replaced
+        if not self._heap:
+            return
+        when = self._heap[0][0]
+        delay = (when - self.now()).total_seconds() * 1000
+        self._armed_for = when
+        self._after_id = self.root.after(max(0, min(int(delay) + 1, self.max_sleep_ms)), self._fire)
+
+    def _fire(self):
+        self._after_id = None
+        self._armed_for = None
+        now = self.now()
+        while self._heap and self._heap[0][0] <= now:
+            when, seq, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != seq:
+                continue
+            del self._entries[key]
+            try:
+                entry[2]()
+            except Exception:
+                traceback.print_exc()
+        self._arm()
@@ -1,42 +1,96 @@
 import time
 import threading
 import functools
-from collections import deque
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, NamedTuple
 
-def rate_limited(max_calls: int, period: float):
+CACHED_FUNCTIONS: list = []  # every @cached function, for the metrics
+
+class CacheResult(NamedTuple):
+    value: Any
+    hit: bool  # served without calling the function
+    stale: bool  # the value's TTL expired, e.g. served because the call failed
+    error: Exception|None  # the error of the failed call behind a fallback value
+
+def cached(ttl: float, maxsize: int = 128, stale_on_error: bool = True):
     """
-    Decorator that allows up to max_calls per period (seconds),
-    caching and returning the last result in between bursts,
-    separately for each distinct (args, kwargs) combination.
+    Decorator caching results per distinct (args, kwargs) for ttl seconds,
+    keeping at most maxsize entries with least recently used eviction.
+    Concurrent calls with the same arguments share a single call. If a call
+    fails and stale_on_error is set, the last value is served instead when
+    there is one, otherwise the error is raised. Use wrapper.get_with_info()
+    to tell fresh, cached and stale values apart, and wrapper.cache_info()
+    for hit/miss statistics.
     """
-    state: dict = {}  # maps (args, sorted(kwargs)) -> {'times': deque, 'cache': result}
-
     def decorator(func):
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            now = time.time()
-            # build a hashable key for this call
+        lock = threading.Lock()
+        entries: OrderedDict = OrderedDict()  # key -> (value, expires_at)
+        in_flight: dict[Any, Future] = {}
+        stats = {'hits': 0, 'misses': 0, 'stale': 0, 'errors': 0}
+
+        def get_with_info(*args, **kwargs) -> CacheResult:
             key = (args, tuple(sorted(kwargs.items())))
-            if key not in state:
-                state[key] = {'times': deque(), 'cache': None}
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and entry[1] > time.monotonic():
+                    entries.move_to_end(key)
+                    stats['hits'] += 1
+                    return CacheResult(entry[0], True, False, None)
+                future = in_flight.get(key)
+                is_leader = future is None
+                if is_leader:
+                    future = in_flight[key] = Future()
+                    stats['misses'] += 1
+                else:
+                    stats['hits'] += 1
+            if is_leader:
+                try:
+                    value = func(*args, **kwargs)
+                except Exception as e:
+                    with lock:
+                        in_flight.pop(key, None)
+                        stats['errors'] += 1
+                    future.set_exception(e)
+                    error = e
+                else:
+                    with lock:
+                        entries[key] = (value, time.monotonic() + ttl)
+                        entries.move_to_end(key)
+                        while len(entries) > maxsize:
+                            entries.popitem(last=False)
+                        in_flight.pop(key, None)
+                    future.set_result(value)
+                    return CacheResult(value, False, False, None)
+            else:
+                try:
+                    return CacheResult(future.result(), True, False, None)
+                except Exception as e:
+                    error = e
+            with lock:
+                entry = entries.get(key)
+                if stale_on_error and entry is not None:
+                    is_stale = entry[1] <= time.monotonic()
+                    stats['stale'] += is_stale
+                    return CacheResult(entry[0], True, is_stale, error)
+            raise error
 
-            record = state[key]
-            times: deque[float] = record['times']
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_with_info(*args, **kwargs).value
 
-            # drop timestamps older than our window
-            while times and now - times[0] > period:
-                times.popleft()
+        def cache_info() -> dict:
+            with lock:
+                return dict(stats, size=len(entries), maxsize=maxsize)
 
-            # if under limit, perform real call and update cache
-            if len(times) < max_calls:
-                times.append(now)
-                try:
-                    record['cache'] = func(*args, **kwargs)
-                except Exception:
-                    # on failure, keep last cache
-                    pass
+        def cache_clear():
+            with lock:
+                entries.clear()
 
-            return record['cache']
+        wrapper.get_with_info = get_with_info
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        CACHED_FUNCTIONS.append(wrapper)
         return wrapper
     return decorator
 
@@ -0,0 +1,244 @@
+import time
+import queue
+import sqlite3
+import threading
+import requests
+import http_client
+from concurrent.futures import Future
+from metrics import REGISTRY, timer
+from discord_outbox import getDiscordOutbox
+from urllib.parse import urlsplit, urlunsplit, parse_qs
+from config import DISCORD_REQUEST_TIMEOUT, DISCORD_MAX_ATTEMPTS, DISCORD_DISPATCHER_IDLE, DISCORD_BATCH_WINDOW
+
+# limits of a single Discord message
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+class DeliveryError(Exception):
+    def __init__(self, status_code: int|None, message: str):
+        super().__init__(f'{status_code}: {message}' if status_code is not None else message)
+        self.status_code = status_code
+
+def embed_size(embed: dict) -> int:
+    """Characters counted by Discord towards the per-message embed limit"""
+    size = len(embed.get('title', '')) + len(embed.get('description', ''))
+    size += len(embed.get('footer', {}).get('text', '')) + len(embed.get('author', {}).get('name', ''))
+    for field in embed.get('fields', []):
+        size += len(field.get('name', '')) + len(field.get('value', ''))
+    return size
+
+def split_webhook_url(url: str) -> tuple[str, str|None]:
+    """Returns the webhook url without its query and the thread_id from the query, if any"""
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        raise ValueError(f'Invalid webhook URL: {url}')
+    thread_id = parse_qs(parts.query).get('thread_id', [None])[0]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, '', '')), thread_id
+
+class WebhookDispatcher:
+    """
+    Delivers payloads to a single webhook in submission order from its own
+    thread, so a slow or rate-limited webhook only delays itself. Honors
+    Discord's rate limits: a 429 is retried after Retry-After, and an
+    exhausted bucket is waited out before the next request is sent. The
+    thread exits after DISCORD_DISPATCHER_IDLE seconds without work and is
+    restarted by the next submit.
+
+    Embed only payloads submitted within DISCORD_BATCH_WINDOW seconds of each
+    other are packed into a single message of up to MAX_EMBEDS embeds, as long
+    as they share content, username and avatar. A payload that can't join the
+    batch ends it, so submission order is kept.
+
+    Submitted payloads are kept in the DiscordOutbox until their future
+    resolves, payloads an exit cut off are resubmitted by replay_pending.
+    """
+    def __init__(self, url: str):
+        self.webhook_url = url
+        self.url, self.thread_id = split_webhook_url(url)
+        self.jobs: queue.Queue[tuple[dict, Future]] = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._held: tuple[dict, Future]|None = None
+        self._blocked_until = 0.0
+
+    def is_idle(self) -> bool:
+        with self._lock:
+            return self._thread is None and self.jobs.empty()
+
+    def submit(self, payload: dict, entry_id: int|None=None) -> Future:
+        """Queues payload for delivery, entry_id is its outbox entry when it is replayed"""
+        future = Future()
+        outbox = getDiscordOutbox()
+        if entry_id is None:
+            try:
+                entry_id = outbox.add(self.webhook_url, payload)
+            except sqlite3.Error as e:
+                print(f'Could not persist Discord message, it is lost if EDCM exits before delivery: {e}')
+        if entry_id is not None:
+            future.add_done_callback(lambda _: outbox.remove(entry_id))
+        with self._lock:
+            self.jobs.put((payload, future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f'WebhookDispatcher-{self.url[-8:]}', daemon=True)
+                self._thread.start()
+        return future
+
+    def _run(self):
+        while True:
+            if self._held is not None:
+                payload, future = self._held
+                self._held = None
+            else:
+                try:
+                    payload, future = self.jobs.get(timeout=DISCORD_DISPATCHER_IDLE)
+                except queue.Empty:
+                    with self._lock:
+                        if self.jobs.empty():
+                            self._thread = None
+                            return
+                    continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            futures = [future]
+            if self._is_batchable(payload):
+                payload, futures = self._collect_batch(payload, future)
+            try:
+                with timer('edcm_discord_delivery_seconds', 'Webhook deliveries including retries and rate limit waits'):
+                    result = self._deliver(payload)
+            except Exception as e:
+                print(f'Discord delivery to {self.url[:self.url.rfind("/")]} failed: {e}')
+                REGISTRY.counter('edcm_discord_messages_total', 'Webhook messages by outcome', result='failed').inc()
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                REGISTRY.counter('edcm_discord_messages_total', 'Webhook messages by outcome', result='delivered').inc()
+                for future in futures:
+                    future.set_result(result)
+
+    @staticmethod
+    def _is_batchable(payload: dict) -> bool:
+        return bool(payload.get('embeds')) and set(payload.keys()) <= {'embeds', 'content', 'username', 'avatar_url'}
+
+    @staticmethod
+    def _batch_key(payload: dict) -> tuple:
+        return payload.get('content'), payload.get('username'), payload.get('avatar_url')
+
+    def _collect_batch(self, payload: dict, future: Future) -> tuple[dict, list[Future]]:
+        embeds = list(payload['embeds'])
+        size = sum(embed_size(embed) for embed in embeds)
+        futures = [future]
+        deadline = time.monotonic() + DISCORD_BATCH_WINDOW
+        while len(embeds) < MAX_EMBEDS:
+            try:
+                job = self.jobs.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            other, other_future = job
+            other_size = sum(embed_size(embed) for embed in other.get('embeds', []))
+            if (not self._is_batchable(other) or self._batch_key(other) != self._batch_key(payload)
+                    or len(embeds) + len(other['embeds']) > MAX_EMBEDS or size + other_size > MAX_EMBED_CHARS):
+                self._held = job
+                break
+            if not other_future.set_running_or_notify_cancel():
+                continue
+            embeds += other['embeds']
+            size += other_size
+            futures.append(other_future)
+        return dict(payload, embeds=embeds), futures
+
+    def _deliver(self, payload: dict) -> dict|None:
+        params = {'wait': 'true'}
+        if self.thread_id:
+            params['thread_id'] = self.thread_id
+        for attempt in range(DISCORD_MAX_ATTEMPTS):
+            wait = self._blocked_until - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                response = http_client.post(self.url, params=params, json=payload, timeout=DISCORD_REQUEST_TIMEOUT, retries=0)
+            except requests.exceptions.RequestException as e:
+                if attempt == DISCORD_MAX_ATTEMPTS - 1:
+                    raise DeliveryError(None, str(e)) from e
+                time.sleep(2 ** attempt)
+                continue
+            self._update_bucket(response)
+            if response.status_code == 429:
+                self._blocked_until = time.monotonic() + self._get_retry_after(response)
+                continue
+            if response.status_code >= 500 and attempt < DISCORD_MAX_ATTEMPTS - 1:
+                time.sleep(2 ** attempt)
+                continue
+            if not response.ok:
+                raise DeliveryError(response.status_code, response.text)
+            return response.json() if response.content else None
+        raise DeliveryError(429, 'Rate limited, giving up')
+
+    def _update_bucket(self, response: requests.Response):
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            try:
+                reset_after = float(response.headers.get('X-RateLimit-Reset-After', 0))
+            except ValueError:
+                return
+            self._blocked_until = max(self._blocked_until, time.monotonic() + reset_after)
+
+    @staticmethod
+    def _get_retry_after(response: requests.Response) -> float:
+        try:
+            return float(response.headers['Retry-After'])
+        except (KeyError, ValueError):
+            pass
+        try:
+            return float(response.json().get('retry_after', 1))
+        except (ValueError, AttributeError):
+            return 1.0
+
+_dispatchers: dict[tuple[str, str|None], WebhookDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+
+def get_dispatcher(url: str) -> WebhookDispatcher:
+    """
+    Returns the process-wide dispatcher for a webhook, keyed by url and
+    thread_id, so every handler pointing at the same webhook shares one queue
+    and one rate limit bucket.
+    """
+    key = split_webhook_url(url)
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(key)
+        if dispatcher is None:
+            dispatcher = _dispatchers[key] = WebhookDispatcher(url)
+        return dispatcher
+
+def replay_pending():
+    """Resubmits the payloads an earlier run left undelivered, call once on start"""
+    outbox = getDiscordOutbox()
+    resent = 0
+    for entry_id, url, payload in outbox.take_pending():
+        try:
+            dispatcher = get_dispatcher(url)
+        except ValueError as e:
+            print(f'Dropping undelivered Discord message: {e}')
+            outbox.remove(entry_id)
+            continue
+        dispatcher.submit(payload, entry_id=entry_id)
+        resent += 1
+    if resent:
+        print(f'Resending {resent} undelivered Discord messages')
+
+def prune_dispatchers(urls: set[str]):
+    """
+    Drops the dispatchers of webhooks not in urls. A dispatcher still
+    delivering is kept until a later prune, so queued payloads are sent and
+    a re-added webhook keeps its queue and rate limit bucket.
+    """
+    keep = {split_webhook_url(url) for url in urls}
+    with _dispatchers_lock:
+        for key in [key for key, dispatcher in _dispatchers.items() if key not in keep and dispatcher.is_idle()]:
+            del _dispatchers[key]
+
+class DiscordDelivery:
+    """Fans payloads out to several webhooks at once over pooled connections"""
+    def __init__(self, webhook_urls: list[str]):
+        self.dispatchers = [get_dispatcher(url) for url in webhook_urls]
+
+    def send(self, payload: dict) -> list[Future]:
+        return [dispatcher.submit(payload) for dispatcher in self.dispatchers]
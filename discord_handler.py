@@ -1,5 +1,8 @@
-from typing import Literal
+import threading
+from typing import Iterable, Literal
+from concurrent.futures import Future
 import discord
+from discord_delivery import DiscordDelivery, prune_dispatchers
 from settings import Settings
 from utility import getSettingsPath
 
@@ -9,44 +12,31 @@ class DiscordWebhookHandler:
     
     def __init__(self, webhook_urls: str, userID: str = ''):
         self.webhook_urls = [url for url in webhook_urls.replace(' ', '').split(',') if url]
-        self.webhook_thread_ids = [url.split('?thread_id=')[1] if '?thread_id=' in url else None for url in self.webhook_urls] 
-        self.webhooks = [discord.SyncWebhook.from_url(url) for url in self.webhook_urls]
-        print(f"Initialized DiscordWebhookHandler with {len(self.webhooks)} webhooks.")
+        self.delivery = DiscordDelivery(self.webhook_urls)
+        print(f"Initialized DiscordWebhookHandler with {len(self.webhook_urls)} webhooks.")
         self.userID = userID
         self.username = "Elite Dangerous Carrier Manager"
         self.avatar_url = "https://github.com/skywalker-elite/Elite-Dangerous-Carrier-Manager/blob/main/images/EDCM.png?raw=true"
 
-    def send_message(self, message: str, ping: bool = False):
+    def send_message(self, message: str, ping: bool = False) -> list[Future]:
         if ping:
             message = self._get_ping_message() + " " + message
-        for webhook, thread_id in zip(self.webhooks, self.webhook_thread_ids):
-            if thread_id:
-                webhook.send(message, username=self.username, avatar_url=self.avatar_url, thread=discord.Object(id=thread_id))
-            else:
-                webhook.send(message, username=self.username, avatar_url=self.avatar_url)
+        return self.delivery.send({'content': message, 'username': self.username, 'avatar_url': self.avatar_url})
 
-    def _send_embed(self, embed: discord.Embed, ping: bool = False):
+    def _send_embed(self, embed: discord.Embed, ping: bool = False) -> list[Future]:
+        payload = {'embeds': [embed.to_dict()], 'username': self.username, 'avatar_url': self.avatar_url}
         if ping:
-            for webhook, thread_id in zip(self.webhooks, self.webhook_thread_ids):
-                if thread_id:
-                    webhook.send(self._get_ping_message(), embed=embed, username=self.username, avatar_url=self.avatar_url, thread=discord.Object(id=thread_id))
-                else:
-                    webhook.send(self._get_ping_message(), embed=embed, username=self.username, avatar_url=self.avatar_url)
-        else:
-            for webhook, thread_id in zip(self.webhooks, self.webhook_thread_ids):
-                if thread_id:
-                    webhook.send(embed=embed, username=self.username, avatar_url=self.avatar_url, thread=discord.Object(id=thread_id))
-                else:
-                    webhook.send(embed=embed, username=self.username, avatar_url=self.avatar_url)
+            payload['content'] = self._get_ping_message()
+        return self.delivery.send(payload)
 
-    def send_message_with_embed(self, title: str, description: str, image_url: str|None=None, ping: bool = False):
+    def send_message_with_embed(self, title: str, description: str, image_url: str|None=None, ping: bool = False) -> list[Future]:
         embed = discord.Embed(
             title=title,
             description=description,
         )
         if image_url:
             embed.set_image(url=image_url)
-        self._send_embed(embed, ping=ping)
+        return self._send_embed(embed, ping=ping)
 
     def _get_ping_message(self):
         if self.userID != '':
@@ -56,7 +46,7 @@ class DiscordWebhookHandler:
 
     def send_jump_status_embed(self, status: Literal['jump_plotted', 'jump_completed', 'jump_cancelled', 'cooldown_finished'], 
                                 name: str, callsign: str, current_system: str|None, current_body: str|None,
-                                other_system: str|None, other_body: str|None, timestamp: str|None, ping: bool = False) -> None:
+                                other_system: str|None, other_body: str|None, timestamp: str|None, ping: bool = False) -> list[Future]:
         
         color_map = {
             'jump_plotted': 4218367,
@@ -83,29 +73,53 @@ class DiscordWebhookHandler:
             inline=True,
         )
 
-        self._send_embed(embed, ping=ping)
+        return self._send_embed(embed, ping=ping)
+
+_handlers: dict[tuple[tuple[str, ...], str], DiscordWebhookHandler] = {}
+_handlers_lock = threading.Lock()
+
+def get_webhook_handler(webhook_urls: str, userID: str = '') -> DiscordWebhookHandler:
+    """Returns a shared handler for the webhook urls and user, reusing one built by an earlier settings load"""
+    key = (tuple(url for url in webhook_urls.replace(' ', '').split(',') if url), userID)
+    with _handlers_lock:
+        handler = _handlers.get(key)
+        if handler is None:
+            handler = _handlers[key] = DiscordWebhookHandler(webhook_urls, userID)
+        return handler
+
+def prune_webhook_handlers(in_use: Iterable[DiscordWebhookHandler]):
+    """Forgets the handlers a settings reload no longer uses, and the dispatchers only they used"""
+    in_use = set(in_use)
+    with _handlers_lock:
+        for key in [key for key, handler in _handlers.items() if handler not in in_use]:
+            del _handlers[key]
+        urls = {url for handler in _handlers.values() for url in handler.webhook_urls}
+    prune_dispatchers(urls)
 
 if __name__ == "__main__":
     from datetime import datetime, timezone, timedelta
     settings = Settings(getSettingsPath())
     settings.load()
     webhook_handler = DiscordWebhookHandler(settings.get('discord', 'webhook'), settings.get('discord', 'userID'))
+    futures = []
     # webhook_handler.send_message_with_embed("P.T.N. Carrier (PTN-123)", f"Jump plotted to **Sol** body **Earth**, arriving <t:{(datetime.now(timezone.utc) + timedelta(minutes=15)).timestamp():.0f}:R>", ping=True)
-    webhook_handler.send_jump_status_embed(
+    futures += webhook_handler.send_jump_status_embed(
         status='jump_plotted', name='P.T.N. Carrier', callsign='PTN-123', 
         current_system='Alpha Centauri', current_body='Proxima Centauri B',
         other_system='Sol', other_body='Earth', timestamp=f'<t:{(datetime.now(timezone.utc) + timedelta(minutes=15)).timestamp():.0f}:R>', ping=False
     )
-    webhook_handler.send_jump_status_embed(
+    futures += webhook_handler.send_jump_status_embed(
         status='jump_completed', name='P.T.N. Carrier', callsign='PTN-123', 
         current_system='Sol', current_body='Earth',
         other_system='Alpha Centauri', other_body='Proxima Centauri B', timestamp=f'<t:{(datetime.now(timezone.utc) + timedelta(minutes=5)).timestamp():.0f}:R>', ping=False
     )
-    webhook_handler.send_jump_status_embed(
+    futures += webhook_handler.send_jump_status_embed(
         status='cooldown_finished', name='P.T.N. Carrier', callsign='PTN-123', 
         current_system='Sol', current_body='Earth', other_system='Alpha Centauri', other_body='Proxima Centauri B', timestamp=f'<t:{(datetime.now(timezone.utc) - timedelta(minutes=1)).timestamp():.0f}:R>', ping=True
     )
-    webhook_handler.send_jump_status_embed(
+    futures += webhook_handler.send_jump_status_embed(
         status='jump_cancelled', name='P.T.N. Carrier', callsign='PTN-123', 
         current_system='Sol', current_body='Earth', other_system=None, other_body=None, timestamp=f'<t:{(datetime.now(timezone.utc) + timedelta(minutes=1)).timestamp():.0f}:R>', ping=False
-    )
\ No newline at end of file
+    )
+    for future in futures:
+        future.result()
@@ -0,0 +1,61 @@
+import json
+import time
+import sqlite3
+import threading
+from os import makedirs, path
+from datetime import timedelta
+from utility import getDiscordOutboxPath
+from config import DISCORD_OUTBOX_MAX_AGE
+
+class DiscordOutbox:
+    """
+    Webhook payloads that were queued but not delivered yet, kept across
+    restarts. An entry is added when a payload is submitted and removed once
+    its delivery succeeded or finally failed, so whatever is left on start was
+    cut off by an exit or crash and is replayed. A payload sent just before a
+    crash may therefore be delivered twice.
+    """
+    def __init__(self, db_path: str|None):
+        if db_path is None:
+            db_path = ':memory:'
+        else:
+            makedirs(path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS pending (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL, payload TEXT NOT NULL, queued_at REAL NOT NULL)')
+        self._conn.commit()
+
+    def add(self, url: str, payload: dict) -> int:
+        with self._lock:
+            cursor = self._conn.execute('INSERT INTO pending (url, payload, queued_at) VALUES (?, ?, ?)', (url, json.dumps(payload), time.time()))
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def remove(self, entry_id: int):
+        with self._lock:
+            self._conn.execute('DELETE FROM pending WHERE id = ?', (entry_id,))
+            self._conn.commit()
+
+    def take_pending(self, max_age: timedelta=DISCORD_OUTBOX_MAX_AGE) -> list[tuple[int, str, dict]]:
+        """Returns (id, url, payload) of the pending entries in submission order, entries older than max_age are dropped"""
+        with self._lock:
+            dropped = self._conn.execute('DELETE FROM pending WHERE queued_at < ?', (time.time() - max_age.total_seconds(),)).rowcount
+            self._conn.commit()
+            rows = self._conn.execute('SELECT id, url, payload FROM pending ORDER BY id').fetchall()
+        if dropped:
+            print(f'Dropped {dropped} undelivered Discord messages older than {max_age}')
+        return [(entry_id, url, json.loads(payload)) for entry_id, url, payload in rows]
+
+_discord_outbox = None
+_discord_outbox_lock = threading.Lock()
+
+def getDiscordOutbox() -> DiscordOutbox:
+    global _discord_outbox
+    with _discord_outbox_lock:
+        if _discord_outbox is None:
+            try:
+                _discord_outbox = DiscordOutbox(getDiscordOutboxPath())
+            except (sqlite3.Error, OSError) as e:
+                print(f'Discord outbox unavailable, undelivered messages are lost on exit: {e}')
+                _discord_outbox = DiscordOutbox(None)
+        return _discord_outbox
@@ -0,0 +1,170 @@
+"""
+Runs EDCM without a GUI: journals are watched and read, carrier status is
+tracked and the Discord notifications from the settings file are sent, e.g.
+as a service on a machine reading journals from a synced folder. Logs are
+written to stdout as one JSON object per line.
+"""
+import io
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import traceback
+from datetime import datetime, timezone
+from watchdog.observers import Observer
+from model import CarrierModel
+from journal_worker import JournalWorker, JournalEventHandler
+from settings import Settings, SettingsValidationError
+from status_notifier import StatusNotifier
+from discord_delivery import replay_pending
+from api_server import FleetApi
+from metrics import registerModelMetrics
+from utility import getSettingsPath, getSettingsDefaultPath, getSettingsDir
+from config import HEADLESS_UPDATE_INTERVAL, UPDATE_INTERVAL, API_HOST
+
+logger = logging.getLogger('edcm')
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class _PrintToLog(io.TextIOBase):
+    """Turns print() output of the shared modules into log records, one per line"""
+    def __init__(self, target: logging.Logger, level: int):
+        self.target = target
+        self.level = level
+        self._buffer = ''
+        self._lock = threading.Lock()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        with self._lock:
+            self._buffer += s
+            *lines, self._buffer = self._buffer.split('\n')
+        for line in lines:
+            if line.strip():
+                self.target.log(self.level, line)
+        return len(s)
+
+def setup_logging(level: int = logging.INFO):
+    handler = logging.StreamHandler(sys.__stdout__)
+    handler.setFormatter(JsonFormatter())
+    logging.basicConfig(level=level, handlers=[handler], force=True)
+    sys.stdout = _PrintToLog(logging.getLogger('edcm.print'), logging.INFO)
+
+def load_settings(settings_file: str|None = None) -> Settings:
+    os.makedirs(getSettingsDir(), exist_ok=True)  # Settings keeps its config json there
+    if settings_file is None:
+        settings_file = getSettingsPath()
+    if settings_file is None or not os.path.exists(settings_file):
+        logger.warning('Settings file not found, using default settings', extra={'fields': {'settings_file': settings_file}})
+        return Settings(settings_file=getSettingsDefaultPath())
+    try:
+        settings = Settings(settings_file=settings_file)
+    except SettingsValidationError as e:
+        logger.error('Settings file validation failed, using default settings', extra={'fields': {'settings_file': settings_file, 'error': str(e)}})
+        return Settings(settings_file=getSettingsDefaultPath())
+    for warning in settings.validation_warnings:
+        logger.warning(warning, extra={'fields': {'settings_file': settings_file}})
+    return settings
+
+class HeadlessRunner:
+    """
+    Keeps a CarrierModel current from journal events and sends the status
+    change notifications. The main thread sleeps until a journal read
+    finished or the next status change is due, at most
+    HEADLESS_UPDATE_INTERVAL ms.
+    """
+    def __init__(self, model: CarrierModel, settings: Settings, api: FleetApi|None = None):
+        self.model = model
+        self.settings = settings
+        self.api = api
+        self.status_notifier = StatusNotifier(settings, on_warning=lambda message: logger.warning(message))
+        self.model.apply_settings(settings)
+        self.model.register_status_change_callback(self.status_change)
+        registerModelMetrics(lambda: self.model)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self.journal_worker = JournalWorker(self.model, on_snapshot=self._wake.set, on_error=self._on_journal_update_error)
+        self._observer = Observer()
+        handler = JournalEventHandler(self.journal_worker.request_update)
+        for jp in self.model.journal_paths:
+            watch_dir = jp if os.path.isdir(jp) else os.path.dirname(jp)
+            self._observer.schedule(handler, watch_dir, recursive=False)
+        self._observer.daemon = True
+
+    def status_change(self, carrierID: int, status_old: str, status_new: str):
+        logger.info('Carrier status changed', extra={'fields': {
+            'event': 'status_change', 'carrier_id': carrierID, 'name': self.model.get_name(carrierID), 'callsign': self.model.get_callsign(carrierID),
+            'status_old': status_old, 'status_new': status_new, 'current_system': self.model.get_current_system(carrierID), 'destination_system': self.model.get_destination_system(carrierID),
+        }})
+        for future in self.status_notifier.send_discord(self.model, carrierID, status_old, status_new):
+            future.add_done_callback(self._on_delivery_done)
+
+    def _on_delivery_done(self, future):
+        if future.exception() is not None:
+            logger.error('Discord notification failed', extra={'fields': {'event': 'discord_error', 'error': str(future.exception())}})
+
+    def _on_journal_update_error(self, tb: str):
+        logger.error('Error during journal update, retrying', extra={'fields': {'event': 'journal_error', 'traceback': tb}})
+        threading.Timer(UPDATE_INTERVAL / 1000, self.journal_worker.request_update).start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def run(self):
+        replay_pending()
+        self.journal_worker.start()
+        self._observer.start()
+        logger.info('Headless mode started', extra={'fields': {'event': 'start', 'journal_paths': self.model.journal_paths, 'carriers': len(self.model.get_carriers())}})
+        try:
+            while not self._stopped.is_set():
+                snapshot = self.journal_worker.get_latest_snapshot(self.model)
+                if snapshot is not None:
+                    self.model.apply_snapshot(snapshot)
+                now = datetime.now(timezone.utc)
+                self.model.update_carriers(now)
+                if self.api is not None:
+                    self.api.publish()
+                deadlines = self.model.get_upcoming_deadlines(now)
+                timeout = HEADLESS_UPDATE_INTERVAL / 1000
+                if deadlines:
+                    timeout = min(timeout, (deadlines[0][0] - now).total_seconds())
+                self._wake.wait(max(timeout, 0))
+                self._wake.clear()
+        finally:
+            self._observer.stop()
+            self.journal_worker.stop()
+            if self.api is not None:
+                self.api.stop()
+            logger.info('Headless mode stopped', extra={'fields': {'event': 'stop'}})
+
+def run_headless(journal_paths: list[str], settings_file: str|None = None, api_port: int|None = None, api_host: str = API_HOST):
+    setup_logging()
+    try:
+        settings = load_settings(settings_file)
+        model = CarrierModel(journal_paths)
+        api = FleetApi(model, host=api_host, port=api_port) if api_port is not None else None
+        runner = HeadlessRunner(model, settings, api=api)
+        if api is not None:
+            api.start()
+    except Exception:
+        logger.critical('Failed to start headless mode', extra={'fields': {'event': 'start_failed', 'traceback': traceback.format_exc()}})
+        raise
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *args: runner.stop())
+    runner.run()
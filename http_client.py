@@ -0,0 +1,73 @@
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from metrics import REGISTRY
+from config import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_RETRIES, HTTP_RETRY_BACKOFF, HTTP_MAX_PER_HOST
+
+# only requests that are safe to repeat are retried unless asked otherwise
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class _Host:
+    def __init__(self):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_MAX_PER_HOST)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.semaphore = threading.BoundedSemaphore(HTTP_MAX_PER_HOST)
+
+_hosts: dict[str, _Host] = {}
+_hosts_lock = threading.Lock()
+
+def _get_host(url: str) -> _Host:
+    netloc = urlsplit(url).netloc.lower()
+    with _hosts_lock:
+        if netloc not in _hosts:
+            _hosts[netloc] = _Host()
+        return _hosts[netloc]
+
+def _retry_delay(attempt: int, response: requests.Response|None) -> float:
+    if response is not None:
+        try:
+            return float(response.headers['Retry-After'])
+        except (KeyError, ValueError):
+            pass
+    # exponential backoff with jitter so clients don't retry in lockstep
+    return HTTP_RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+def request(method: str, url: str, timeout: float|tuple[float, float]=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), retries: int|None=None, **kwargs) -> requests.Response:
+    """
+    Sends a request over the keep-alive session of the url's host, with at
+    most HTTP_MAX_PER_HOST requests in flight per host. Connection errors,
+    timeouts and retryable statuses are retried up to retries times, by
+    default HTTP_RETRIES for idempotent methods and never for the rest.
+    """
+    if retries is None:
+        retries = HTTP_RETRIES if method.upper() in IDEMPOTENT_METHODS else 0
+    host = _get_host(url)
+    histogram = REGISTRY.histogram('edcm_http_request_seconds', 'HTTP request attempts by host, without the wait for a free connection', host=urlsplit(url).netloc.lower())
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            with host.semaphore:
+                start = time.perf_counter()
+                try:
+                    response = host.session.request(method, url, timeout=timeout, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+        time.sleep(_retry_delay(attempt, response))
+
+def get(url: str, params: dict|None=None, **kwargs) -> requests.Response:
+    return request('GET', url, params=params, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request('POST', url, **kwargs)
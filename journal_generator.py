@@ -0,0 +1,367 @@
+"""
+Writes synthetic Elite Dangerous journals for load testing: N commanders,
+M carriers and any length of history, reproducible from a seed. Commanders
+play sessions at random, each session is one Journal.*.log file with the
+events EDCM reads (LoadGame, CarrierStats, CarrierLocation, CarrierBuy,
+CarrierJumpRequest/Cancelled, CarrierTradeOrder, CarrierDepositFuel,
+CarrierDockingPermission, SquadronStartup, Docked, Undocked, FSDJump)
+among the usual noise. Every commander owns at most one carrier like in the
+game, carriers beyond the number of commanders are squadron carriers.
+
+    python journal_generator.py /tmp/journals --commanders 20 --carriers 24 --years 3 --seed 1
+
+Use --end now to have the latest sessions still running, with jumps in
+progress, instead of ending at a fixed date. The last session of every
+commander is then still open, each with a carrier jump pending, --active
+sets the fraction of commanders this applies to.
+"""
+import csv
+import json
+import random
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, timezone
+from os import listdir, makedirs, path
+from utility import getResourcePath
+from config import CD, CD_cancel, ladder_systems
+
+DEFAULT_END = datetime(2025, 6, 1, tzinfo=timezone.utc)  # fixed so a seed always gives the same files
+HUB_SYSTEMS = ['Sol', 'Shinrarta Dezhra', 'Deciat', 'Colonia', 'Jameson', 'Maia', 'Diaguandri', 'Lave', 'Sirius', 'Achenar']
+SERVICES = ['Refuel', 'Repair', 'Rearm', 'Shipyard', 'Outfitting', 'Exploration', 'VistaGenomics', 'PioneerSupplies', 'Bartender', 'VoucherRedemption', 'BlackMarket']
+DOCKING_ACCESS = ['all', 'none', 'friends', 'squadron', 'squadronfriends']
+STATION_TYPES = ['Coriolis', 'Orbis', 'Ocellus', 'Outpost', 'CraterOutpost', 'AsteroidBase']
+NOISE_EVENTS = ['Music', 'ReceiveText', 'Scan', 'FSSSignalDiscovered', 'Cargo', 'Materials', 'Loadout', 'Statistics', 'ShipTargeted', 'FuelScoop', 'NavRoute', 'Friends']
+NOISE_WEIGHTS = [20, 15, 12, 12, 6, 3, 3, 1, 10, 8, 4, 6]
+
+def _timestamp(t: datetime) -> str:
+    return t.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def format_event(event: dict) -> str:
+    """One journal line, spaced like the game writes them"""
+    return '{ ' + json.dumps(event, separators=(', ', ':'), ensure_ascii=False)[1:-1] + ' }\n'
+
+def load_commodities() -> list[tuple[str, str]]:
+    """(symbol, name) of the regular commodities EDCM knows"""
+    with open(getResourcePath(path.join('3rdParty', 'aussig.BGS-Tally', 'commodity.csv')), newline='', encoding='utf-8') as f:
+        return [(row['symbol'].lower(), row['name']) for row in csv.DictReader(f)]
+
+class _Carrier:
+    def __init__(self, carrier_id: int, callsign: str, name: str, squadron: bool, system: str, bought_at: datetime):
+        self.carrier_id = carrier_id
+        self.callsign = callsign
+        self.name = name
+        self.squadron = squadron
+        self.system = system
+        self.body_id = 0
+        self.bought_at = bought_at
+        self.buy_logged = False
+        self.fuel = 1000
+        self.balance = 2_000_000_000
+        self.next_jump_at = bought_at
+        self.pending: tuple[datetime, str, int, datetime|None]|None = None  # departure, system, body id, cancelled at
+        self.orders: dict[str, tuple[str, int, int]] = {}  # symbol -> (PurchaseOrder or SaleOrder, amount, price)
+        self.docking_access = 'all'
+        self.allow_notorious = False
+        self.services = {service: False for service in SERVICES}
+        self.crew = 0
+
+    def advance(self, t: datetime):
+        """Completes a jump whose departure passed"""
+        if self.pending is not None and self.pending[3] is None and self.pending[0] <= t:
+            self.system, self.body_id = self.pending[1], self.pending[2]
+            self.pending = None
+        elif self.pending is not None and self.pending[3] is not None:
+            self.pending = None
+
+class _Commander:
+    def __init__(self, fid: str, name: str, credits: int, squadron: str|None, system: str):
+        self.fid = fid
+        self.name = name
+        self.credits = credits
+        self.squadron = squadron
+        self.system = system
+        self.station: tuple[str, int, str]|None = None  # name, market id, type
+        self.carrier: _Carrier|None = None
+        self.squadron_carrier: _Carrier|None = None
+
+class JournalGenerator:
+    def __init__(self, commanders: int = 3, carriers: int|None = None, years: float = 1.0, sessions_per_week: float = 4.0,
+                 noise: int = 150, end: datetime = DEFAULT_END, seed: int = 0, active: float = 0.0):
+        """active is the fraction of commanders whose last session is still running at end, with a jump pending"""
+        if carriers is not None and not 0 <= carriers <= 2 * commanders:
+            raise ValueError('Every commander owns at most one carrier and is member of at most one squadron, so at most two carriers per commander')
+        self.n_commanders = commanders
+        self.n_carriers = commanders if carriers is None else carriers
+        self.years = years
+        self.sessions_per_week = sessions_per_week
+        self.noise = noise
+        self.active = active
+        self.end = end
+        self.start = end - timedelta(days=365.25 * years)
+        self.rng = random.Random(seed)
+        self.commodities = load_commodities()
+        self.systems = list(ladder_systems.keys()) + HUB_SYSTEMS + [self._system_name() for _ in range(200)]
+        self.summary = {'files': 0, 'events': 0, 'bytes': 0, 'commanders': commanders, 'carriers': self.n_carriers, 'jumps': 0, 'jump_cancels': 0, 'trade_orders': 0, 'active_journals': 0}
+
+    def _system_name(self) -> str:
+        letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+        return f'Synth {self.rng.choice(["Sector", "Nebula", "Cluster"])} {self.rng.choice(letters)}{self.rng.choice(letters)}-{self.rng.choice(letters)} {self.rng.choice("abcdefgh")}{self.rng.randint(1, 40)}-{self.rng.randint(0, 900)}'
+
+    def _callsign(self, used: set[str]) -> str:
+        while True:
+            callsign = ''.join(self.rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ0123456789') for _ in range(3)) + '-' + ''.join(self.rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ0123456789') for _ in range(3))
+            if callsign not in used:
+                used.add(callsign)
+                return callsign
+
+    def _setup(self) -> list[_Commander]:
+        n_squadron_carriers = max(0, self.n_carriers - self.n_commanders)
+        squadrons = [f'Synthetic Squadron {i + 1}' for i in range(max(1, self.n_commanders // 8, n_squadron_carriers))]
+        commanders = [_Commander(fid=f'F{self.rng.randrange(10 ** 6, 10 ** 7)}', name=f'Synth Cmdr {i + 1}', credits=self.rng.randrange(10 ** 8, 2 * 10 ** 10),
+                                 # every squadron with a carrier gets a member, the rest join at random
+                                 squadron=squadrons[i] if i < n_squadron_carriers else self.rng.choice(squadrons) if self.rng.random() < 0.7 else None, system=self.rng.choice(HUB_SYSTEMS))
+                      for i in range(self.n_commanders)]
+        used_callsigns: set[str] = set()
+        for i in range(self.n_carriers):
+            # carriers are bought during the first tenth of the history, the first ones right at the start
+            bought_at = self.start + timedelta(seconds=self.rng.uniform(0, (self.end - self.start).total_seconds() * 0.1 * min(1, i)))
+            squadron = i >= self.n_commanders
+            carrier = _Carrier(carrier_id=3_700_000_000 + self.rng.randrange(10 ** 8), callsign=self._callsign(used_callsigns),
+                               name=f'SYNTH {"SQUADRON " if squadron else ""}CARRIER {i + 1}', squadron=squadron, system=self.rng.choice(self.systems), bought_at=bought_at)
+            carrier.services = {service: self.rng.random() < 0.6 for service in SERVICES}
+            if not squadron:
+                commanders[i].carrier = carrier
+            else:
+                for commander in commanders:
+                    if commander.squadron == squadrons[i - self.n_commanders]:
+                        commander.squadron_carrier = carrier
+        return commanders
+
+    def _schedule_sessions(self, commanders: list[_Commander]) -> list[tuple[datetime, datetime, _Commander]]:
+        sessions = []
+        mean_gap = timedelta(days=7) / self.sessions_per_week
+        n_active = round(self.active * len(commanders))
+        active = set(self.rng.sample(range(len(commanders)), n_active)) if n_active else set()
+        for i, commander in enumerate(commanders):
+            commander_sessions = []
+            t = self.start + timedelta(seconds=self.rng.uniform(0, mean_gap.total_seconds()))
+            while t < self.end:
+                duration = timedelta(minutes=self.rng.uniform(20, 240))
+                commander_sessions.append((t, t + duration, commander))
+                t += duration + timedelta(seconds=self.rng.expovariate(1 / mean_gap.total_seconds()))
+            if i in active:
+                # the last session is still running at the end, replacing the ones it would overlap
+                open_at = max(self.end - timedelta(minutes=self.rng.uniform(20, 120)), self.start)
+                commander_sessions = [session for session in commander_sessions if session[1] <= open_at]
+                commander_sessions.append((open_at, self.end + timedelta(hours=1), commander))
+            sessions += commander_sessions
+        return sorted(sessions, key=lambda session: session[0])
+
+    def generate(self, out_dir: str) -> dict:
+        makedirs(out_dir, exist_ok=True)
+        commanders = self._setup()
+        used_names: set[str] = set()
+        for start, end, commander in self._schedule_sessions(commanders):
+            while (file_name := f'Journal.{start.strftime("%Y-%m-%dT%H%M%S")}.01.log') in used_names:
+                start += timedelta(seconds=1)
+            used_names.add(file_name)
+            lines = [format_event(event) for event in self._session(commander, start, end)]
+            with open(path.join(out_dir, file_name), 'w', encoding='utf-8', newline='\n') as f:
+                f.writelines(lines)
+            self.summary['files'] += 1
+            self.summary['events'] += len(lines)
+            self.summary['bytes'] += sum(len(line.encode('utf-8')) for line in lines)
+        return self.summary
+
+    def _session(self, commander: _Commander, start: datetime, end: datetime) -> list[dict]:
+        events = []
+        t = start
+        def emit(event: str, **fields):
+            events.append({'timestamp': _timestamp(t), 'event': event, **fields})
+        active = end > self.end
+        end = min(end, self.end)
+        emit('Fileheader', part=1, language='English/UK', Odyssey=True, gameversion='4.1.0.100', build='r000000/r0 ')
+        emit('Commander', FID=commander.fid, Name=commander.name)
+        emit('Materials', Raw=[], Manufactured=[], Encoded=[])
+        emit('Rank', Combat=self.rng.randint(0, 8), Trade=self.rng.randint(0, 8), Explore=self.rng.randint(0, 8))
+        emit('LoadGame', FID=commander.fid, Commander=commander.name, Horizons=True, Odyssey=True, Ship='Cutter', ShipID=1, GameMode='Open', Credits=commander.credits, Loan=0)
+        if commander.squadron is not None:
+            emit('SquadronStartup', SquadronName=commander.squadron, CurrentRank=self.rng.randint(0, 6))
+        emit('Location', StarSystem=commander.system, Docked=commander.station is not None, **({'StationName': commander.station[0], 'MarketID': commander.station[1]} if commander.station is not None else {}))
+        carriers = [carrier for carrier in (commander.carrier, commander.squadron_carrier) if carrier is not None and carrier.bought_at <= t]
+        for carrier in carriers:
+            carrier.advance(t)
+            if not carrier.squadron and not carrier.buy_logged:
+                # the purchase lands in the first session after it
+                emit('CarrierBuy', CarrierID=carrier.carrier_id, BoughtAtMarket=128000000 + self.rng.randrange(10 ** 6), Location=carrier.system, SystemAddress=self.rng.randrange(10 ** 12), Price=5_000_000_000, Variant='CarrierDockB', Callsign=carrier.callsign)
+                carrier.buy_logged = True
+            emit('CarrierLocation', CarrierType='SquadronCarrier' if carrier.squadron else 'FleetCarrier', CarrierID=carrier.carrier_id, StarSystem=carrier.system, SystemAddress=self.rng.randrange(10 ** 12), BodyID=carrier.body_id)
+        while True:
+            next_t = t + timedelta(seconds=self.rng.expovariate(1 / max(1.0, (end - start).total_seconds() / (self.noise + 20))))
+            if next_t >= end:
+                break
+            t = next_t
+            roll = self.rng.random()
+            if roll < 0.85:
+                self._noise(emit)
+            elif roll < 0.92:
+                self._travel(commander, carriers, emit)
+            elif carriers:
+                carrier = self.rng.choice(carriers)
+                carrier.advance(t)
+                self._manage_carrier(carrier, t, emit)
+        if not active:
+            emit('Shutdown')
+        else:
+            self.summary['active_journals'] += 1
+            # leave a jump in progress, the commander's own carrier first
+            for carrier in carriers:
+                carrier.advance(t)
+                if carrier.pending is not None and carrier.pending[0] > end:
+                    break
+                if carrier.pending is None and carrier.next_jump_at < end:
+                    t = max(t, carrier.next_jump_at)
+                    self._request_jump(carrier, t, emit, departure=end + timedelta(seconds=self.rng.uniform(10 * 60, 50 * 60)))
+                    break
+        return events
+
+    def _noise(self, emit):
+        kind = self.rng.choices(NOISE_EVENTS, NOISE_WEIGHTS)[0]
+        if kind == 'Music':
+            emit('Music', MusicTrack=self.rng.choice(['NoTrack', 'Exploration', 'Supercruise', 'DestinationFromHyperspace', 'Starport']))
+        elif kind == 'ReceiveText':
+            emit('ReceiveText', From='', Message='$COMMS_entered:#name=' + self.rng.choice(self.systems) + ';', Message_Localised='Entered channel', Channel='npc')
+        elif kind == 'Scan':
+            emit('Scan', ScanType='AutoScan', BodyName=f'{self.rng.choice(self.systems)} {self.rng.randint(1, 9)}', BodyID=self.rng.randint(1, 60),
+                 DistanceFromArrivalLS=round(self.rng.uniform(1, 50000), 3), TidalLock=False, TerraformState='', PlanetClass='Icy body', Atmosphere='',
+                 Volcanism='', MassEM=round(self.rng.uniform(0.01, 20), 6), Radius=round(self.rng.uniform(1e6, 1e8), 3), SurfaceGravity=round(self.rng.uniform(0.1, 30), 6),
+                 SurfaceTemperature=round(self.rng.uniform(20, 2000), 3), Landable=self.rng.random() < 0.5, Materials=[{'Name': name, 'Percent': round(self.rng.uniform(0, 25), 6)} for name in ['iron', 'nickel', 'sulphur', 'carbon', 'chromium', 'manganese']],
+                 SemiMajorAxis=round(self.rng.uniform(1e9, 1e12), 3), Eccentricity=round(self.rng.random(), 6), OrbitalInclination=round(self.rng.uniform(-90, 90), 6),
+                 Periapsis=round(self.rng.uniform(0, 360), 6), OrbitalPeriod=round(self.rng.uniform(1e5, 1e9), 3), WasDiscovered=True, WasMapped=False)
+        elif kind == 'FSSSignalDiscovered':
+            emit('FSSSignalDiscovered', SystemAddress=self.rng.randrange(10 ** 12), SignalName=f'{self.rng.choice(["FLEET CARRIER", "Resource Extraction Site", "Nav Beacon"])} {self.rng.randint(1, 999)}', IsStation=self.rng.random() < 0.3)
+        elif kind == 'Cargo':
+            emit('Cargo', Vessel='Ship', Count=self.rng.randint(0, 784), Inventory=[{'Name': symbol, 'Count': self.rng.randint(1, 784), 'Stolen': 0} for symbol, _ in self.rng.sample(self.commodities, 3)])
+        elif kind == 'Materials':
+            emit('Materials', Raw=[{'Name': name, 'Count': self.rng.randint(0, 300)} for name in ['iron', 'nickel', 'carbon', 'sulphur', 'phosphorus']], Manufactured=[], Encoded=[])
+        elif kind == 'Loadout':
+            emit('Loadout', Ship='cutter', ShipID=1, ShipName='', ShipIdent='', HullValue=200_000_000, ModulesValue=self.rng.randrange(10 ** 8, 10 ** 9), UnladenMass=1200.5, CargoCapacity=784, MaxJumpRange=31.2,
+                 Modules=[{'Slot': f'Slot{i:02}_Size{self.rng.randint(1, 8)}', 'Item': f'int_cargorack_size{self.rng.randint(1, 8)}_class1', 'On': True, 'Priority': 1, 'Health': 1.0} for i in range(24)])
+        elif kind == 'Statistics':
+            emit('Statistics', Bank_Account={'Current_Wealth': self.rng.randrange(10 ** 9, 10 ** 11), 'Spent_On_Ships': self.rng.randrange(10 ** 9)},
+                 Trading={'Markets_Traded_With': self.rng.randint(1, 5000), 'Market_Profits': self.rng.randrange(10 ** 10), 'Resources_Traded': self.rng.randrange(10 ** 7)},
+                 Exploration={'Systems_Visited': self.rng.randint(1, 50000), 'Total_Hyperspace_Distance': self.rng.randrange(10 ** 7)})
+        elif kind == 'ShipTargeted':
+            emit('ShipTargeted', TargetLocked=self.rng.random() < 0.5)
+        elif kind == 'FuelScoop':
+            emit('FuelScoop', Scooped=round(self.rng.uniform(0.1, 5), 6), Total=round(self.rng.uniform(5, 64), 6))
+        elif kind == 'NavRoute':
+            emit('NavRoute')
+        else:
+            emit('Friends', Status=self.rng.choice(['Online', 'Offline']), Name=f'Synth Friend {self.rng.randint(1, 500)}')
+
+    def _travel(self, commander: _Commander, carriers: list[_Carrier], emit):
+        if commander.station is not None:
+            emit('Undocked', StationName=commander.station[0], StationType=commander.station[2], MarketID=commander.station[1], Taxi=False, Multicrew=False)
+            commander.station = None
+        elif self.rng.random() < 0.5:
+            commander.system = self.rng.choice(self.systems)
+            emit('FSDJump', Taxi=False, Multicrew=False, StarSystem=commander.system, SystemAddress=self.rng.randrange(10 ** 12), StarPos=[round(self.rng.uniform(-1000, 1000), 5) for _ in range(3)],
+                 SystemAllegiance='Independent', SystemEconomy='$economy_None;', Population=0, Body=commander.system, BodyID=0, BodyType='Star',
+                 JumpDist=round(self.rng.uniform(5, 60), 3), FuelUsed=round(self.rng.uniform(1, 8), 6), FuelLevel=round(self.rng.uniform(10, 64), 6))
+        else:
+            docking_carriers = [carrier for carrier in carriers if carrier.pending is None]
+            if docking_carriers and self.rng.random() < 0.5:
+                carrier = self.rng.choice(docking_carriers)
+                commander.system = carrier.system
+                commander.station = (carrier.callsign, carrier.carrier_id, 'FleetCarrier')
+            else:
+                commander.station = (f'{commander.system} {self.rng.choice(["Port", "Hub", "Station", "Dock"])}', 128000000 + self.rng.randrange(10 ** 6), self.rng.choice(STATION_TYPES))
+            emit('Docked', StationName=commander.station[0], StationType=commander.station[2], Taxi=False, Multicrew=False, StarSystem=commander.system,
+                 SystemAddress=self.rng.randrange(10 ** 12), MarketID=commander.station[1], DistFromStarLS=round(self.rng.uniform(1, 5000), 3), LandingPads={'Small': 4, 'Medium': 4, 'Large': 8})
+
+    def _request_jump(self, carrier: _Carrier, t: datetime, emit, departure: datetime|None = None):
+        system = self.rng.choice([system for system in self.systems if system != carrier.system])
+        body_id = self.rng.randint(0, 40)
+        departure = departure if departure is not None else t + timedelta(seconds=self.rng.uniform(15 * 60, 60 * 60))
+        carrier.pending = (departure, system, body_id, None)
+        carrier.next_jump_at = departure + CD
+        carrier.fuel = max(0, carrier.fuel - self.rng.randint(5, 130))
+        self.summary['jumps'] += 1
+        emit('CarrierJumpRequest', CarrierType='SquadronCarrier' if carrier.squadron else 'FleetCarrier', CarrierID=carrier.carrier_id, SystemName=system, Body=f'{system} {body_id}' if body_id else system,
+             SystemAddress=self.rng.randrange(10 ** 12), BodyID=body_id, DepartureTime=_timestamp(departure))
+
+    def _manage_carrier(self, carrier: _Carrier, t: datetime, emit):
+        carrier_type = 'SquadronCarrier' if carrier.squadron else 'FleetCarrier'
+        action = self.rng.choices(['stats', 'jump', 'cancel', 'order', 'fuel', 'docking'], [30, 30, 4, 25, 6, 5])[0]
+        if action == 'jump' and carrier.pending is None and t >= carrier.next_jump_at and carrier.fuel > 150:
+            self._request_jump(carrier, t, emit)
+        elif action == 'cancel' and carrier.pending is not None and carrier.pending[3] is None and carrier.pending[0] - t > timedelta(minutes=10):
+            carrier.pending = (carrier.pending[0], carrier.pending[1], carrier.pending[2], t)
+            carrier.next_jump_at = t + CD_cancel
+            self.summary['jump_cancels'] += 1
+            emit('CarrierJumpCancelled', CarrierType=carrier_type, CarrierID=carrier.carrier_id)
+        elif action == 'order':
+            self.summary['trade_orders'] += 1
+            if carrier.orders and self.rng.random() < 0.3:
+                symbol = self.rng.choice(list(carrier.orders))
+                del carrier.orders[symbol]
+                emit('CarrierTradeOrder', CarrierID=carrier.carrier_id, CarrierType=carrier_type, BlackMarket=False, Commodity=symbol, CancelTrade=True)
+            else:
+                symbol, name = self.rng.choice(self.commodities)
+                order = self.rng.choice(['PurchaseOrder', 'SaleOrder'])
+                amount, price = self.rng.randint(100, 20000), self.rng.randint(500, 150000)
+                carrier.orders[symbol] = (order, amount, price)
+                emit('CarrierTradeOrder', CarrierID=carrier.carrier_id, CarrierType=carrier_type, BlackMarket=False, Commodity=symbol, Commodity_Localised=name, **{order: amount}, Price=price)
+        elif action == 'fuel' and carrier.fuel < 900:
+            amount = self.rng.randint(1, 1000 - carrier.fuel)
+            carrier.fuel += amount
+            emit('CarrierDepositFuel', CarrierID=carrier.carrier_id, Amount=amount, Total=carrier.fuel)
+        elif action == 'docking':
+            carrier.docking_access = self.rng.choice(DOCKING_ACCESS)
+            carrier.allow_notorious = self.rng.random() < 0.3
+            emit('CarrierDockingPermission', CarrierType=carrier_type, CarrierID=carrier.carrier_id, DockingAccess=carrier.docking_access, AllowNotorious=carrier.allow_notorious)
+        else:
+            # opening the carrier management screen
+            carrier.balance = max(0, carrier.balance + self.rng.randint(-50_000_000, 60_000_000))
+            if self.rng.random() < 0.05:
+                service = self.rng.choice(SERVICES)
+                carrier.services[service] = not carrier.services[service]
+            cargo = sum(amount for order, amount, _ in carrier.orders.values() if order == 'SaleOrder')
+            reserved = sum(amount for order, amount, _ in carrier.orders.values() if order == 'PurchaseOrder')
+            crew = 250 * sum(carrier.services.values())
+            emit('CarrierStats', CarrierID=carrier.carrier_id, CarrierType=carrier_type, Callsign=carrier.callsign, Name=carrier.name, DockingAccess=carrier.docking_access,
+                 AllowNotorious=carrier.allow_notorious, FuelLevel=carrier.fuel, JumpRangeCurr=500.0, JumpRangeMax=500.0, PendingDecommission=False,
+                 SpaceUsage={'TotalCapacity': 25000, 'Crew': crew, 'Cargo': cargo, 'CargoSpaceReserved': reserved, 'ShipPacks': 0, 'ModulePacks': 0, 'FreeSpace': max(0, 25000 - crew - cargo - reserved)},
+                 Finance={'CarrierBalance': carrier.balance, 'ReserveBalance': 0, 'AvailableBalance': carrier.balance, 'ReservePercent': 0, 'TaxRate_rearm': 0},
+                 Crew=[{'CrewRole': 'Captain', 'Activated': True, 'Enabled': True, 'CrewName': 'Synth Captain'}] + [{'CrewRole': service, 'Activated': True, 'Enabled': self.rng.random() < 0.9, 'CrewName': f'Synth {service}'} if active else {'CrewRole': service, 'Activated': False}
+                                                                                                                   for service, active in carrier.services.items()],
+                 ShipPacks=[], ModulePacks=[])
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Writes synthetic journals for load testing EDCM')
+    parser.add_argument('out_dir', help='directory for the journal files, must not contain journals yet')
+    parser.add_argument('--commanders', type=int, default=3)
+    parser.add_argument('--carriers', type=int, default=None, help='defaults to one per commander, more are squadron carriers')
+    parser.add_argument('--years', type=float, default=1.0, help='length of the history')
+    parser.add_argument('--sessions-per-week', type=float, default=4.0, help='average play sessions per commander')
+    parser.add_argument('--noise', type=int, default=150, help='average events per session EDCM does not read')
+    parser.add_argument('--end', default=None, help=f'ISO date the history ends at, "now" for live journals, defaults to {DEFAULT_END.date()}')
+    parser.add_argument('--active', type=float, default=None, help='fraction of commanders still playing at the end with a jump pending, defaults to 1 with --end now, otherwise 0')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.carriers is not None and not 0 <= args.carriers <= 2 * args.commanders:
+        parser.error('--carriers must be between 0 and twice --commanders')
+    if args.active is not None and not 0 <= args.active <= 1:
+        parser.error('--active must be between 0 and 1')
+    if path.isdir(args.out_dir) and any(name.startswith('Journal.') for name in listdir(args.out_dir)):
+        parser.error(f'{args.out_dir} already contains journals')
+    if args.end is None:
+        end = DEFAULT_END
+    elif args.end == 'now':
+        end = datetime.now(timezone.utc).replace(microsecond=0)
+    else:
+        end = datetime.fromisoformat(args.end).replace(tzinfo=timezone.utc)
+    active = args.active if args.active is not None else 1.0 if args.end == 'now' else 0.0
+    summary = JournalGenerator(args.commanders, args.carriers, args.years, args.sessions_per_week, args.noise, end, args.seed, active).generate(args.out_dir)
+    print(f'Wrote {summary["files"]:,} journals with {summary["events"]:,} events ({summary["bytes"] / 2 ** 20:,.1f} MiB) to {args.out_dir}')
+    print(f'{summary["commanders"]} commanders, {summary["carriers"]} carriers, {summary["jumps"]:,} jumps ({summary["jump_cancels"]:,} cancelled), {summary["trade_orders"]:,} trade order changes, {summary["active_journals"]} active journals')
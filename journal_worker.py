@@ -0,0 +1,136 @@
+import queue
+import re
+import threading
+import time
+import traceback
+from typing import Callable
+from watchdog.events import FileSystemEventHandler
+from model import CarrierModel, ModelSnapshot
+from config import JOURNAL_COALESCE_QUIET, JOURNAL_COALESCE_MAX, URGENT_JOURNAL_EVENTS
+
+_URGENT_EVENT_PATTERN = re.compile(rb'"event"\s*:\s*"(?:' + b'|'.join(re.escape(i.encode()) for i in URGENT_JOURNAL_EVENTS) + rb')"')
+
+class JournalWorker:
+    """
+    Reads journals on a dedicated thread so file I/O, JSON decoding and the
+    pandas rebuilds never run on the Tk thread.
+
+    Update requests are coalesced: a read starts once no request arrived for
+    JOURNAL_COALESCE_QUIET ms, and at the latest JOURNAL_COALESCE_MAX ms after
+    the first pending request. Urgent requests, e.g. a journal that received a
+    CarrierJumpRequest, are read right away. Requests naming a journal file
+    only read the named files, a request without one rescans the journal
+    directories. Finished reads publish a ModelSnapshot to a single slot
+    queue, an unconsumed older snapshot is replaced so a slow consumer never
+    makes the worker wait.
+    """
+    def __init__(self, model:CarrierModel, on_snapshot:Callable[[], None], on_error:Callable[[str], None],
+                 quiet_ms:int=JOURNAL_COALESCE_QUIET, max_latency_ms:int=JOURNAL_COALESCE_MAX):
+        self.model = model
+        self.on_snapshot = on_snapshot
+        self.on_error = on_error
+        self.quiet = quiet_ms / 1000
+        self.max_latency = max_latency_ms / 1000
+        self.snapshots: queue.Queue[tuple[CarrierModel, ModelSnapshot]] = queue.Queue(maxsize=1)
+        self._condition = threading.Condition()
+        self._pending_journals: set[str] = set()
+        self._pending_rescan = False
+        self._pending_urgent = False
+        self._first_pending_at: float|None = None
+        self._last_pending_at: float|None = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='JournalWorker', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def set_model(self, model:CarrierModel):
+        self.model = model
+        self.request_update(urgent=True)
+
+    def request_update(self, journal:str|None=None, urgent:bool|None=None):
+        """
+        Queues a read of journal, or a rescan without one. urgent defaults to
+        whether the unread part of journal contains one of URGENT_JOURNAL_EVENTS.
+        """
+        if urgent is None:
+            urgent = journal is not None and self.is_urgent(journal)
+        now = time.monotonic()
+        with self._condition:
+            if self._first_pending_at is None:
+                self._first_pending_at = now
+            self._last_pending_at = now
+            if journal is None:
+                self._pending_rescan = True
+            else:
+                self._pending_journals.add(journal)
+            self._pending_urgent |= urgent
+            self._condition.notify()
+
+    def is_urgent(self, journal:str) -> bool:
+        model = self.model
+        # called from the observer thread, the worker mutates the reader's offsets while reading
+        with model.read_lock:
+            unread = model.journal_reader.peek_unread(journal)
+        return _URGENT_EVENT_PATTERN.search(unread) is not None
+
+    def get_latest_snapshot(self, model:CarrierModel) -> ModelSnapshot|None:
+        """Returns the newest pending snapshot produced from model, if any"""
+        try:
+            source, snapshot = self.snapshots.get_nowait()
+        except queue.Empty:
+            return None
+        return snapshot if source is model else None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._first_pending_at is None and not self._stopped:
+                    self._condition.wait()
+                while not self._pending_urgent and not self._stopped:
+                    deadline = min(self._last_pending_at + self.quiet, self._first_pending_at + self.max_latency)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._stopped:
+                    return
+                journals = None if self._pending_rescan else list(self._pending_journals)
+                self._pending_journals = set()
+                self._pending_rescan = False
+                self._pending_urgent = False
+                self._first_pending_at = None
+                self._last_pending_at = None
+            model = self.model
+            try:
+                model.read_journals(journals, publish=False)
+                snapshot = model.take_snapshot()
+            except Exception:
+                self.on_error(traceback.format_exc())
+                continue
+            self._publish(model, snapshot)
+
+    def _publish(self, model:CarrierModel, snapshot:ModelSnapshot):
+        try:
+            self.snapshots.get_nowait()
+        except queue.Empty:
+            pass
+        self.snapshots.put_nowait((model, snapshot))
+        self.on_snapshot()
+
+class JournalEventHandler(FileSystemEventHandler):
+    """Forwards journal file events to request_update, e.g. JournalWorker.request_update"""
+    def __init__(self, request_update: Callable[[str|None], None]):
+        self.request_update = request_update
+    def on_modified(self, event):
+        if not event.is_directory and event.src_path.endswith('.log'):
+            self.request_update(event.src_path)
+    def on_created(self, event):
+        # a new journal, rescan the directories
+        if not event.is_directory and event.src_path.endswith('.log'):
+            self.request_update(None)
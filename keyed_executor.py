@@ -0,0 +1,72 @@
+import time
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable
+
+class KeyedExecutor:
+    """
+    Runs tasks on a bounded thread pool. Tasks submitted with the same key run
+    one at a time in submission order, tasks for different keys run in
+    parallel. Keeps queue depth and latency figures for get_metrics().
+    """
+    def __init__(self, max_workers: int, thread_name_prefix: str = '', latency_window: int = 100):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._queues: dict[Hashable, deque[tuple[float, Callable, tuple]]] = {}
+        self._completed = 0
+        self._failed = 0
+        self._wait_times: deque[float] = deque(maxlen=latency_window)
+        self._run_times: deque[float] = deque(maxlen=latency_window)
+
+    def submit(self, key: Hashable, fn: Callable, *args):
+        with self._lock:
+            pending = self._queues.get(key)
+            if pending is not None:
+                # a drain for this key is already scheduled, it picks the task up
+                pending.append((time.monotonic(), fn, args))
+                return
+            self._queues[key] = deque([(time.monotonic(), fn, args)])
+        self._executor.submit(self._drain, key)
+
+    def _drain(self, key: Hashable):
+        with self._lock:
+            submitted, fn, args = self._queues[key][0]
+        started = time.monotonic()
+        try:
+            fn(*args)
+        except Exception:
+            traceback.print_exc()
+            failed = True
+        else:
+            failed = False
+        finished = time.monotonic()
+        with self._lock:
+            self._wait_times.append(started - submitted)
+            self._run_times.append(finished - started)
+            self._completed += 1
+            self._failed += failed
+            pending = self._queues[key]
+            pending.popleft()
+            if not pending:
+                del self._queues[key]
+                return
+        # run the next task of this key as a new pool job, so busy keys don't starve the rest
+        self._executor.submit(self._drain, key)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            depth = {key: len(pending) for key, pending in self._queues.items()}
+            wait_times, run_times = list(self._wait_times), list(self._run_times)
+            completed, failed = self._completed, self._failed
+        return {
+            'queue_depth': sum(depth.values()),
+            'queue_depth_by_key': depth,
+            'completed': completed,
+            'failed': failed,
+            'wait_avg_s': sum(wait_times) / len(wait_times) if wait_times else None,
+            'wait_max_s': max(wait_times, default=None),
+            'handler_avg_s': sum(run_times) / len(run_times) if run_times else None,
+            'handler_max_s': max(run_times, default=None),
+        }
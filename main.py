@@ -1,17 +1,12 @@
 import os
 from argparse import ArgumentParser
-import tkinter as tk
-import sv_ttk
-from controller import CarrierController
 from model import CarrierModel, JournalReader
 import sys
 import pickle
 import dotenv
 dotenv.load_dotenv()
-from PIL import Image, ImageTk
 from utility import getResourcePath, getJournalPath, getCachePath
-from config import WINDOW_SIZE
-from popups import apply_theme_to_titlebar
+from config import WINDOW_SIZE, API_HOST, API_PORT
 
 def load_journal_reader_from_cache(jr_version:str, journal_paths: list[str]) -> JournalReader | None:
     cache_path = getCachePath(jr_version, journal_paths)
@@ -35,6 +30,14 @@ def main():
     parser.add_argument("-p", "--paths",
                     nargs='+', dest="paths", default=None,
                     help="journal paths: overrides journal path(s)")
+    parser.add_argument("--headless", action="store_true",
+                    help="run without a GUI, sending notifications and logging JSON to stdout")
+    parser.add_argument("--settings", dest="settings", default=None,
+                    help="settings file for headless mode, defaults to the GUI's settings.toml")
+    parser.add_argument("--api", nargs='?', type=int, const=API_PORT, default=None, dest="api_port", metavar="PORT",
+                    help=f"serve the fleet state as JSON over HTTP, on port {API_PORT} unless given")
+    parser.add_argument("--api-host", dest="api_host", default=API_HOST,
+                    help=f"address the fleet API binds to, defaults to {API_HOST}")
     args = parser.parse_args()
     env_journal_paths = os.getenv('EDCM_JOURNAL_PATHS')
     if args.paths:
@@ -50,6 +53,18 @@ def main():
     for journal_path in journal_paths:
         assert os.path.exists(journal_path), f'Journal path {journal_path} does not exist, please specify one with --paths or EDCM_JOURNAL_PATHS environment variable if the default is incorrect'
 
+    if args.headless:
+        from headless import run_headless
+        run_headless(journal_paths, settings_file=args.settings, api_port=args.api_port, api_host=args.api_host)
+        return
+
+    # the GUI modules are only needed, and only importable, with a display
+    import tkinter as tk
+    import sv_ttk
+    from PIL import Image, ImageTk
+    from controller import CarrierController
+    from popups import apply_theme_to_titlebar
+
     # build first, then splash, then tk root
     if sys.platform == 'darwin':
         jr = load_journal_reader_from_cache(jr_version=JournalReader.version_hash(), journal_paths=journal_paths)
@@ -74,7 +89,13 @@ def main():
     root.iconphoto(True, *[ImageTk.PhotoImage(photo.resize((resolution, resolution))) for resolution in (16, 32, 48, 64, 128, 256, 512, 1024) if resolution < photo.width and resolution < photo.height])
     root.update()
 
-    app = CarrierController(root, model=model)
+    api = None
+    if args.api_port is not None:
+        from api_server import FleetApi
+        api = FleetApi(model, host=args.api_host, port=args.api_port)
+    app = CarrierController(root, model=model, api=api)
+    if api is not None:
+        api.start()
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,214 @@
+"""
+Timers, counters and histograms around the hot paths, with the status
+change queue and @cached statistics collected on demand. Rendered as
+Prometheus text for /metrics of the fleet API and as rows for the
+diagnostics popup.
+"""
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, NamedTuple, TYPE_CHECKING
+from config import METRICS_BUCKETS
+if TYPE_CHECKING:
+    from model import CarrierModel
+
+class Sample(NamedTuple):
+    name: str
+    kind: str  # 'counter' or 'gauge'
+    help: str
+    labels: dict[str, str]
+    value: float
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = METRICS_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float|None:
+        """Upper bound of the bucket holding the q quantile, the max for the +Inf bucket"""
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank, seen = q * self.count, 0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank:
+                    return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+            return self.max
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+def _label_key(labels: dict[str, str]) -> tuple:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels: Iterable[tuple[str, str]]) -> str:
+    labels = [f'{key}="{_escape(value)}"' for key, value in labels]
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: dict[str, str] = {}
+        self._histograms: dict[str, dict[tuple, Histogram]] = {}
+        self._counters: dict[str, dict[tuple, Counter]] = {}
+        self._collectors: dict[str, Callable[[], list[Sample]]] = {}
+
+    def histogram(self, name: str, help: str = '', **labels) -> Histogram:
+        key = _label_key(labels)
+        with self._lock:
+            family = self._histograms.setdefault(name, {})
+            if key not in family:
+                family[key] = Histogram()
+                self._help.setdefault(name, help)
+            return family[key]
+
+    def counter(self, name: str, help: str = '', **labels) -> Counter:
+        key = _label_key(labels)
+        with self._lock:
+            family = self._counters.setdefault(name, {})
+            if key not in family:
+                family[key] = Counter()
+                self._help.setdefault(name, help)
+            return family[key]
+
+    def register_collector(self, name: str, collect: Callable[[], list[Sample]]):
+        """Adds or replaces a function reporting samples when metrics are read"""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def collect(self) -> list[Sample]:
+        with self._lock:
+            collectors = list(self._collectors.values())
+        samples = []
+        for collect in collectors:
+            try:
+                samples += collect()
+            except Exception as e:
+                print(f'Error collecting metrics: {e}')
+        return samples
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            histograms = {name: dict(family) for name, family in self._histograms.items()}
+            counters = {name: dict(family) for name, family in self._counters.items()}
+            help = dict(self._help)
+        for name, family in sorted(histograms.items()):
+            lines += [f'# HELP {name} {help.get(name, "")}', f'# TYPE {name} histogram']
+            for key, histogram in sorted(family.items()):
+                with histogram._lock:
+                    counts, count, total = list(histogram.counts), histogram.count, histogram.sum
+                cumulative = 0
+                for bound, bucket_count in zip(list(histogram.buckets) + ['+Inf'], counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{_format_labels(key + (("le", str(bound)),))} {cumulative}')
+                lines += [f'{name}_sum{_format_labels(key)} {total}', f'{name}_count{_format_labels(key)} {count}']
+        for name, family in sorted(counters.items()):
+            lines += [f'# HELP {name} {help.get(name, "")}', f'# TYPE {name} counter']
+            lines += [f'{name}{_format_labels(key)} {counter.value}' for key, counter in sorted(family.items())]
+        families: dict[str, list[Sample]] = {}
+        for sample in self.collect():
+            families.setdefault(sample.name, []).append(sample)  # a family's samples must be contiguous
+        for name, samples in families.items():
+            lines += [f'# HELP {name} {samples[0].help}', f'# TYPE {name} {samples[0].kind}']
+            lines += [f'{name}{_format_labels(_label_key(sample.labels))} {sample.value}' for sample in samples]
+        return '\n'.join(lines) + '\n'
+
+    def get_rows(self) -> list[list[str]]:
+        """Metric, labels, count, mean, p95, max and total, times in ms, for the diagnostics popup"""
+        rows = []
+        with self._lock:
+            histograms = {name: dict(family) for name, family in self._histograms.items()}
+            counters = {name: dict(family) for name, family in self._counters.items()}
+        for name, family in sorted(histograms.items()):
+            for key, histogram in sorted(family.items()):
+                if histogram.count == 0:
+                    continue
+                p95 = histogram.quantile(0.95)
+                rows.append([name, ', '.join(f'{k}={v}' for k, v in key), f'{histogram.count:,}', f'{histogram.sum / histogram.count * 1000:,.1f}',
+                             f'{p95 * 1000:,.1f}', f'{histogram.max * 1000:,.1f}', f'{histogram.sum * 1000:,.0f}'])
+        for name, family in sorted(counters.items()):
+            for key, counter in sorted(family.items()):
+                rows.append([name, ', '.join(f'{k}={v}' for k, v in key), f'{counter.value:,}', '', '', '', ''])
+        for sample in self.collect():
+            value = f'{sample.value:,.3f}' if isinstance(sample.value, float) and not sample.value.is_integer() else f'{int(sample.value):,}'
+            rows.append([sample.name, ', '.join(f'{k}={v}' for k, v in sorted(sample.labels.items())), value, '', '', '', ''])
+        return rows
+
+REGISTRY = MetricsRegistry()
+
+@contextmanager
+def timer(name: str, help: str = '', **labels):
+    """Observes the duration of the block in seconds, also when it raises"""
+    histogram = REGISTRY.histogram(name, help, **labels)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+def timed(name: str, help: str = '', **labels):
+    """Decorator observing the duration of each call in seconds"""
+    def decorator(func):
+        histogram = REGISTRY.histogram(name, help, **labels)
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def collectCacheSamples() -> list[Sample]:
+    from decos import CACHED_FUNCTIONS
+    samples = []
+    for func in CACHED_FUNCTIONS:
+        labels = {'function': f'{func.__module__}.{func.__qualname__}'}
+        info = func.cache_info()
+        samples += [Sample(f'edcm_cache_{key}_total', 'counter', f'Calls of @cached functions by outcome: {key}', labels, info[key]) for key in ['hits', 'misses', 'stale', 'errors']]
+        samples.append(Sample('edcm_cache_entries', 'gauge', 'Entries held by @cached functions', labels, info['size']))
+    return samples
+
+def registerModelMetrics(get_model: Callable[[], 'CarrierModel']):
+    """Collects the status change queue statistics and fleet size of the current model"""
+    def collect() -> list[Sample]:
+        model = get_model()
+        m = model.get_status_change_metrics()
+        samples = [
+            Sample('edcm_carriers', 'gauge', 'Carriers read from the journals', {}, len(model.get_carriers())),
+            Sample('edcm_status_change_queue_depth', 'gauge', 'Status changes waiting for their handler', {}, m['queue_depth']),
+            Sample('edcm_status_change_completed_total', 'counter', 'Status change handlers completed', {}, m['completed']),
+            Sample('edcm_status_change_failed_total', 'counter', 'Status change handlers that raised', {}, m['failed']),
+        ]
+        for key in ['wait_avg_s', 'wait_max_s', 'handler_avg_s', 'handler_max_s']:
+            if m[key] is not None:
+                samples.append(Sample(f'edcm_status_change_{key[:-2]}_seconds', 'gauge', 'Over the recent status changes', {}, m[key]))
+        return samples
+    REGISTRY.register_collector('model', collect)
+
+REGISTRY.register_collector('cache', collectCacheSamples)
@@ -12,11 +12,14 @@ from humanize import naturaltime
 from random import random
 from typing import Callable, Literal, NamedTuple
 from collections import namedtuple
+from keyed_executor import KeyedExecutor
+from metrics import timed, timer
 from utility import getHMS, getHammerCountdown, getResourcePath, getJournalPath
-from config import PADLOCK, CD, CD_cancel, JUMPLOCK, ladder_systems, AVG_JUMP_CAL_WINDOW, ASSUME_DECCOM_AFTER
+from config import PADLOCK, CD, CD_cancel, JUMPLOCK, ladder_systems, AVG_JUMP_CAL_WINDOW, ASSUME_DECCOM_AFTER, STATUS_CHANGE_WORKERS
 
 _SINGLE_DIGIT_TOKEN = re.compile(r'(?<!\d)(\d)(?!\d)')
 _CARRIER_CALLSIGN_PATTERN = re.compile(r'^[A-Z0-9]{3}-[A-Z0-9]{3}$')
+_JOURNAL_FILENAME_PATTERN = re.compile(r'^Journal\.\d{4}-\d{2}-\d{2}T\d{6}\.\d{2}\.log$')
 
 def format_local_datetime_aligned(dt: datetime) -> str:
     """
@@ -37,7 +40,7 @@ class JournalReader:
         self.version = self.version_hash()
         
         self.journal_paths = journal_paths
-        self.journal_processed = []
+        self.journal_processed = set()
         self.journal_latest = {}
         self.journal_latest_unknown_fid = {}
         self._load_games = []
@@ -73,42 +76,93 @@ class JournalReader:
                     print(f'{(self.tracked_items + ["carrier_owners"])[i]} was dropped')
 
     def read_journals(self):
-        latest_journal_info = {}
-        for key, value in zip(self.journal_latest.keys(), self.journal_latest.values()):
-            latest_journal_info[value['filename']] = {'fid': key, 'line_pos': value['line_pos'], 'is_active': value['is_active']}
         journals = []
         for journal_path in self.journal_paths:
             files = listdir(journal_path)
-            r = r'^Journal\.\d{4}-\d{2}-\d{2}T\d{6}\.\d{2}\.log$'
-            journal_files = sorted([i for i in files if re.fullmatch(r, i)], reverse=False)
+            journal_files = sorted([i for i in files if _JOURNAL_FILENAME_PATTERN.fullmatch(i)], reverse=False)
             assert len(journal_files) > 0, f'No journal files found in {journal_path}'
             journals += [path.join(journal_path, i) for i in journal_files]
+        self._update_journals(journals)
+
+    def read_journal_files(self, journals:list[str]):
+        """Reads only the given journal files from their stored offsets, without listing the journal directories"""
+        targets = set()
+        for journal in journals:
+            journal = self._canonical_journal_path(journal)
+            if journal is not None and path.isfile(journal):
+                targets.add(journal)
+        self._update_journals(sorted(targets, key=path.basename))
+
+    def _canonical_journal_path(self, journal:str) -> str|None:
+        # map to the spelling used by read_journals so offsets stored for it are found
+        journal_dir = path.normcase(path.abspath(path.dirname(journal)))
+        filename = path.basename(journal)
+        if not _JOURNAL_FILENAME_PATTERN.fullmatch(filename):
+            return None
+        for journal_path in self.journal_paths:
+            if path.normcase(path.abspath(journal_path)) == journal_dir:
+                return path.join(journal_path, filename)
+        return None
+
+    def peek_unread(self, journal:str) -> bytes:
+        """Returns the bytes of a tracked journal past its stored offset, without consuming them"""
+        journal = self._canonical_journal_path(journal)
+        if journal is None:
+            return b''
+        byte_pos = None
+        for info in list(self.journal_latest.values()) + list(self.journal_latest_unknown_fid.values()):
+            if info['filename'] == journal:
+                byte_pos = info['byte_pos']
+        if byte_pos is None:
+            return b''
+        try:
+            with open(journal, 'rb') as f:
+                f.seek(byte_pos)
+                return f.read()
+        except OSError:
+            return b''
+
+    def _update_journals(self, journals:list[str]):
+        latest_journal_info = {}
+        for key, value in zip(self.journal_latest.keys(), self.journal_latest.values()):
+            latest_journal_info[value['filename']] = {'fid': key, 'byte_pos': value['byte_pos'], 'is_active': value['is_active']}
         for journal in journals:
             if journal not in self.journal_processed:
                 self._read_journal(journal)
             elif journal in latest_journal_info.keys():
                 if latest_journal_info[journal]['is_active']:
-                    self._read_journal(journal, latest_journal_info[journal]['line_pos'], latest_journal_info[journal]['fid'])
+                    self._read_journal(journal, latest_journal_info[journal]['byte_pos'], latest_journal_info[journal]['fid'])
             elif journal in self.journal_latest_unknown_fid.keys():
-                self._read_journal(journal, self.journal_latest_unknown_fid[journal]['line_pos'])
+                self._read_journal(journal, self.journal_latest_unknown_fid[journal]['byte_pos'])
         self.items = self._get_parsed_items()
         assert len(self.items[4]) > 0, 'No carrier found, if you do have a carrier, try logging in and opening the carrier management screen'
     
-    def _read_journal(self, journal_path:str, line_pos:int|None=None, fid_last:str|None=None):
+    def _read_journal(self, journal_path:str, byte_pos:int=0, fid_last:str|None=None):
         # print(journal)
         items = []
-        with open(journal_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            line_pos_new = len(lines)
-            lines = lines[line_pos:]
-            # if line_pos is not None:
-            #     print(*lines, sep='\n')
-            for i in lines:
-                try:
-                    items.append(json.loads(i))
-                except json.decoder.JSONDecodeError as e: # ignore ill-formated entries
-                    print(f'{journal_path} {e}')
-                    continue
+        with open(journal_path, 'rb') as f:
+            f.seek(byte_pos)
+            data = f.read()
+        # only consume complete lines, a partially written entry is picked up on the next read
+        end = data.rfind(b'\n') + 1
+        lines = data[:end].splitlines()
+        tail = data[end:]
+        if tail.strip():
+            try:
+                json.loads(tail)
+                lines.append(tail)
+                end = len(data)
+            except json.decoder.JSONDecodeError:
+                pass
+        byte_pos_new = byte_pos + end
+        for i in lines:
+            if not i.strip():
+                continue
+            try:
+                items.append(json.loads(i.decode('utf-8')))
+            except (json.decoder.JSONDecodeError, UnicodeDecodeError) as e: # ignore ill-formated entries
+                print(f'{journal_path} {e}')
+                continue
         
         parsed_fid, is_active = self._parse_items(items, fid_last)
         if fid_last is None:
@@ -121,18 +175,17 @@ class JournalReader:
             if fid is None:
                 match = re.search(r'\d{4}-\d{2}-\d{2}T\d{6}', journal_path)
                 if datetime.now() - datetime.strptime(match.group(0), '%Y-%m-%dT%H%M%S') < timedelta(hours=1): # allows one hour for fid to show up
-                    self.journal_latest_unknown_fid[journal_path] = {'filename': journal_path, 'line_pos': line_pos_new, 'is_active': is_active}
+                    self.journal_latest_unknown_fid[journal_path] = {'filename': journal_path, 'byte_pos': byte_pos_new, 'is_active': is_active}
                 else:
                     self.journal_latest_unknown_fid.pop(journal_path, None)
             else:
                 self.journal_latest_unknown_fid.pop(journal_path, None)
-                self.journal_latest[fid] = {'filename': journal_path, 'line_pos': line_pos_new, 'is_active': is_active}
+                self.journal_latest[fid] = {'filename': journal_path, 'byte_pos': byte_pos_new, 'is_active': is_active}
         else:
             self.journal_latest_unknown_fid.pop(journal_path, None)
             if fid is not None:
-                self.journal_latest[fid] = {'filename': journal_path, 'line_pos': line_pos_new, 'is_active': is_active}
-        if journal_path not in self.journal_processed:
-            self.journal_processed.append(journal_path)
+                self.journal_latest[fid] = {'filename': journal_path, 'byte_pos': byte_pos_new, 'is_active': is_active}
+        self.journal_processed.add(journal_path)
 
 
     def _parse_items(self, items:list, fid_last:str|None=None) -> tuple[str|None, bool]:
@@ -216,6 +269,20 @@ class JournalReader:
                 results[journal] = info['filename']
         return results if results else None
 
+class ModelSnapshot(NamedTuple):
+    """
+    State published by the thread that reads journals, consumed by the thread
+    that renders. The containers are copies and must not be mutated.
+    """
+    version: int
+    carriers: dict
+    carrier_owners: dict
+    cmdr_names: dict[str, str]
+    cmdr_balances: dict[str, int]
+    cmdr_locations: dict[str, pd.DataFrame]
+    active_journals: dict[str, str]|None
+    active_unknown_fid_journals: dict[str, str]|None
+
 class CarrierModel:
     def __init__(self, journal_paths:list[str], journal_reader:JournalReader|None=None, dropout:bool=False, droplist:list[str]=None):
         self.journal_reader = journal_reader if journal_reader else JournalReader(journal_paths, dropout=dropout, droplist=droplist)
@@ -230,6 +297,10 @@ class CarrierModel:
         self.carrier_owners = {}
         self.active_timer = False
         self.manual_timers = {}
+        self.read_lock = threading.RLock()
+        self.status_change_executor = KeyedExecutor(max_workers=STATUS_CHANGE_WORKERS, thread_name_prefix='StatusChange')
+        self.read_count = 0
+        self.snapshot = ModelSnapshot(0, {}, {}, {}, {}, {}, None, None)
         self.journal_paths = journal_reader.journal_paths if journal_reader else journal_paths
         # self.read_counter = 0
         self._ignore_list = []
@@ -255,8 +326,27 @@ class CarrierModel:
         self.read_journals()
         self.update_carriers(datetime.now(timezone.utc))
 
-    def read_journals(self):
-        self.journal_reader.read_journals()
+    def read_journals(self, journals:list[str]|None=None, publish:bool=True):
+        """
+        Reads new journal entries and updates the working state. With journals
+        given only those files are read, otherwise the journal directories are
+        rescanned. With publish set to False the caller is responsible for
+        handing take_snapshot() to apply_snapshot(), e.g. from a worker thread
+        to the UI thread.
+        """
+        with self.read_lock:
+            self._read_journals(journals)
+        if publish:
+            self.apply_snapshot(self.take_snapshot())
+
+    @timed('edcm_journal_read_seconds', 'Journal reads including all processing phases')
+    def _read_journals(self, journals:list[str]|None=None):
+        # the reader is timed here, decorating it would change its version_hash and drop every journal cache
+        with timer('edcm_journal_phase_seconds', 'Journal processing by phase', phase='parse'):
+            if journals is None:
+                self.journal_reader.read_journals()
+            else:
+                self.journal_reader.read_journal_files(journals)
         first_read = self.carriers == {}
         load_games, carrier_locations, jump_requests, jump_cancels, stats, trade_orders, carrier_buys, trit_deposits, docking_perms, squadrons, docked, undocked, fsd_jumps, self.carrier_owners = self.journal_reader.get_items() if first_read else self.journal_reader.get_new_items()
         # print(self.read_counter, first_read, len(load_games), len(carrier_locations), len(jump_requests), len(jump_cancels), len(stats), len(trade_orders), len(carrier_buys), len(trit_deposits), len(docking_perms))
@@ -285,10 +375,28 @@ class CarrierModel:
 
         self.update_ignore_list()
 
-        
-
         self.journal_reader.update_items_count()
+        self.read_count += 1
+
+    def take_snapshot(self) -> ModelSnapshot:
+        with self.read_lock:
+            return ModelSnapshot(
+                version=self.read_count,
+                carriers={carrierID: data.copy() for carrierID, data in self.carriers.items()},
+                carrier_owners=self.carrier_owners.copy(),
+                cmdr_names=self.cmdr_names.copy(),
+                cmdr_balances=self.cmdr_balances.copy(),
+                # itineraries are replaced rather than modified when journals are read
+                cmdr_locations=self.cmdr_locations.copy(),
+                active_journals=self.journal_reader.get_latest_active_journals(),
+                active_unknown_fid_journals=self.journal_reader.get_active_unknown_fid_journals(),
+            )
+
+    def apply_snapshot(self, snapshot:ModelSnapshot):
+        """Makes a snapshot visible to update_carriers and the getters, call from the rendering thread"""
+        self.snapshot = snapshot
 
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='load_games')
     def process_load_games(self, load_games, first_read:bool=True):
         for load_game in load_games:
             if not first_read or load_game['FID'] not in self.cmdr_balances.keys():
@@ -296,6 +404,7 @@ class CarrierModel:
             if not first_read or load_game['FID'] not in self.cmdr_names.keys():
                 self.cmdr_names[load_game['FID']] = load_game['Commander']
     
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='itinerary')
     def process_itinerary(self, docked, undocked, fsd_jumps, first_read:bool=True):
         df_events = pd.DataFrame(docked + undocked + fsd_jumps, columns=['timestamp', 'event', 'StationName', 'StarSystem', 'MarketID', 'FID'], )
         df_events['timestamp'] = df_events['timestamp'].apply(lambda x: datetime.strptime(x, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc))
@@ -337,6 +446,7 @@ class CarrierModel:
                 df_itinerary = df_itinerary.astype({'MarketID': 'Int64'})
                 self.cmdr_locations[fid] = df_itinerary.copy()
 
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='stats')
     def process_stats(self, stats, first_read:bool=True):
         for stat in stats:
             if not first_read or stat['CarrierID'] not in self.carriers.keys():
@@ -361,6 +471,7 @@ class CarrierModel:
                 self.carriers[stat['CarrierID']]['PendingDecom'] = stat['PendingDecommission']
                 self.carriers[stat['CarrierID']]['DockingPerm'] = {'DockingAccess': stat['DockingAccess'], 'AllowNotorious': stat['AllowNotorious']}
 
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='carrier_buys')
     def process_carrier_buys(self, carrier_buys, first_read:bool=True):
         for carrier_buy in carrier_buys:
             if carrier_buy['CarrierID'] not in self.carriers.keys():
@@ -370,6 +481,7 @@ class CarrierModel:
             if 'TimeBought' not in self.carriers[carrier_buy['CarrierID']].keys():
                 self.carriers[carrier_buy['CarrierID']]['TimeBought'] = datetime.strptime(carrier_buy['timestamp'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)    
     
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='trit_deposits')
     def process_trit_deposits(self, trit_deposits, first_read:bool=True):
         for trit_deposit in trit_deposits:
             if trit_deposit['CarrierID'] in self.carriers.keys():
@@ -378,6 +490,7 @@ class CarrierModel:
                 if not first_read or last_update is None or datetime.strptime(trit_deposit['timestamp'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc) > last_update:
                     self.carriers[trit_deposit['CarrierID']]['Fuel'] = {'FuelLevel': trit_deposit['Total'], 'JumpRange': None, 'DepotTime': datetime.strptime(trit_deposit['timestamp'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)}
     
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='docking_perms')
     def process_docking_perms(self, docking_perms, first_read:bool=True):
         for docking_perm in docking_perms:
             if docking_perm['CarrierID'] in self.carriers.keys():
@@ -385,12 +498,14 @@ class CarrierModel:
                     if datetime.strptime(docking_perm['timestamp'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc) > self.carriers[docking_perm['CarrierID']]['StatTime'] if 'StatTime' in self.carriers[docking_perm['CarrierID']].keys() else datetime.min.replace(tzinfo=timezone.utc):
                         self.carriers[docking_perm['CarrierID']]['DockingPerm'] = {'DockingAccess': docking_perm['DockingAccess'], 'AllowNotorious': docking_perm['AllowNotorious']}
 
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='carrier_locations')
     def process_carrier_locations(self, carrier_locations, first_read:bool=True):
         for carrier_location in carrier_locations:
             if carrier_location['CarrierID'] in self.carriers.keys():
                 if not first_read or 'CarrierLocation' not in self.carriers[carrier_location['CarrierID']].keys():
                     self.carriers[carrier_location['CarrierID']]['CarrierLocation'] = {'SystemName': carrier_location['StarSystem'], 'Body': None, 'BodyID': carrier_location['BodyID'], 'timestamp': datetime.strptime(carrier_location['timestamp'], '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)}
     
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='jumps')
     def process_jumps(self, jump_requests, jump_cancels, first_read:bool=True):
         jumps = pd.DataFrame(jump_requests + jump_cancels, columns=['CarrierID', 'timestamp', 'event', 'SystemName', 'Body', 'BodyID', 'DepartureTime']).sort_values('timestamp', ascending=False)
         for carrierID in self.carriers.keys():
@@ -435,6 +550,7 @@ class CarrierModel:
                         fc_jumps = old_jumps
             self.carriers[carrierID]['jumps'] = fc_jumps.copy()
 
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='trade_orders')
     def process_trade_orders(self, trade_orders, first_read:bool=True):
         if len(trade_orders) != 0:
             df_trade_orders = pd.DataFrame(trade_orders, columns=['CarrierID', 'timestamp', 'event', 'Commodity', 'Commodity_Localised', 'CancelTrade', 'PurchaseOrder', 'SaleOrder', 'Price']).sort_values('timestamp', ascending=True).reset_index(drop=True).copy()
@@ -456,6 +572,7 @@ class CarrierModel:
                             fc_active_trades[commodity] = order
                 self.carriers[carrierID]['active_trades'] = pd.DataFrame(fc_active_trades.values(), columns=['CarrierID', 'timestamp', 'event', 'Commodity', 'Commodity_Localised', 'CancelTrade', 'PurchaseOrder', 'SaleOrder', 'Price']).sort_values('timestamp', ascending=True).reset_index(drop=True).copy()
                 
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='squadrons')
     def process_squadrons(self, squadrons, first_read:bool=True):
         for squadron in squadrons:
             if squadron['FID'] is not None and (squadron['FID'] not in self.cmdr_squadrons.keys() or not first_read):
@@ -464,6 +581,7 @@ class CarrierModel:
             if self.carriers[carrierID].get('SquadronName', None) is None or not first_read:
                 self.carriers[carrierID]['SquadronName'] = self.cmdr_squadrons.get(self.carrier_owners.get(carrierID, None), None)
 
+    @timed('edcm_journal_phase_seconds', 'Journal processing by phase', phase='fill_missing_data')
     def fill_missing_data(self):
         for carrierID in self.carriers.keys():
             if 'SpawnLocation' not in self.carriers[carrierID].keys():
@@ -561,8 +679,9 @@ class CarrierModel:
     def set_squadron_abbv_mapping(self, mapping:list[dict[str, str]]):
         self._squadron_abbv_mapping = {list(item.keys())[0].lower(): list(item.values())[0].upper() for item in mapping}
 
+    @timed('edcm_update_carriers_seconds', 'Carrier status updates')
     def update_carriers(self, now):
-        carriers = self.carriers.copy()
+        carriers = self.snapshot.carriers.copy()
         for carrierID in carriers.keys():
             data = carriers[carrierID].copy()
             if len(data['jumps']) == 0:
@@ -597,7 +716,6 @@ class CarrierModel:
                 time_diff_cancel = None
 
             if time_diff is not None and time_diff < timedelta(0):
-                self.active_timer = True
                 data['status'] = 'jumping'
                 if data['CarrierLocation']['timestamp'] is not None and (len(data['jumps']) == 1 or data['CarrierLocation']['timestamp'] > data['jumps'].iloc[1]['DepartureTime']) and data['CarrierLocation']['SystemName'] != pre_system:
                     pre_system = data['CarrierLocation']['SystemName']
@@ -613,7 +731,6 @@ class CarrierModel:
                 data['previous_body'] = None
                 data['previous_body_id'] = None
             elif time_diff is not None and time_diff < CD:
-                self.active_timer = True
                 data['status'] = 'cool_down'
                 if data['CarrierLocation']['timestamp'] is not None and (len(data['jumps']) == 1 or data['CarrierLocation']['timestamp'] > data['jumps'].iloc[1]['DepartureTime']) and data['CarrierLocation']['timestamp'] < data['latest_depart'] and data['CarrierLocation']['SystemName'] != latest_system:
                     pre_system = data['CarrierLocation']['SystemName']
@@ -629,7 +746,6 @@ class CarrierModel:
                 data['previous_body'] = pre_body
                 data['previous_body_id'] = pre_body_id
             elif time_diff_cancel is not None and time_diff_cancel < CD_cancel:
-                self.active_timer = True
                 data['status'] = 'cool_down_cancel'
                 if data['CarrierLocation']['timestamp'] is not None and (len(data['jumps']) <= 1 or data['CarrierLocation']['timestamp'] > data['jumps'].iloc[1]['DepartureTime']) and data['CarrierLocation']['timestamp'] < data['last_cancel']['timestamp'] and data['CarrierLocation']['SystemName'] != latest_system:
                     latest_system = data['CarrierLocation']['SystemName']
@@ -645,7 +761,6 @@ class CarrierModel:
                 data['previous_body'] = pre_body
                 data['previous_body_id'] = pre_body_id
             else:
-                self.active_timer = False
                 data['status'] = 'idle'
                 if data['CarrierLocation']['timestamp'] is not None and (data['latest_depart'] is None or data['CarrierLocation']['timestamp'] > data['latest_depart']) and data['CarrierLocation']['SystemName'] != latest_system:
                     latest_system = data['CarrierLocation']['SystemName']
@@ -665,18 +780,68 @@ class CarrierModel:
         old_status = {carrierID: self.carriers_updated[carrierID]['status'] for carrierID in self.carriers_updated.keys()}
         new_status = {carrierID: carriers[carrierID]['status'] for carrierID in carriers.keys()}
         self.carriers_updated = carriers.copy()
+        self.active_timer = any(status != 'idle' for carrierID, status in new_status.items() if carrierID not in self._ignore_list or carrierID in self._notify_while_ignored_list)
 
         for carrierID in old_status.keys() & new_status.keys():
             if new_status[carrierID] != old_status[carrierID] and (carrierID not in self._ignore_list or carrierID in self._notify_while_ignored_list):
                 # print(f'model:{self.get_name(carrierID)} status changed from {old_status[carrierID]} to {new_status[carrierID]}')
                 self._callback_status_change(carrierID, old_status[carrierID], new_status[carrierID])
 
+    def get_upcoming_deadlines(self, now: datetime) -> list[tuple[datetime, int, str]]:
+        """
+        (when, carrierID, kind) of the upcoming status and lock changes of the
+        shown and notified carriers: padlock, jumplock, departure, cooldown and
+        cooldown_cancel, earliest first
+        """
+        deadlines = []
+        for carrierID, data in self.carriers_updated.items():
+            if carrierID in self._ignore_list and carrierID not in self._notify_while_ignored_list:
+                continue
+            if data['status'] == 'jumping':
+                latest_depart = data['latest_depart']
+                deadlines += [(latest_depart - JUMPLOCK, carrierID, 'jumplock'), (latest_depart - PADLOCK, carrierID, 'padlock'), (latest_depart, carrierID, 'departure')]
+            elif data['status'] == 'cool_down':
+                deadlines.append((data['latest_depart'] + CD, carrierID, 'cooldown'))
+            elif data['status'] == 'cool_down_cancel':
+                deadlines.append((data['last_cancel']['timestamp'] + CD_cancel, carrierID, 'cooldown_cancel'))
+        return sorted(i for i in deadlines if i[0] > now)
+
+    def apply_settings(self, settings):
+        """
+        Applies the ignore list, squadron carrier whitelist, custom order and
+        name settings. Journals are not re-read, request a read from the
+        journal worker to publish a snapshot with the settings applied.
+        """
+        # the lists are also filled while reading journals
+        with self.read_lock:
+            self.reset_ignore_list()
+            self.reset_sfc_whitelist()
+            self.add_sfc_whitelist(settings.get('squadron_carriers', 'whitelist'))
+            self.add_ignore_list(settings.get('advanced', 'ignore_list'))
+            self.update_ignore_list()
+            self.reset_notify_while_ignored_list()
+            for override in settings.get('advanced', 'carrier_notification_overrides'):
+                for callsign in override:
+                    if override[callsign].get('notify_while_ignored', False):
+                        self.add_notify_while_ignored_list(callsign)
+        self.set_custom_order(settings.get('advanced', 'custom_order'))
+        self.set_squadron_abbv_mapping(settings.get('name_customization', 'squadron_abbv'))
+
+    def has_active_timer(self) -> bool:
+        """True if any shown or notified carrier is jumping or cooling down"""
+        return self.active_timer
+
     def register_status_change_callback(self, callback:Callable[[str, str, str], None]):
-        self._callback_status_change = lambda carrierID, status_old, status_new: threading.Thread(target=callback, args=(carrierID, status_old, status_new)).start()
+        # events of a carrier are handled in order, different carriers in parallel
+        self._callback_status_change = lambda carrierID, status_old, status_new: self.status_change_executor.submit(carrierID, callback, carrierID, status_old, status_new)
+
+    def get_status_change_metrics(self) -> dict:
+        return self.status_change_executor.get_metrics()
     
     def get_carriers(self):
         return self.carriers_updated.copy()
 
+    @timed('edcm_table_data_seconds', 'Building table rows', table='jumps')
     def get_data(self, now: datetime):
         return [self.generateInfo(carrierID, now) for carrierID in self.sorted_ids_display()]
 
@@ -746,6 +911,7 @@ class CarrierModel:
                 f"{timer}"
                 )
     
+    @timed('edcm_table_data_seconds', 'Building table rows', table='finance')
     def get_data_finance(self):
         df = pd.DataFrame([self.generate_info_finance(carrierID) for carrierID in self.sorted_ids_display()], columns=['Carrier Name', 'Squadron', 'Carrier Balance', 'CMDR Balance', 'Services Upkeep', 'Est. Jump Cost', 'Funded Till'])
         # handles unknown cmdr balance
@@ -778,9 +944,12 @@ class CarrierModel:
         return self.get_carriers()[carrierID]['CMDRName']
 
     def calculate_afloat_time(self, carrierID: int, carrier_balance: int, upkeep: int, jump_cost: int) -> str:
+        return naturaltime(self.calculate_funded_till(carrierID, carrier_balance, upkeep, jump_cost))
+
+    def calculate_funded_till(self, carrierID: int, carrier_balance: int, upkeep: int, jump_cost: int) -> datetime:
         stat_time = self.get_stat_time(carrierID=carrierID)
         stat_time = stat_time if stat_time is not None else datetime.now().astimezone()
-        return naturaltime(stat_time + timedelta(weeks=carrier_balance / (upkeep + jump_cost)))
+        return stat_time + timedelta(weeks=carrier_balance / (upkeep + jump_cost))
 
     def calculate_upkeep(self, carrierID: int) -> int:
         df = self.generate_info_services(carrierID=carrierID)
@@ -794,6 +963,7 @@ class CarrierModel:
         df = df[datetime.now().astimezone() - df['timestamp'] < timedelta(weeks=AVG_JUMP_CAL_WINDOW)]
         return int(round(len(df) / AVG_JUMP_CAL_WINDOW, 2) * 100000)
     
+    @timed('edcm_table_data_seconds', 'Building table rows', table='services')
     def get_data_services(self):
         df = pd.DataFrame([self.generate_info_services(carrierID) for carrierID in self.sorted_ids_display()], columns=['Refuel', 'Repair', 'Rearm', 'Shipyard', 'Outfitting', 'Exploration', 'VistaGenomics', 'PioneerSupplies', 'Bartender', 'VoucherRedemption', 'BlackMarket'])
         df[['VistaGenomics', 'PioneerSupplies', 'Bartender']] = df[['VistaGenomics', 'PioneerSupplies', 'Bartender']].fillna('Off')
@@ -817,6 +987,7 @@ class CarrierModel:
     def get_services(self, carrierID: int):
         return self.get_carriers()[carrierID]['Services']
     
+    @timed('edcm_table_data_seconds', 'Building table rows', table='cmdr')
     def get_data_cmdr(self):
         df = pd.DataFrame()
         df['Carrier Name'] = [self.get_name(carrierID) for carrierID in self.sorted_ids_display()]
@@ -826,6 +997,7 @@ class CarrierModel:
         df['Current Station'] = [cmdr_locations[i][1] for i in range(len(cmdr_locations))]
         return df[['Carrier Name', 'CMDR Name', 'Current System', 'Current Station']].values.tolist()
     
+    @timed('edcm_table_data_seconds', 'Building table rows', table='misc')
     def get_data_misc(self):
         df = pd.DataFrame()
         df['Carrier Name'] = [self.get_name(carrierID) for carrierID in self.sorted_ids_display()]
@@ -842,7 +1014,7 @@ class CarrierModel:
         return df[['Carrier Name', 'Docking Permission', 'Allow Notorious', 'Services', 'Cargo', 'BuyOrder', 'ShipPacks', 'ModulePacks', 'FreeSpace', 'Time Bought', 'Last Updated']].values.tolist()
 
     def generate_info_cmdr_location(self, carrierID: int) -> tuple[str, str]:
-        fid = self.carrier_owners.get(carrierID, None)
+        fid = self.snapshot.carrier_owners.get(carrierID, None)
         if fid is not None:
             system, station = self.get_cmdr_current_location(fid)
             if system is not None:
@@ -1003,9 +1175,10 @@ class CarrierModel:
         return None
     
     def get_cmdr_location(self, fid:str, time:datetime) -> tuple[str|None, str|None]:
-        if fid not in self.cmdr_locations.keys():
+        cmdr_locations = self.snapshot.cmdr_locations
+        if fid not in cmdr_locations.keys():
             return None, None
-        df = self.cmdr_locations[fid]
+        df = cmdr_locations[fid]
         df_docked = df[(df['DockedAt'].notna()) & (df['DockedAt'] <= time) & ((df['UndockedAt'].isna()) | (df['UndockedAt'] > time))]
         if df_docked.empty:
             df_jumped = df[(df['JumpedInAt'].notna()) & (df['JumpedInAt'] <= time)]
@@ -1015,9 +1188,10 @@ class CarrierModel:
         return df_docked.iloc[-1]['StarSystem'], df_docked.iloc[-1]['StationName']
 
     def get_cmdr_current_location(self, fid:str) -> tuple[str|None, str|None]:
-        if fid not in self.cmdr_locations.keys() or self.cmdr_locations[fid].empty:
+        cmdr_locations = self.snapshot.cmdr_locations
+        if fid not in cmdr_locations.keys() or cmdr_locations[fid].empty:
             return None, None
-        last_location = self.cmdr_locations[fid].iloc[-1]
+        last_location = cmdr_locations[fid].iloc[-1]
         if pd.isna(last_location['DockedAt']) or pd.notna(last_location['UndockedAt']):
             return last_location['StarSystem'], None
         return last_location['StarSystem'], last_location['StationName']
@@ -1087,6 +1261,7 @@ class CarrierModel:
                 break
         return result
 
+    @timed('edcm_table_data_seconds', 'Building table rows', table='trade')
     def get_data_trade(self, filter_ghost_buys: bool=False) -> tuple[pd.DataFrame, list[int]|None]:
         trades = [self.generate_info_trade(carrierID, filter_ghost_buys=filter_ghost_buys) for carrierID in self.sorted_ids_display()]
         df = pd.concat(trades, axis=0, ignore_index=True) if len(trades) > 0 else pd.DataFrame(columns=['CarrierID', 'Carrier Name', 'Trade Type', 'Amount', 'Commodity', 'Price', 'Time Set (Local)', 'Pending Decom'])
@@ -1126,7 +1301,7 @@ class CarrierModel:
     
     def get_trade_history(self, carrierID: int) -> pd.DataFrame:
         carrier_name = self.get_name(carrierID)
-        active_trades = self.carriers[carrierID]['trade_history'].copy()
+        active_trades = self.get_carriers()[carrierID]['trade_history'].copy()
         if len(active_trades) == 0:
             return pd.DataFrame({}, columns=['Carrier Name', 'CarrierID', 'Trade Type', 'Amount', 'Commodity', 'Price', 'Time Set (Local)'])
         else:
@@ -1143,7 +1318,7 @@ class CarrierModel:
             return active_trades[['Carrier Name', 'CarrierID', 'Trade Type', 'Amount', 'Commodity', 'Price', 'Time Set (Local)']]
 
     def get_owned_carrier(self, fid: str) -> str|None:
-        for carrierID, owner_fid in self.carrier_owners.items():
+        for carrierID, owner_fid in self.snapshot.carrier_owners.items():
             if fid == owner_fid:
                 return carrierID
         return None
@@ -1155,14 +1330,14 @@ class CarrierModel:
         journal_file: str
 
     def generate_info_active_journals(self) -> list['CarrierModel.ActiveJournalInfo']|None:
-        active = self.journal_reader.get_latest_active_journals()
+        active = self.snapshot.active_journals
         if active is None:
             return None
         fids, journals = active.keys(), active.values()
         return [
             self.ActiveJournalInfo(
                 fid=fid,
-                cmdr_name=self.cmdr_names.get(fid, 'Unknown'),
+                cmdr_name=self.snapshot.cmdr_names.get(fid, 'Unknown'),
                 carrier_name=self.get_name(self.get_owned_carrier(fid)) if self.get_owned_carrier(fid) is not None else 'N/A',
                 journal_file=journal,
             )
@@ -1170,7 +1345,7 @@ class CarrierModel:
         ]
 
     def generate_info_active_unknown_fid_journals(self) -> list['CarrierModel.ActiveJournalInfo']|None:
-        active = self.journal_reader.get_active_unknown_fid_journals()
+        active = self.snapshot.active_unknown_fid_journals
         if active is None:
             return None
         _, journals = active.keys(), active.values()
@@ -1184,6 +1359,7 @@ class CarrierModel:
             for journal in journals
         ]
     
+    @timed('edcm_table_data_seconds', 'Building table rows', table='active_journals')
     def get_data_active_journals(self) -> list['CarrierModel.ActiveJournalInfo']:
         active_journals = self.generate_info_active_journals()
         unknown_fid_journals = self.generate_info_active_unknown_fid_journals()
@@ -1197,8 +1373,8 @@ class CarrierModel:
             return active_journals + unknown_fid_journals
     
     def get_active_journal_paths(self) -> list[str]|None:
-        active_journals = self.journal_reader.get_latest_active_journals()
-        unknown_fid_journals = self.journal_reader.get_active_unknown_fid_journals()
+        active_journals = self.snapshot.active_journals
+        unknown_fid_journals = self.snapshot.active_unknown_fid_journals
         paths = []
         if active_journals is not None:
             paths += list(active_journals.values())
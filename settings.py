@@ -7,6 +7,7 @@ from copy import deepcopy
 from tomlkit.items import Table, Array
 from shutil import copy2
 import re
+from config import DISCORD_URL
 
 class SettingsValidationError(Exception):
     pass
@@ -130,7 +131,7 @@ class Settings:
 
         # 2) Simple webhook URL check
         webhook = self.get('discord', 'webhook') or ''
-        if webhook and not re.match(r'^https://discord(?:app)?.com/api/webhooks/', webhook):
+        if webhook and not re.match(r'^https://discord(?:app)?.com/api/webhooks/', webhook) and not webhook.startswith(f'{DISCORD_URL}/api/webhooks/'):
             self.validation_errors.append(f"discord.webhook does not look like a valid webhook URL: {webhook}")
 
         # 3) Check format for squadron_abbv
@@ -0,0 +1,207 @@
+"""
+Local stand-in for the external services used by EDCM: EDSM, Spansh, the
+Supabase REST/edge function endpoints, Discord webhooks, GitHub releases, the
+PTN cruise state and the game server clock. Responses come from the JSON
+fixtures in standin_fixtures/, unknown systems and markets get deterministic
+generated data. Latency and errors can be injected to load-test the network
+paths without internet access.
+
+Start it, then export the printed EDCM_*_URL variables (or put them in .env)
+before starting EDCM:
+
+    python standin_server.py --port 8765 --latency 150 --error-rate 0.05
+"""
+import json
+import time
+import random
+import hashlib
+import threading
+from argparse import ArgumentParser
+from os import path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+from utility import getResourcePath, getCurrentVersion
+
+COMMODITIES = ['Gold', 'Silver', 'Palladium', 'Tritium', 'Wine', 'Agronomic Treatment', 'Bertrandite', 'Indite', 'Gallite', 'Praseodymium', 'Samarium', 'Bromellite', 'Water', 'Liquid oxygen', 'Steel', 'Titanium', 'Aluminium', 'Copper']
+STATION_TYPES = ['Coriolis Starport', 'Orbis Starport', 'Ocellus Starport', 'Outpost', 'Asteroid base', 'Planetary Outpost', 'Fleet Carrier']
+
+def _seeded(*parts) -> random.Random:
+    return random.Random(hashlib.md5('/'.join(str(i) for i in parts).encode('utf-8')).hexdigest())
+
+def generate_stations(system_name: str) -> dict:
+    rng = _seeded('system', system_name.lower())
+    id64 = rng.randrange(10 ** 10, 10 ** 13)
+    stations = []
+    for i in range(rng.randint(1, 8)):
+        market_id = rng.randrange(128000000, 129000000)
+        stations.append({'id': i, 'marketId': market_id, 'type': rng.choice(STATION_TYPES), 'name': f'{system_name} Station {i + 1}',
+                         'distanceToArrival': round(rng.uniform(5, 50000), 1), 'haveMarket': rng.random() < 0.9,
+                         'updateTime': {'information': '2025-06-01 12:00:00', 'market': f'2025-06-01 {rng.randint(0, 23):02}:00:00'}})
+    return {'id': rng.randrange(10 ** 6), 'id64': id64, 'name': system_name, 'stations': stations}
+
+def generate_market(market_id: str) -> dict:
+    rng = _seeded('market', market_id)
+    commodities = []
+    for name in COMMODITIES:
+        price = rng.randint(100, 60000)
+        supplies = rng.random() < 0.5
+        commodities.append({'id': name.lower().replace(' ', ''), 'name': name, 'buyPrice': price if supplies else 0, 'stock': rng.randint(0, 50000) if supplies else 0,
+                            'sellPrice': int(price * 0.95), 'demand': 0 if supplies else rng.randint(0, 100000), 'stockBracket': 3 if supplies else 0})
+    return {'marketId': int(market_id) if str(market_id).isdigit() else market_id, 'commodities': commodities}
+
+class StandinServer:
+    def __init__(self, host: str='127.0.0.1', port: int=0, fixtures_dir: str|None=None, latency_ms: float=0, jitter_ms: float=0,
+                 error_rate: float=0, rate_limit_rate: float=0, seed: int|None=None):
+        self.fixtures_dir = fixtures_dir if fixtures_dir is not None else getResourcePath('standin_fixtures')
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+        self.webhook_messages: list[dict] = []
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._fixtures: dict[str, object] = {}
+        server = self
+        class Handler(_Handler):
+            standin = server
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def env(self) -> dict[str, str]:
+        """Environment variables pointing EDCM at this server"""
+        return {name: self.url for name in ['EDCM_EDSM_URL', 'EDCM_SPANSH_URL', 'EDCM_GITHUB_API_URL', 'EDCM_PTN_API_URL', 'EDCM_TIME_SERVER_URL', 'EDCM_DISCORD_URL', 'EDCM_SUPABASE_URL']}
+
+    def webhook_url(self, webhook_id: int=1, token: str='standin') -> str:
+        return f'{self.url}/api/webhooks/{webhook_id}/{token}'
+
+    def start(self) -> 'StandinServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='StandinServer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def fixture(self, name: str, default=None):
+        with self._lock:
+            if name not in self._fixtures:
+                fixture_path = path.join(self.fixtures_dir, f'{name}.json')
+                if path.exists(fixture_path):
+                    with open(fixture_path, 'r', encoding='utf-8') as f:
+                        self._fixtures[name] = json.load(f)
+                else:
+                    self._fixtures[name] = None
+            fixture = self._fixtures[name]
+        return default if fixture is None else fixture
+
+    def route(self, method: str, route: str, query: dict[str, str], body) -> tuple[int, object]|tuple[int, object, dict[str, str]]:
+        if route == '/api-system-v1/stations':
+            system_name = query.get('systemName', '')
+            return 200, self.fixture('edsm_stations', {}).get(system_name.lower()) or generate_stations(system_name)
+        if route == '/api-system-v1/stations/market':
+            market_id = query.get('marketId') or f'{query.get("systemName", "")}/{query.get("stationName", "")}'
+            return 200, self.fixture('edsm_market', {}).get(market_id) or generate_market(market_id)
+        if route.startswith('/api/system/'):
+            system_id = route.rsplit('/', 1)[1]
+            return 200, self.fixture('spansh_systems', {}).get(system_id) or {'record': {'id64': system_id, 'stations': []}}
+        if route.startswith('/api/webhooks/') and method == 'POST':
+            with self._lock:
+                self.webhook_messages.append({'path': route, 'thread_id': query.get('thread_id'), 'payload': body})
+                message_id = len(self.webhook_messages)
+            return 200, {'id': str(message_id), 'content': (body or {}).get('content', ''), 'embeds': (body or {}).get('embeds', [])}
+        if route == '/rest/v1/rpc/jump_timer_stats_cached':
+            return 200, self.fixture('jump_timer_stats', [None])
+        if route == '/rest/v1/jump_timers_public':
+            stats = self.fixture('jump_timer_stats', [None])[0]
+            return 200, [], {'Content-Range': f'*/{stats["cnt"] if stats else 0}'}
+        if route.startswith('/rest/v1/rpc/'):
+            return 200, []
+        if route.startswith('/functions/v1/'):
+            return 200, self.fixture(f'function_{route.rsplit("/", 1)[1]}', {})
+        if route == '/auth/v1/.well-known/jwks.json':
+            return 200, {'keys': []}
+        if route.endswith('/releases/latest'):
+            return 200, self.fixture('github_releases', [{'name': f'Release {getCurrentVersion()}', 'prerelease': False}])[0]
+        if route.endswith('/releases'):
+            return 200, self.fixture('github_releases', [{'name': f'Release {getCurrentVersion()}', 'prerelease': False}])
+        if route == '/api/cruises/state':
+            return 200, self.fixture('cruise_state', {'state': 'channels_closed'})
+        if route == '/2.0/server/time':
+            return 200, {'unixTimestamp': int(time.time())}
+        return 404, {'error': f'No stand-in for {method} {route}'}
+
+class _Handler(BaseHTTPRequestHandler):
+    standin: StandinServer
+    protocol_version = 'HTTP/1.1'
+
+    def _handle(self, method: str):
+        standin = self.standin
+        with standin._lock:
+            standin.request_count += 1
+            delay = max(standin.latency_ms + standin.random.uniform(-standin.jitter_ms, standin.jitter_ms), 0) / 1000
+            roll = standin.random.random()
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        raw = self.rfile.read(length) if length else b''
+        time.sleep(delay)
+        if roll < standin.rate_limit_rate:
+            self._send(429, {'message': 'You are being rate limited.', 'retry_after': 1.0, 'global': False}, {'Retry-After': '1'})
+            return
+        if roll < standin.rate_limit_rate + standin.error_rate:
+            self._send(503, {'error': 'injected failure'})
+            return
+        parts = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+        self._send(*standin.route(method, parts.path, query, body))
+
+    def _send(self, status: int, data, headers: dict[str, str]|None=None):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Local stand-in server for the external services used by EDCM')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=None, help='fixture directory, defaults to standin_fixtures')
+    parser.add_argument('--latency', type=float, default=0, help='added latency per request in ms')
+    parser.add_argument('--jitter', type=float, default=0, help='random latency variation in ms')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests answered with 503')
+    parser.add_argument('--rate-limit-rate', type=float, default=0, help='fraction of requests answered with 429')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    server = StandinServer(args.host, args.port, args.fixtures, args.latency, args.jitter, args.error_rate, args.rate_limit_rate, args.seed).start()
+    print(f'Stand-in server listening on {server.url}')
+    for name, value in server.env().items():
+        print(f'{name}={value}')
+    print(f'Discord webhook: {server.webhook_url()}')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,152 @@
+import json
+import time
+import sqlite3
+import threading
+from os import makedirs, path
+from datetime import timedelta
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+from decos import CacheResult
+from utility import getStationCachePath
+from config import STATION_CACHE_TTL, STATION_CACHE_MAX_STALE, STATION_CACHE_MAX_ENTRIES, STATION_CACHE_MAX_AGE, STATION_CACHE_EVICT_EVERY
+
+class StationCache:
+    """
+    SQLite backed cache for station and market lookups, kept across restarts.
+    Entries are stored as JSON per (kind, key) with a TTL per kind. An expired
+    entry is still returned while a refresh runs in the background, up to
+    the max stale age of its kind. Older entries wait for the fetch and are
+    only the fallback when it fails, e.g. while offline. Concurrent fetches
+    of the same entry share one call. This is the only cache in front of
+    the station and market requests, so its TTLs are their freshness.
+    Eviction runs on start and every evict_every writes.
+    """
+    def __init__(self, db_path: str|None, ttls: dict[str, timedelta]=STATION_CACHE_TTL, max_stale: dict[str, timedelta]=STATION_CACHE_MAX_STALE,
+                 max_entries: int=STATION_CACHE_MAX_ENTRIES, max_age: timedelta=STATION_CACHE_MAX_AGE, evict_every: int=STATION_CACHE_EVICT_EVERY):
+        if db_path is None:
+            db_path = ':memory:'
+        else:
+            makedirs(path.dirname(db_path), exist_ok=True)
+        self.ttls = ttls
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.evict_every = evict_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS entries (kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (kind, key))')
+        self._conn.commit()
+        self._in_flight: dict[tuple[str, str], Future] = {}
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix='StationCacheRefresh')
+        self.evict()
+
+    def get(self, kind: str, key: str) -> tuple[Any, bool]|None:
+        """Returns (value, is_stale) or None if there is no entry"""
+        cached = self._get(kind, key)
+        if cached is None:
+            return None
+        value, age = cached
+        return value, age > self.ttls[kind].total_seconds()
+
+    def _get(self, kind: str, key: str) -> tuple[Any, float]|None:
+        """Returns (value, age in seconds) or None if there is no entry"""
+        with self._lock:
+            row = self._conn.execute('SELECT value, fetched_at FROM entries WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE entries SET accessed_at = ? WHERE kind = ? AND key = ?', (time.time(), kind, key))
+            self._conn.commit()
+        value, fetched_at = row
+        return json.loads(value), time.time() - fetched_at
+
+    def put(self, kind: str, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO entries (kind, key, value, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)', (kind, key, json.dumps(value), now, now))
+            self._conn.commit()
+            self._writes += 1
+            due = self._writes % self.evict_every == 0
+        if due:
+            self.evict()
+
+    def get_or_fetch(self, kind: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """Returns the cached value for (kind, key), see get_or_fetch_with_info"""
+        return self.get_or_fetch_with_info(kind, key, fetch).value
+
+    def get_or_fetch_with_info(self, kind: str, key: str, fetch: Callable[[], Any]) -> CacheResult:
+        """
+        Returns the value for (kind, key), calling fetch on a miss. An expired
+        value within the max stale age of its kind is returned right away and
+        refreshed in the background, an older one is only returned when fetch
+        fails. stale is set on values whose TTL expired.
+        """
+        cached = self._get(kind, key)
+        if cached is None:
+            return CacheResult(self._fetch(kind, key, fetch), False, False, None)
+        value, age = cached
+        if age <= self.ttls[kind].total_seconds():
+            return CacheResult(value, True, False, None)
+        if age <= self.max_stale.get(kind, self.max_age).total_seconds():
+            self._refresh(kind, key, fetch)
+            return CacheResult(value, True, True, None)
+        try:
+            fresh = self._fetch(kind, key, fetch)
+        except Exception as e:
+            print(f'Failed to fetch {kind} {key}, serving data cached {age / 60:,.0f} minutes ago: {e}')
+            return CacheResult(value, True, True, e)
+        return CacheResult(fresh, False, False, None)
+
+    def _fetch(self, kind: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """Calls fetch and stores its value, callers arriving meanwhile wait for the same call"""
+        with self._lock:
+            future = self._in_flight.get((kind, key))
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight[(kind, key)] = Future()
+        if not is_leader:
+            return future.result()
+        try:
+            value = fetch()
+            self.put(kind, key, value)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._in_flight.pop((kind, key), None)
+
+    def _refresh(self, kind: str, key: str, fetch: Callable[[], Any]):
+        with self._lock:
+            if (kind, key) in self._in_flight:
+                return
+        def refresh():
+            try:
+                self._fetch(kind, key, fetch)
+            except Exception as e:
+                print(f'Failed to refresh {kind} {key}, keeping cached data: {e}')
+        self._refresher.submit(refresh)
+
+    def evict(self):
+        """Drops entries unused for max_age, then the least recently used ones beyond max_entries"""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries WHERE accessed_at < ?', (time.time() - self.max_age.total_seconds(),))
+            self._conn.execute('DELETE FROM entries WHERE rowid NOT IN (SELECT rowid FROM entries ORDER BY accessed_at DESC LIMIT ?)', (self.max_entries,))
+            self._conn.commit()
+
+_station_cache = None
+_station_cache_lock = threading.Lock()
+
+def getStationCache() -> StationCache:
+    global _station_cache
+    with _station_cache_lock:
+        if _station_cache is None:
+            try:
+                _station_cache = StationCache(getStationCachePath())
+            except (sqlite3.Error, OSError) as e:
+                print(f'Station cache unavailable, using an in-memory cache: {e}')
+                _station_cache = StationCache(None)
+        return _station_cache
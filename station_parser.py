@@ -1,27 +1,35 @@
 import requests
+import http_client
 import humanize
-from typing import Literal
+from typing import Callable, Literal, NamedTuple
 from datetime import datetime, timezone, timedelta
-from decos import rate_limited
+from concurrent.futures import Future, ThreadPoolExecutor
+from station_cache import getStationCache
+from config import STATION_PREFETCH_WORKERS, MARKET_FETCH_WORKERS, EDSM_URL, SPANSH_URL
 
 class EDSMError(Exception):
     """Custom exception for EDSM API errors."""
     pass
 
-url = 'https://www.edsm.net/api-system-v1/stations'
-@rate_limited(max_calls=1, period=60)
-def getStations(sys_name:str, details:bool=False) -> tuple[list[str], list[str], list[str], list[str|None]]:
+url = f'{EDSM_URL}/api-system-v1/stations'
+def fetchStationsEDSM(sys_name:str) -> dict:
     """
-    Fetch station data from EDSM API.
+    Fetch the raw station data of a system from EDSM API.
     """
     try:
-        result = requests.get(url, {'systemName': sys_name})
+        result = http_client.get(url, {'systemName': sys_name})
     except requests.exceptions.RequestException as e:
         raise EDSMError(f"Error fetching station data: {e}")
     if result.status_code != 200:
         raise EDSMError(f"Error fetching station data: {result.status_code}")
     else:
-        result = result.json()
+        return result.json()
+
+def getStations(sys_name:str, details:bool=False) -> tuple[list[str], list[str], list[str], list[str|None]]:
+    """
+    Get station data from EDSM API, served from the station cache when known.
+    """
+    result = getStationCache().get_or_fetch('edsm_stations', sys_name.lower(), lambda: fetchStationsEDSM(sys_name))
     # dirty fix with spansh to catch dodecs being classified as planetary outposts by EDSM
     try:
         spansh_stations = getStationsSpansh(result['id64'])
@@ -46,37 +54,100 @@ def getStations(sys_name:str, details:bool=False) -> tuple[list[str], list[str],
     # station_names = sorted(station_names, key=station_dist)
     return stations if details else station_names, station_pad_sizes, market_ids, market_updated
 
-@rate_limited(max_calls=10, period=30)
-def getMarketCommodityInfo(market_id:str=None, system_name:str=None, station_name:str=None, commodity:str=None, commodity_name:str=None) -> dict|None:
+_prefetcher = ThreadPoolExecutor(max_workers=STATION_PREFETCH_WORKERS, thread_name_prefix='StationPrefetch')
+
+def prefetchStations(sys_name:str):
     """
-    Get market information of a commodity from EDSM API.
+    Warm the station cache for a system in the background, so the station
+    list of a trade post made there needs no network. Markets are left out,
+    they would expire long before the carrier arrives.
     """
-    url = 'https://www.edsm.net/api-system-v1/stations/market'
-    assert (market_id is not None) or (system_name is not None and station_name is not None), "Either market_id or system_name and station_name must be provided"
-    assert commodity is not None or commodity_name is not None, "Either commodity or commodity_name must be provided"
+    def prefetch():
+        try:
+            getStations(sys_name)
+        except Exception as e:
+            print(f'Error prefetching station data for {sys_name}: {e}')
+    _prefetcher.submit(prefetch)
+
+def fetchMarketEDSM(market_id:str=None, system_name:str=None, station_name:str=None) -> dict:
+    """
+    Fetch the raw market data of a station from EDSM API.
+    """
+    url = f'{EDSM_URL}/api-system-v1/stations/market'
     try:
         if market_id is not None:
-            result_market = requests.get(url, {'marketId': market_id})
+            result_market = http_client.get(url, {'marketId': market_id})
         else:
-            result_market = requests.get(url, {'systemName': system_name, 'stationName': station_name})
+            result_market = http_client.get(url, {'systemName': system_name, 'stationName': station_name})
     except requests.exceptions.RequestException as e:
         raise EDSMError(f"Error fetching market data: {e}")
     if result_market.status_code != 200:
         raise EDSMError(f"Error fetching market data: {result_market.status_code}")
     else:
-        result_market = result_market.json()
-    if commodity is not None:
-        commodity_info = next((c for c in result_market['commodities'] if c['id'] == commodity), None)
-    else:
-        commodity_info = next((c for c in result_market['commodities'] if c['name'] == commodity_name), None)
-    return commodity_info
+        return result_market.json()
+
+class MarketSnapshot(NamedTuple):
+    """
+    A station's market indexed by commodity id and name. stale when served
+    from an expired cache entry, refresh_failed when that is because the
+    market could not be fetched, otherwise a refresh is running.
+    """
+    by_id: dict[str, dict]
+    by_name: dict[str, dict]
+    stale: bool = False
+    refresh_failed: bool = False
+
+    @classmethod
+    def from_market(cls, result_market:dict, stale:bool=False, refresh_failed:bool=False) -> 'MarketSnapshot':
+        commodities = result_market.get('commodities') or []
+        return cls({c['id']: c for c in commodities}, {c['name']: c for c in commodities}, stale, refresh_failed)
+
+    def get(self, commodity:str=None, commodity_name:str=None) -> dict|None:
+        return self.by_id.get(commodity) if commodity is not None else self.by_name.get(commodity_name)
+
+def getMarketSnapshot(market_id:str=None, system_name:str=None, station_name:str=None) -> MarketSnapshot:
+    """
+    Get the indexed market of a station from EDSM API, served from the station cache when known.
+    """
+    assert (market_id is not None) or (system_name is not None and station_name is not None), "Either market_id or system_name and station_name must be provided"
+    key = f'id:{market_id}' if market_id is not None else f'name:{system_name.lower()}/{station_name.lower()}'
+    result = getStationCache().get_or_fetch_with_info('edsm_market', key, lambda: fetchMarketEDSM(market_id, system_name, station_name))
+    return MarketSnapshot.from_market(result.value, result.stale, result.error is not None)
 
-def getStockPrice(trade_type:Literal['loading', 'unloading'], market_id:str=None, system_name:str=None, station_name:str=None, commodity:str=None, commodity_name:str=None) -> tuple[int|None, int|None]:
+def getMarketCommodityInfo(market_id:str=None, system_name:str=None, station_name:str=None, commodity:str=None, commodity_name:str=None) -> dict|None:
     """
-    Get stock and price for a commodity from EDSM API.
+    Get market information of a commodity from EDSM API.
     """
+    assert commodity is not None or commodity_name is not None, "Either commodity or commodity_name must be provided"
+    return getMarketSnapshot(market_id, system_name, station_name).get(commodity, commodity_name)
+
+_market_fetcher = ThreadPoolExecutor(max_workers=MARKET_FETCH_WORKERS, thread_name_prefix='MarketFetch')
+
+def getMarketCommodityInfoBatch(market_ids:list[str], commodities:list[str]|None=None, commodity_names:list[str]|None=None) -> dict[str, dict[str, dict|None]|None]:
+    """
+    Get market information of many commodities across many markets, fetching
+    each market once and the markets concurrently. Results are keyed by market
+    id, then by commodity id or name as requested. Markets that could not be
+    fetched map to None.
+    """
+    assert commodities is not None or commodity_names is not None, "Either commodities or commodity_names must be provided"
+    futures = {market_id: _market_fetcher.submit(getMarketSnapshot, market_id, None, None) for market_id in dict.fromkeys(market_ids)}
+    results = {}
+    for market_id, future in futures.items():
+        try:
+            snapshot = future.result()
+        except Exception as e:
+            print(f'Error fetching market data for {market_id}: {e}')
+            results[market_id] = None
+            continue
+        if commodities is not None:
+            results[market_id] = {commodity: snapshot.get(commodity=commodity) for commodity in commodities}
+        else:
+            results[market_id] = {commodity_name: snapshot.get(commodity_name=commodity_name) for commodity_name in commodity_names}
+    return results
+
+def getStockPriceFromInfo(trade_type:Literal['loading', 'unloading'], commodity_info:dict|None) -> tuple[int|None, int|None]:
     assert trade_type in ['loading', 'unloading'], "trade_type must be either 'loading' or 'unloading'"
-    commodity_info = getMarketCommodityInfo(market_id, system_name, station_name, commodity, commodity_name)
     if commodity_info is None:
         return None, None
     if trade_type == 'loading':
@@ -87,18 +158,45 @@ def getStockPrice(trade_type:Literal['loading', 'unloading'], market_id:str=None
         price = commodity_info['sellPrice']
     return stock, price
 
+def getStockPrice(trade_type:Literal['loading', 'unloading'], market_id:str=None, system_name:str=None, station_name:str=None, commodity:str=None, commodity_name:str=None) -> tuple[int|None, int|None, bool, bool]:
+    """
+    Get stock and price for a commodity from EDSM API, whether they come from an expired cache entry and whether its refresh failed.
+    """
+    snapshot = getMarketSnapshot(market_id, system_name, station_name)
+    return *getStockPriceFromInfo(trade_type, snapshot.get(commodity, commodity_name)), snapshot.stale, snapshot.refresh_failed
+
+def requestStockPrices(trade_type:Literal['loading', 'unloading'], market_ids:list[str], commodity_name:str, callback:Callable[[str, tuple[int|None, int|None, bool, bool]|None], None]):
+    """
+    Fetch stock, price and cache state for a commodity at many markets on the market fetch workers without waiting.
+    callback is called from a worker thread with each market id and its result, None if it could not be fetched.
+    """
+    def on_done(market_id:str, future:Future):
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f'Error fetching market data for {market_id}: {e}')
+            result = None
+        callback(market_id, result)
+    for market_id in dict.fromkeys(market_ids):
+        _market_fetcher.submit(getStockPrice, trade_type, market_id, commodity_name=commodity_name).add_done_callback(lambda future, market_id=market_id: on_done(market_id, future))
+
 class SpanshError(Exception):
     """Custom exception for Spansh API errors."""
     pass
 
-@rate_limited(max_calls=1, period=600)
 def getStationsSpansh(system_id:int) -> list[dict]:
     """
-    Get station names and types from Spansh API.
+    Get station names and types from Spansh API, served from the station cache when known.
+    """
+    return getStationCache().get_or_fetch('spansh_stations', str(system_id), lambda: fetchStationsSpansh(system_id))
+
+def fetchStationsSpansh(system_id:int) -> list[dict]:
+    """
+    Fetch the raw station list of a system from Spansh API.
     """
-    url = f'https://spansh.co.uk/api/system/{system_id}'
+    url = f'{SPANSH_URL}/api/system/{system_id}'
     try:
-        result = requests.get(url)
+        result = http_client.get(url)
     except requests.exceptions.RequestException as e:
         raise SpanshError(f"Error fetching station data from Spansh: {e}")
     if result.status_code != 200:
@@ -0,0 +1,90 @@
+from typing import Callable
+from concurrent.futures import Future
+from discord_handler import DiscordWebhookHandler, get_webhook_handler
+from model import CarrierModel
+from settings import Settings
+
+CENSORED_SYSTEMS = ['HD 105341', 'HIP 58832']  # N1 and N0, departure times there are not shared
+
+class StatusNotifier:
+    """
+    Notification settings and Discord webhooks from the settings file, with
+    the per carrier overrides applied, and the Discord notifications for
+    carrier status changes. Shared by the GUI and headless mode, popups and
+    sounds are left to the caller.
+    """
+    def __init__(self, settings: Settings, on_warning: Callable[[str], None] = print):
+        self.notification_settings = dict(settings.get('notifications'))
+        self.notification_settings.update(dict(settings.get('discord')))
+        self.webhook_handler = get_webhook_handler(self.notification_settings.get('webhook'), self.notification_settings.get('userID'))
+        self.webhook_handler_public = get_webhook_handler(self.notification_settings.get('webhook_public'), self.notification_settings.get('userID'))
+        self.notification_settings_carrier = {}
+        self.webhook_handler_carrier = {}
+        for override in settings.get('advanced', 'carrier_notification_overrides'):
+            for callsign in override:
+                print(f'Applying notification overrides for carrier {callsign}')
+                print(override[callsign])
+                carrier_notification_settings = self.notification_settings.copy()
+                for key, value in override[callsign].items():
+                    if key in carrier_notification_settings:
+                        carrier_notification_settings[key] = value
+                    elif key == 'notify_while_ignored':
+                        # special case, not part of notification settings
+                        pass
+                    else:
+                        print(f'Warning: unknown setting {key} in override for carrier {callsign}')
+                        on_warning(f'Unknown setting {key} in override for carrier {callsign}')
+                self.notification_settings_carrier[callsign] = carrier_notification_settings
+                if carrier_notification_settings.get('webhook') != self.notification_settings.get('webhook') or carrier_notification_settings.get('userID') != self.notification_settings.get('userID'):
+                    self.webhook_handler_carrier[callsign] = get_webhook_handler(carrier_notification_settings.get('webhook'), carrier_notification_settings.get('userID'))
+                    self.webhook_handler_carrier[callsign + '_public'] = get_webhook_handler(carrier_notification_settings.get('webhook_public'), carrier_notification_settings.get('userID'))
+
+    def get_notification_settings(self, callsign: str) -> dict:
+        return self.notification_settings_carrier.get(callsign, self.notification_settings)
+
+    def get_webhook_handlers(self, callsign: str) -> tuple[DiscordWebhookHandler, DiscordWebhookHandler]:
+        """The private and public webhook handler of a carrier"""
+        return self.webhook_handler_carrier.get(callsign, self.webhook_handler), self.webhook_handler_carrier.get(callsign + '_public', self.webhook_handler_public)
+
+    def get_all_webhook_handlers(self) -> list[DiscordWebhookHandler]:
+        return [self.webhook_handler, self.webhook_handler_public] + list(self.webhook_handler_carrier.values())
+
+    def send_discord(self, model: CarrierModel, carrierID: int, status_old: str, status_new: str) -> list[Future]:
+        """Sends the enabled Discord notifications for a status change"""
+        callsign = model.get_callsign(carrierID)
+        notification_settings = self.get_notification_settings(callsign)
+        webhook_handler, webhook_handler_public = self.get_webhook_handlers(callsign)
+        current_system = model.get_current_system(carrierID)
+        if status_new == 'jumping':
+            status = 'jump_plotted'
+            censor_mode = current_system in CENSORED_SYSTEMS or model.get_destination_system(carrierID) in CENSORED_SYSTEMS
+            other_system, other_body = model.get_destination_system(carrierID, use_custom_name=True), model.get_destination_body(carrierID)
+            timestamp = model.get_departure_hammer_countdown(carrierID)
+        elif status_new == 'cool_down':
+            status = 'jump_completed'
+            censor_mode = current_system in CENSORED_SYSTEMS or model.get_previous_system(carrierID) in CENSORED_SYSTEMS
+            other_system, other_body = model.get_previous_system(carrierID, use_custom_name=True), model.get_previous_body(carrierID)
+            timestamp = model.get_cooldown_hammer_countdown(carrierID)
+        elif status_new == 'cool_down_cancel':
+            status = 'jump_cancelled'
+            censor_mode = current_system in CENSORED_SYSTEMS or model.get_previous_system(carrierID) in CENSORED_SYSTEMS
+            other_system, other_body = None, None
+            timestamp = model.get_cooldown_cancel_hammer_countdown(carrierID)
+        elif status_new == 'idle' and status_old in ['cool_down', 'cool_down_cancel']:
+            status = 'cooldown_finished'
+            censor_mode = current_system in CENSORED_SYSTEMS
+            other_system, other_body = None, None
+            timestamp = model.get_cooldown_hammer_countdown(carrierID) if status_old == 'cool_down' else model.get_cooldown_cancel_hammer_countdown(carrierID)
+        else:
+            return []
+        futures = []
+        embed = dict(status=status, name=model.get_name(carrierID), callsign=callsign,
+                     current_system=model.get_current_system(carrierID, use_custom_name=True), current_body=model.get_current_body(carrierID),
+                     other_system=other_system, other_body=other_body)
+        if notification_settings.get(f'{status}_discord'):
+            # the private channel still gets the plot, just without the departure time
+            private_timestamp = None if censor_mode and status == 'jump_plotted' else timestamp
+            futures += webhook_handler.send_jump_status_embed(**embed, timestamp=private_timestamp, ping=notification_settings.get(f'{status}_discord_ping'))
+        if notification_settings.get(f'{status}_discord_public') and not censor_mode:
+            futures += webhook_handler_public.send_jump_status_embed(**embed, timestamp=timestamp, ping=notification_settings.get(f'{status}_discord_public_ping'))
+        return futures
@@ -1,19 +1,65 @@
 import time
 import json
-from urllib.request import Request, urlopen
+import threading
+from collections import deque
+from datetime import timedelta
+from typing import Callable
+import http_client
+from config import TIME_SERVER_URL, TIME_SKEW_SAMPLE_INTERVAL, TIME_SKEW_WINDOW
+
+CLOCK_STEP_THRESHOLD = 0.5  # seconds the wall clock may move against the monotonic clock before samples are discarded
 
 class TimeChecker():
-    def __init__(self, url: str = "https://api.orerve.net/2.0/server/time", samples: int = 3, spacing_s: float = 1.1, timeout: float = 2.0, threshold_s: float = 1.5, margin_s: float = 0.5):
+    def __init__(self, url: str = f"{TIME_SERVER_URL}/2.0/server/time", samples: int = 3, spacing_s: float = 1.1, timeout: float = 2.0, threshold_s: float = 1.5, margin_s: float = 0.5):
         self.url = url
         self.samples = samples
         self.spacing_s = spacing_s
         self.timeout = timeout
         self.threshold_s = threshold_s
         self.margin_s = margin_s
+    def take_sample(self) -> dict:
+        """
+        One request to the time server. The server reports whole seconds, so a
+        sample bounds the offset to (lo_s, hi_s], an interval RTT + 1 s wide.
+        """
+        t0m = time.monotonic()
+        t0w = time.time()
+
+        # no retries, a retried request would skew the RTT
+        resp = http_client.get(self.url, timeout=self.timeout, retries=0)
+        resp.raise_for_status()
+        body = resp.content
+
+        t1m = time.monotonic()
+        t1w = time.time()
+
+        rtt = t1m - t0m
+        w_mid = (t0w + t1w) / 2.0
+
+        data_dict = json.loads(body)
+        timestamp = data_dict['unixTimestamp']
+        server_ts_int = int(timestamp)
+        # Center the integer second (assumes server_ts_int is floor/whole-second time)
+        server_ts = server_ts_int + 0.5
+
+        diff = w_mid - server_ts
+        uncertainty = 0.5 + (rtt / 2.0)
+
+        return {
+            "server_ts_int": server_ts_int,
+            "diff_s": diff,
+            "rtt_s": rtt,
+            "uncertainty_s": uncertainty,
+            "lo_s": t0w - server_ts_int - 1,
+            "hi_s": t1w - server_ts_int,
+            "taken_at": t1m,
+            "wall_offset": t1w - t1m,  # changes when the system clock is stepped
+        }
+
     def measure_server_skew(self) -> dict:
         """
         Returns a dict with:
-        - diff_s: estimated (server - local) seconds (positive means server ahead)
+        - diff_s: estimated (local - server) seconds (positive means local clock ahead)
         - rtt_s: RTT of chosen sample
         - uncertainty_s: ~0.5s quantization + RTT/2
         - all: list of per-sample measurements
@@ -23,35 +69,7 @@ class TimeChecker():
         results = []
 
         for i in range(self.samples):
-            t0m = time.monotonic()
-            t0w = time.time()
-
-            req = Request(self.url)
-            with urlopen(req, timeout=self.timeout) as resp:
-                body = resp.read()
-
-            t1m = time.monotonic()
-            t1w = time.time()
-
-            rtt = t1m - t0m
-            w_mid = (t0w + t1w) / 2.0
-
-            data_dict = json.loads(body)
-            timestamp = data_dict['unixTimestamp']
-            server_ts_int = int(timestamp)
-            # Center the integer second (assumes server_ts_int is floor/whole-second time)
-            server_ts = server_ts_int + 0.5
-
-            diff = w_mid - server_ts
-            uncertainty = 0.5 + (rtt / 2.0)
-
-            results.append({
-                "server_ts_int": server_ts_int,
-                "diff_s": diff,
-                "rtt_s": rtt,
-                "uncertainty_s": uncertainty,
-            })
-
+            results.append(self.take_sample())
             if i < self.samples - 1:
                 time.sleep(self.spacing_s)
 
@@ -71,7 +89,9 @@ class TimeChecker():
         """
         Measures server skew and returns (should_warn, warning_message)
         """
-        m = self.measure_server_skew()
+        return self.format_result(self.measure_server_skew())
+
+    def format_result(self, m: dict) -> tuple[bool, str]:
         warn = self.should_warn(m["diff_s"], m["uncertainty_s"])
         message = ""
         if warn:
@@ -85,6 +105,93 @@ class TimeChecker():
                        f"diff: {m['diff_s']:+.2f}s (RTT={m['rtt_s']*1000:.0f}ms, uncertainty≈±{m['uncertainty_s']:.2f}s)")
         return (warn, message)
 
+class SkewEstimator:
+    """
+    Tracks the offset between the local clock and the game server in the
+    background. After a short burst on start it takes one sample every
+    interval, keeping the last window samples. The estimate is the
+    intersection of the samples' offset bounds, which narrows well below the
+    server's one second resolution, falling back to the lowest RTT sample
+    when they disagree. Samples from before a system clock step are dropped.
+    get_skew() never blocks.
+    """
+    def __init__(self, checker: TimeChecker, interval: timedelta = TIME_SKEW_SAMPLE_INTERVAL, window: int = TIME_SKEW_WINDOW,
+                 on_estimate: Callable[[], None] | None = None):
+        self.checker = checker
+        self.interval_s = interval.total_seconds()
+        self.on_estimate = on_estimate
+        self._samples: deque[dict] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._estimate: dict | None = None
+        self._thread = threading.Thread(target=self._run, name='SkewEstimator', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        burst = self.checker.samples
+        while True:
+            try:
+                self.add_sample(self.checker.take_sample())
+            except Exception as e:
+                print(f'Error sampling time skew: {e}')
+                time.sleep(min(self.interval_s, 60))
+                continue
+            if burst > 1:
+                burst -= 1
+                time.sleep(self.checker.spacing_s)
+            else:
+                time.sleep(self.interval_s)
+
+    def add_sample(self, sample: dict):
+        with self._lock:
+            if self._samples and abs(sample['wall_offset'] - self._samples[-1]['wall_offset']) > CLOCK_STEP_THRESHOLD:
+                self._samples.clear()
+            self._samples.append(sample)
+            self._estimate = self._compute(list(self._samples))
+        if self.on_estimate is not None:
+            self.on_estimate()
+
+    @staticmethod
+    def _compute(samples: list[dict]) -> dict:
+        best = min(samples, key=lambda x: x['rtt_s'])
+        lo = max(i['lo_s'] for i in samples)
+        hi = min(i['hi_s'] for i in samples)
+        if lo <= hi:
+            diff, uncertainty = (lo + hi) / 2, (hi - lo) / 2
+        else:
+            # bounds contradict each other, e.g. the clock drifted, trust the fastest sample
+            diff, uncertainty = best['diff_s'], best['uncertainty_s']
+        return {'diff_s': diff, 'rtt_s': best['rtt_s'], 'uncertainty_s': uncertainty, 'samples': len(samples),
+                'taken_at': samples[-1]['taken_at'], 'wall_offset': samples[-1]['wall_offset']}
+
+    def get_skew(self) -> dict | None:
+        """The current estimate, see measure_server_skew, or None before the first sample or after a clock step"""
+        with self._lock:
+            estimate = self._estimate
+        if estimate is None or abs(time.time() - time.monotonic() - estimate['wall_offset']) > CLOCK_STEP_THRESHOLD:
+            return None
+        return dict(estimate, age_s=time.monotonic() - estimate['taken_at'])
+
+    def get_correction(self) -> timedelta:
+        """Local clock minus server clock, subtract it from local time to get server time"""
+        estimate = self.get_skew()
+        return timedelta(seconds=estimate['diff_s']) if estimate is not None else timedelta(0)
+
+    def measure_now(self) -> dict:
+        """Takes a fresh burst of samples, blocking, and returns the updated estimate"""
+        for i in range(self.checker.samples):
+            self.add_sample(self.checker.take_sample())
+            if i < self.checker.samples - 1:
+                time.sleep(self.checker.spacing_s)
+        return self.get_skew()
+
+    def check_and_warn(self, refresh: bool = False) -> tuple[bool, str]:
+        estimate = self.measure_now() if refresh else self.get_skew()
+        if estimate is None:
+            raise RuntimeError('No time skew measurement available yet')
+        return self.checker.format_result(estimate)
+
 # Example
 if __name__ == "__main__":
     checker = TimeChecker()
@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+from os import makedirs, path
+from typing import Iterable
+from utility import getTimerLedgerPath
+
+class TimerLedger:
+    """
+    Local record of the jump timer info_hashes the server accepted, per
+    account, so reports only send timers the server doesn't have yet. Hashes
+    are stored as 20 byte blobs and mirrored in memory once an account's
+    ledger was loaded, lookups never touch the disk.
+    """
+    def __init__(self, db_path: str|None):
+        if db_path is None:
+            db_path = ':memory:'
+        else:
+            makedirs(path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS reported (user_id TEXT NOT NULL, info_hash BLOB NOT NULL, PRIMARY KEY (user_id, info_hash)) WITHOUT ROWID')
+        self._conn.commit()
+        self._loaded: dict[str, set[bytes]] = {}
+
+    def _get_set(self, user_id: str) -> set[bytes]:
+        # call with self._lock held
+        if user_id not in self._loaded:
+            self._loaded[user_id] = {row[0] for row in self._conn.execute('SELECT info_hash FROM reported WHERE user_id = ?', (user_id,))}
+        return self._loaded[user_id]
+
+    def contains(self, user_id: str, info_hash: str) -> bool:
+        with self._lock:
+            return bytes.fromhex(info_hash) in self._get_set(user_id)
+
+    def filter_new(self, user_id: str, info_hashes: Iterable[str]) -> list[bool]:
+        """Per hash, whether it is not in the ledger yet"""
+        with self._lock:
+            reported = self._get_set(user_id)
+            return [bytes.fromhex(info_hash) not in reported for info_hash in info_hashes]
+
+    def add(self, user_id: str, info_hashes: Iterable[str]):
+        hashes = [bytes.fromhex(info_hash) for info_hash in info_hashes]
+        with self._lock:
+            self._conn.executemany('INSERT OR IGNORE INTO reported (user_id, info_hash) VALUES (?, ?)', [(user_id, info_hash) for info_hash in hashes])
+            self._conn.commit()
+            self._get_set(user_id).update(hashes)
+
+    def clear(self, user_id: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM reported WHERE user_id = ?', (user_id,))
+            self._conn.commit()
+            self._loaded.pop(user_id, None)
+
+_timer_ledger = None
+_timer_ledger_lock = threading.Lock()
+
+def getTimerLedger() -> TimerLedger:
+    global _timer_ledger
+    with _timer_ledger_lock:
+        if _timer_ledger is None:
+            try:
+                _timer_ledger = TimerLedger(getTimerLedgerPath())
+            except (sqlite3.Error, OSError) as e:
+                print(f'Timer ledger unavailable, using an in-memory ledger: {e}')
+                _timer_ledger = TimerLedger(None)
+        return _timer_ledger
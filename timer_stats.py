@@ -0,0 +1,161 @@
+import time
+import asyncio
+import threading
+from typing import Callable
+from realtime import AsyncRealtimeClient, RealtimeSubscribeStates
+from utility import getExpectedJumpTimer, getJumpTimerReportCount
+from config import SUPABASE_URL, SUPABASE_KEY, UPDATE_INTERVAL_TIMER_STATS, UPDATE_INTERVAL_TIMER_STATS_SUBSCRIBED, TIMER_STATS_PUSH_DELAY, TIMER_STATS_BACKOFF_MAX
+
+def fetchTimerStatsFresh() -> tuple:
+    """getExpectedJumpTimer bypassing its cache, used right after a change was pushed"""
+    getExpectedJumpTimer.cache_clear()
+    return getExpectedJumpTimer()
+
+def createRealtimeClient() -> AsyncRealtimeClient:
+    return AsyncRealtimeClient(url=f'{SUPABASE_URL}/realtime/v1', token=SUPABASE_KEY)
+
+class TimerStatsSubscriber:
+    """
+    Keeps the jump timer stats current on an asyncio loop in its own thread.
+
+    A realtime subscription to jump_timers_public triggers a refresh shortly
+    after a new report, reconnecting with exponential backoff when the socket
+    drops. While it is down the stats are polled every
+    UPDATE_INTERVAL_TIMER_STATS ms instead, while it is up only every
+    UPDATE_INTERVAL_TIMER_STATS_SUBSCRIBED ms in case a change was missed.
+    A poll first asks fetch_marker for the report count and skips the stats
+    query when it did not change, but the stats are still fetched every
+    UPDATE_INTERVAL_TIMER_STATS_SUBSCRIBED ms as reports age out of their
+    window. on_stats is called from the subscriber thread, and only when the
+    stats changed. fetch_stats, fetch_marker and client_factory can be
+    swapped out, e.g. for a local stand-in.
+    """
+    def __init__(self, on_stats: Callable[[tuple], None], fetch_stats: Callable[[], tuple]=fetchTimerStatsFresh,
+                 fetch_marker: Callable[[], object|None]=getJumpTimerReportCount,
+                 client_factory: Callable[[], AsyncRealtimeClient]=createRealtimeClient,
+                 poll_ms: int=UPDATE_INTERVAL_TIMER_STATS, subscribed_poll_ms: int=UPDATE_INTERVAL_TIMER_STATS_SUBSCRIBED,
+                 push_delay_ms: int=TIMER_STATS_PUSH_DELAY, backoff_max_ms: int=TIMER_STATS_BACKOFF_MAX):
+        self.on_stats = on_stats
+        self.fetch_stats = fetch_stats
+        self.fetch_marker = fetch_marker
+        self.client_factory = client_factory
+        self.poll_interval = poll_ms / 1000
+        self.subscribed_poll_interval = subscribed_poll_ms / 1000
+        self.push_delay = push_delay_ms / 1000
+        self.backoff_max = backoff_max_ms / 1000
+        self.subscribed = False
+        self.last_stats: tuple|None = None
+        self.last_marker: object|None = None
+        self._last_fetch_at = float('-inf')
+        self._channel_failed = False
+        self._loop = asyncio.new_event_loop()
+        self._refresh_event = asyncio.Event()
+        self._task: asyncio.Task|None = None
+        self._thread = threading.Thread(target=self._run_loop, name='TimerStats', daemon=True)
+
+    def start(self):
+        self._task = self._loop.create_task(self._run())
+        self._thread.start()
+
+    def stop(self):
+        if self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def refresh(self):
+        """Fetches the stats as soon as possible, callable from any thread"""
+        self._loop.call_soon_threadsafe(self._refresh_event.set)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self):
+        self._refresh_event.set()  # fetch once on start
+        await asyncio.gather(self._listen(), self._poll())
+
+    async def _listen(self):
+        backoff = 1
+        while True:
+            client = None
+            self._channel_failed = False
+            try:
+                client = self.client_factory()
+                await client.connect()
+                channel = client.channel('public:jump_timers_public')
+                channel.on_postgres_changes(event='*', schema='public', table='jump_timers_public', callback=self._on_change)
+                await channel.subscribe(callback=self._on_subscribe_state)
+                while client.is_connected and not self._channel_failed:
+                    if self.subscribed:
+                        backoff = 1
+                    await asyncio.sleep(1)
+                raise RuntimeError('Realtime client disconnected')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f'[realtime] subscription error: {e}, reconnecting in {backoff}s…')
+            finally:
+                if self.subscribed:
+                    self.subscribed = False
+                    self._refresh_event.set()  # switch to polling right away
+                if client is not None:
+                    try:
+                        await client.close()
+                    except Exception:
+                        pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.backoff_max)
+
+    def _on_change(self, payload):
+        self._refresh_event.set()
+
+    def _on_subscribe_state(self, state: RealtimeSubscribeStates, exception: Exception|None):
+        if state is RealtimeSubscribeStates.SUBSCRIBED:
+            print('Subscription successful')
+            self.subscribed = True
+            self._refresh_event.set()  # catch up on changes missed while disconnected
+            return
+        if state is RealtimeSubscribeStates.TIMED_OUT:
+            print(f"Subscription timed out{f', exception={exception!r}' if exception else ''}")
+        elif state in (RealtimeSubscribeStates.CLOSED, RealtimeSubscribeStates.CHANNEL_ERROR):
+            print(f"Subscription closed{f', exception={exception!r}' if exception else ''}")
+        else:
+            print(f'Subscription state={state}, exception={exception!r}')
+        self._channel_failed = True
+
+    async def _poll(self):
+        while True:
+            marker = None
+            try:
+                await asyncio.wait_for(self._refresh_event.wait(), self.subscribed_poll_interval if self.subscribed else self.poll_interval)
+            except asyncio.TimeoutError:
+                if time.monotonic() - self._last_fetch_at < self.subscribed_poll_interval:
+                    marker = await self._fetch_marker()
+                    if marker is not None and marker == self.last_marker:
+                        continue
+            else:
+                await asyncio.sleep(self.push_delay)  # reports often arrive in bursts
+            self._refresh_event.clear()
+            await self._fetch(marker)
+
+    async def _fetch_marker(self) -> object|None:
+        try:
+            return await self._loop.run_in_executor(None, self.fetch_marker)
+        except Exception as e:
+            print(f'Error checking for new jump timer reports: {e}')
+            return None
+
+    async def _fetch(self, marker: object|None=None):
+        """Fetches the stats, marker is the report count taken right before, if any"""
+        try:
+            stats = await self._loop.run_in_executor(None, self.fetch_stats)
+        except Exception as e:
+            print(f'Error fetching jump timer stats: {e}')
+            return
+        self.last_marker = marker
+        self._last_fetch_at = time.monotonic()
+        if stats != self.last_stats:
+            self.last_stats = stats
+            self.on_stats(stats)
@@ -7,6 +7,7 @@ import threading
 import functools
 from numpy import datetime64
 import requests
+import http_client
 from packaging import version
 import hashlib
 from humanize import naturaltime
@@ -15,8 +16,8 @@ from collections import deque
 from functools import wraps
 from os.path import join
 from pathlib import Path
-from config import timer_slope_thresholds, SUPABASE_URL, SUPABASE_KEY
-from decos import rate_limited
+from config import timer_slope_thresholds, SUPABASE_URL, SUPABASE_KEY, GITHUB_API_URL, PTN_API_URL
+from decos import cached
 
 def getJournalPath() -> str:
     if sys.platform == 'win32':
@@ -68,7 +69,7 @@ def isUpdateAvailable() -> bool:
 
 def getLatestVersion() -> str|None:
     try:
-        response = requests.get('https://api.github.com/repos/skywalker-elite/Elite-Dangerous-Carrier-Manager/releases/latest')
+        response = http_client.get(f'{GITHUB_API_URL}/repos/skywalker-elite/Elite-Dangerous-Carrier-Manager/releases/latest')
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         print(f'Error while checking update: {e}')
@@ -81,15 +82,15 @@ def isOnPrerelease() -> bool:
     parsed_current = version.parse(current)
     return parsed_current.is_prerelease
 
-@rate_limited(max_calls=1, period=60)
+@cached(ttl=60)
 def getLatestPrereleaseVersion() -> str|None:
     """
     Fetch all prerelease tags of the same major.minor as the current version
     and return the highest prerelease.
     """
     try:
-        resp = requests.get(
-            'https://api.github.com/repos/skywalker-elite/Elite-Dangerous-Carrier-Manager/releases'
+        resp = http_client.get(
+            f'{GITHUB_API_URL}/repos/skywalker-elite/Elite-Dangerous-Carrier-Manager/releases'
         )
         resp.raise_for_status()
     except requests.exceptions.RequestException as e:
@@ -211,6 +212,27 @@ def getCachePath(jr_version:str, journal_paths:list[str]) -> str:
         except:
             return None
 
+def getStationCachePath() -> str|None:
+    cache_dir = getAppDir()
+    if cache_dir is None:
+        return None
+    else:
+        return os.path.join(cache_dir, 'cache', 'station_cache.sqlite3')
+
+def getTimerLedgerPath() -> str|None:
+    app_dir = getAppDir()
+    if app_dir is None:
+        return None
+    else:
+        return os.path.join(app_dir, 'cache', 'timer_ledger.sqlite3')
+
+def getDiscordOutboxPath() -> str|None:
+    app_dir = getAppDir()
+    if app_dir is None:
+        return None
+    else:
+        return os.path.join(app_dir, 'cache', 'discord_outbox.sqlite3')
+
 def getNotesPath() -> str|None:
     """
     Path to the csv file where the app stores carrier notes. 
@@ -228,9 +250,14 @@ def getInfoHash(journal_timestamp:datetime, timer:int, carrierID:int) -> str:
     h.update(str(carrierID).encode('utf-8'))
     return h.hexdigest()[:40]
 
-@rate_limited(max_calls=10, period=60)
+def getInfoHashes(journal_timestamps:list[str], timers:list[int], carrierIDs:list[int]) -> list[str]:
+    """getInfoHash for many rows at once, journal_timestamps given as isoformat strings"""
+    sha256 = hashlib.sha256
+    return [sha256(f'{timestamp}{timer}{carrierID}'.encode('utf-8')).hexdigest()[:40] for timestamp, timer, carrierID in zip(journal_timestamps, timers, carrierIDs)]
+
+@cached(ttl=10)
 def getExpectedJumpTimer() -> tuple[str|None, int|None, datetime|None, datetime|None, float|None]:
-    response = requests.post(f'{SUPABASE_URL}/rest/v1/rpc/jump_timer_stats_cached', headers={
+    response = http_client.post(f'{SUPABASE_URL}/rest/v1/rpc/jump_timer_stats_cached', headers={
         'content-type': 'application/json',
         'apikey': SUPABASE_KEY,
         'Authorization': f'Bearer {SUPABASE_KEY}'
@@ -250,8 +277,25 @@ def getExpectedJumpTimer() -> tuple[str|None, int|None, datetime|None, datetime|
         return avg_timer, count, datetime.fromisoformat(earliest) if earliest else None, datetime.fromisoformat(latest) if latest else None, slope
     return None, None, None, None, None
 
+def getJumpTimerReportCount() -> int|None:
+    """
+    Number of reported jump timers, a cheap check whether getExpectedJumpTimer
+    may have changed. None when the server did not report a count.
+    """
+    response = http_client.get(f'{SUPABASE_URL}/rest/v1/jump_timers_public', {'select': '*', 'limit': 0}, headers={
+        'apikey': SUPABASE_KEY,
+        'Authorization': f'Bearer {SUPABASE_KEY}',
+        'Prefer': 'count=exact',
+    })
+    total = response.headers.get('Content-Range', '').rpartition('/')[2] if response.ok else ''
+    return int(total) if total.isdigit() else None
+
 def getHumanizedExpectedJumpTimer() -> str:
-    avg_timer, count, earliest, latest, slope = getExpectedJumpTimer()
+    try:
+        avg_timer, count, earliest, latest, slope = getExpectedJumpTimer()
+    except requests.exceptions.RequestException as e:
+        print(f'Error fetching jump timer stats: {e}')
+        avg_timer, count, earliest, latest, slope = None, None, None, None, None
     return getTimerStatDescription(avg_timer, count, earliest, latest, slope)
 
 def getTimerStatDescription(avg_timer:str|None, count:int|None, earliest:datetime|None, latest:datetime|None, slope:float|None) -> str:
@@ -280,13 +324,20 @@ def generateTimerSlopeDescription(slope:float|None) -> str:
     else:
         return 'Timer is stable'
 
-@rate_limited(max_calls=1, period=60)
-def getCruiseStatus() -> str:
-    response = requests.get('https://bc.pilotstradenetwork.org/api/cruises/state')
+@cached(ttl=60)
+def fetchCruiseStatus() -> str:
+    response = http_client.get(f'{PTN_API_URL}/api/cruises/state')
     if response.status_code == 200:
         data = response.json()
         return data.get('state', None)
     return 'Error fetching cruise status'
 
+def getCruiseStatus() -> str:
+    try:
+        return fetchCruiseStatus()
+    except requests.exceptions.RequestException as e:
+        print(f'Error fetching cruise status: {e}')
+        return 'Error fetching cruise status'
+
 if __name__ == '__main__':
     print(getHumanizedExpectedJumpTimer())
\ No newline at end of file
@@ -6,7 +6,8 @@ import tkinter.font as tkfont
 from popups import show_message_box_info, show_message_box_warning, show_message_box_info_no_topmost, show_non_blocking_info, show_message_box_askyesno, show_message_box_askretrycancel, show_indeterminate_progress_bar, center_window_relative_to_parent, apply_theme_to_titlebar, show_message_box_info_checkbox, show_message_box_warning_checkbox, show_dropdown_popup
 from idlelib.tooltip import Hovertip
 from config import WINDOW_SIZE_TIMER, font_sizes, TOOLTIP_HOVER_DELAY, TOOLTIP_BACKGROUND, TOOLTIP_FOREGROUND, WINDOW_SIZE
-from station_parser import getStockPrice
+from station_parser import getStockPrice, requestStockPrices
+from metrics import timer
 
 class MenuOption(NamedTuple):
         label: str
@@ -88,6 +89,17 @@ class CarrierView:
         self.tab_controller.add(self.tab_notes, text='Notes')
         self.tab_controller.add(self.tab_active_journals, text='Active Journals', state='hidden')
         self.tab_controller.add(self.tab_options, text='Options')
+        self.tabs = {
+            'jumps': self.tab_jumps,
+            'trade': self.tab_trade,
+            'finance': self.tab_finance,
+            'services': self.tab_services,
+            'cmdr': self.tab_cmdr,
+            'misc': self.tab_misc,
+            'notes': self.tab_notes,
+            'active_journals': self.tab_active_journals,
+            'options': self.tab_options,
+        }
 
         # Make the grid expand when the window is resized
         def configure_tab_grid(tab):
@@ -251,6 +263,17 @@ class CarrierView:
         self.button_clear_cache.pack(side='left', padx=10, pady=10, anchor='w')
         self.button_check_time_skew = ttk.Button(self.labelframe_EDCM, text='Check Time Skew')
         self.button_check_time_skew.pack(side='left', padx=10, pady=10, anchor='w')
+        self.button_show_diagnostics = ttk.Button(self.labelframe_EDCM, text='Diagnostics')
+        self.button_show_diagnostics.pack(side='left', padx=10, pady=10, anchor='w')
+        self.hovertip_button_show_diagnostics = Hovertip(self.button_show_diagnostics, 'Show how long journal reads, table updates and network requests take.', hover_delay=TOOLTIP_HOVER_DELAY, background=TOOLTIP_BACKGROUND, foreground=TOOLTIP_FOREGROUND)
+        self.checkbox_correct_time_skew_var = tk.BooleanVar()
+        self.checkbox_correct_time_skew = ttk.Checkbutton(
+            self.labelframe_EDCM,
+            text='Correct Time Skew',
+            variable=self.checkbox_correct_time_skew_var,
+        )
+        self.checkbox_correct_time_skew.pack(side='left', padx=10, pady=10, anchor='w')
+        self.hovertip_checkbox_correct_time_skew = Hovertip(self.checkbox_correct_time_skew, 'Show timers and plot reminders on the game server\'s clock instead of your system clock.', hover_delay=TOOLTIP_HOVER_DELAY, background=TOOLTIP_BACKGROUND, foreground=TOOLTIP_FOREGROUND)
         self.checkbox_show_active_journals_var = tk.BooleanVar()
         self.checkbox_show_active_journals_var.trace_add('write', lambda *args: self.toggle_active_journals_tab())
         self.checkbox_show_active_journals = ttk.Checkbutton(
@@ -380,11 +403,12 @@ class CarrierView:
                 print(f'Warning: No sheet found for menu options with key "{sheet_name}"')
 
     def update_table(self, table:Sheet, data, rows_pending_decomm:list[int]|None=None):
-        table.set_sheet_data(data, reset_col_positions=False)
-        table.dehighlight_all(redraw=False)
-        if rows_pending_decomm is not None:
-            table.highlight_rows(rows_pending_decomm, fg='red', redraw=False)
-        table.set_all_column_widths()
+        with timer('edcm_table_render_seconds', 'Setting table rows', table=table.winfo_name()):
+            table.set_sheet_data(data, reset_col_positions=False)
+            table.dehighlight_all(redraw=False)
+            if rows_pending_decomm is not None:
+                table.highlight_rows(rows_pending_decomm, fg='red', redraw=False)
+            table.set_all_column_widths()
     
     def update_table_jumps(self, data, rows_pending_decomm:list[int]|None=None):
         self.update_table(self.sheet_jumps, data, rows_pending_decomm)
@@ -436,6 +460,17 @@ class CarrierView:
         state = 'normal' if self.checkbox_show_active_journals_var.get() else 'hidden'
         self.tab_controller.tab(self.tab_active_journals, state=state)
 
+    def get_selected_tab(self) -> str|None:
+        selected = self.tab_controller.select()
+        for name, tab in self.tabs.items():
+            if str(tab) == selected:
+                return name
+        return None
+
+    def is_window_visible(self) -> bool:
+        # withdrawn when sent to tray, iconic when minimized to the taskbar
+        return self.root.state() not in ('withdrawn', 'iconic')
+
     def update_time(self, time:str):
         self.clock_utc.configure(text=time)
 
@@ -478,6 +513,8 @@ class TradePostView:
         self.market_ids = market_ids
         self.market_updated = market_updated
         self.price = int(price.replace(',', '')) if isinstance(price, str) else price
+        self.root = root
+        self.stock_prices: dict[str, tuple[int|None, int|None, bool]] = {}
 
         self.popup = tk.Toplevel(root)
         self.popup.rowconfigure(1, pad=1, weight=1)
@@ -531,6 +568,9 @@ class TradePostView:
         self.button_post.grid(row=2, column=0, columnspan=14, pady=10)
         
         self.on_station_selected(None)
+        # fetch the other listed markets in the background, selecting one of them then needs no request
+        other_market_ids = [market_id for market_id in market_ids if market_id != market_ids[default_station_index]]
+        requestStockPrices(trade_type, other_market_ids, commodity, lambda market_id, result: self.root.after(0, self.on_stock_price_fetched, market_id, result))
         
         self.popup.attributes('-topmost', True)
         center_window_relative_to_parent(self.popup, root)
@@ -541,7 +581,11 @@ class TradePostView:
         self.popup.focus_set()
         self.cbox_pad_size.current(0 if self.pad_sizes[self.cbox_stations.current()] == 'L' else 1)
         try:
-            stock, price = getStockPrice(self.trade_type, self.market_ids[self.cbox_stations.current()], commodity_name=self.commodity)
+            market_id = self.market_ids[self.cbox_stations.current()]
+            if market_id in self.stock_prices:
+                stock, price, stale, refresh_failed = self.stock_prices[market_id]
+            else:
+                stock, price, stale, refresh_failed = self.stock_prices[market_id] = getStockPrice(self.trade_type, market_id, commodity_name=self.commodity)
         except Exception as e:
             self.label_price.configure(text='Error fetching price')
             self.label_stock.configure(text='Error fetching stock')
@@ -549,12 +593,16 @@ class TradePostView:
             return
         self.label_price.configure(text=f'Station price {price:,} cr' if price is not None else 'Station price unknown')
         self.label_stock.configure(text=f'{"Supply" if self.trade_type == "loading" else "Demand"}' + (f' {stock:,} units' if stock is not None else ' unknown'))
-        self.label_market_updated.configure(text='Last updated: ' + (self.market_updated[self.cbox_stations.current()] if self.market_updated[self.cbox_stations.current()] is not None else ' unknown'))
+        self.label_market_updated.configure(text='Last updated: ' + (self.market_updated[self.cbox_stations.current()] if self.market_updated[self.cbox_stations.current()] is not None else ' unknown') + (' (cached, could not refresh)' if refresh_failed else ' (refreshing)' if stale else ''))
         if price is not None:
             profit = self.price - price if self.trade_type == 'loading' else price - self.price
             profit = int(profit / 1000)
             self.cbox_profit.set(profit)
 
+    def on_stock_price_fetched(self, market_id:str, result:tuple[int|None, int|None, bool, bool]|None):
+        if result is not None and self.popup.winfo_exists():
+            self.stock_prices.setdefault(market_id, result)
+
     def on_pad_size_selected(self, event):
         self.cbox_pad_size.selection_clear()
         self.popup.focus_set()
@@ -714,6 +762,53 @@ class TradeHistoryView:
         center_window_relative_to_parent(self.popup, root)
         self.popup.focus_set()
 
+class DiagnosticsView:
+    def __init__(self, root, data:list[list], window_size:str=WINDOW_SIZE):
+        self.popup = tk.Toplevel(root)
+        self.popup.geometry(window_size)
+        self.popup.transient(root)
+        apply_theme_to_titlebar(self.popup)
+        self.popup.title('Diagnostics')
+        self.popup.focus_force()
+        self.popup.rowconfigure(0, pad=1, weight=1)
+        self.popup.columnconfigure(0, pad=1, weight=1)
+
+        self.sheet_diagnostics = Sheet(self.popup, name='sheet_diagnostics')
+        self.sheet_diagnostics.headers(['Metric', 'Labels', 'Count / Value', 'Mean (ms)', 'p95 (ms)', 'Max (ms)', 'Total (ms)'])
+        self.sheet_diagnostics['C:G'].align('right')
+        self.sheet_diagnostics.grid(row=0, column=0, sticky='nswe')
+        self.sheet_diagnostics.change_theme('dark', redraw=False)
+        self.sheet_diagnostics.set_options(**{
+            'table_bg':    '#1c1c1e',  # main window surface
+            'header_bg':   "#202021",  # secondary surface
+            'header_fg':   '#f3f3f5',  # light text
+            'index_bg':    '#202021',  # secondary surface
+            'index_fg':    "#C2C2C4",  # dim light text
+            'top_left_bg':  '#202021',  # secondary surface
+            'cell_bg':     '#1c1c1e',  # main window surface
+            'cell_fg':     '#f3f3f5',  # light text
+            'selected_bg': '#0a84ff',  # Fluent accent blue
+            'selected_fg': '#ffffff',  # white text on selection
+        })
+        self.sheet_diagnostics.enable_bindings('single_select', 'drag_select', 'column_select', 'row_select', 'arrowkeys', 'copy', 'find', 'ctrl_click_select', 'rc_select')
+        self.sheet_diagnostics.column_width_resize_enabled = False
+        self.sheet_diagnostics.row_height_resize_enabled = False
+        self.update_data(data)
+
+        self.bottom_bar_diagnostics = ttk.Frame(self.popup)
+        self.bottom_bar_diagnostics.grid(row=1, column=0, sticky='ew')
+        self.button_refresh = ttk.Button(self.bottom_bar_diagnostics, text='Refresh')
+        self.button_refresh.pack(side='left', padx=10, pady=10, anchor='w')
+        self.button_copy_metrics = ttk.Button(self.bottom_bar_diagnostics, text='Copy as Prometheus Text')
+        self.button_copy_metrics.pack(side='left', padx=10, pady=10, anchor='w')
+
+        center_window_relative_to_parent(self.popup, root)
+        self.popup.focus_set()
+
+    def update_data(self, data:list[list]):
+        self.sheet_diagnostics.set_sheet_data(data, reset_col_positions=False)
+        self.sheet_diagnostics.set_all_column_widths()
+
 if __name__ == '__main__':
     import sv_ttk
     from config import WINDOW_SIZE